@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    Community, PostTemplate, PostTemplateImage, SocialMediaPost,
+    Community, PostTemplate, PostTemplateImage, ImageBlob, SocialMediaPost, OrphanedMediaFile,
     Schedule, ScheduleExecution
 )
 
@@ -77,7 +77,7 @@ class PostTemplateImageAdmin(admin.ModelAdmin):
     list_filter = ('template__user', 'order', 'created_at')
     search_fields = ('template__title', 'alt_text')
     ordering = ('template', 'order', 'created_at')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('blob', 'post_ready', 'created_at')  # 圖片檔案的引用次數由系統維護
     
     # 改善批量刪除功能
     list_per_page = 100  # 每頁顯示100條記錄
@@ -86,6 +86,7 @@ class PostTemplateImageAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('基本資訊', {'fields': ('template', 'image', 'order', 'alt_text')}),
+        ('圖片檔案', {'fields': ('blob', 'post_ready')}),
         ('時間資訊', {'fields': ('created_at',)}),
     )
     
@@ -97,23 +98,12 @@ class PostTemplateImageAdmin(admin.ModelAdmin):
         return actions
     
     def delete_selected_with_files(self, request, queryset):
-        """刪除選中的模板圖片（包括文件）"""
-        import os
-        
+        """刪除選中的模板圖片（圖片檔案在沒有其他模板引用時一併刪除）"""
         deleted_count = 0
-        deleted_files = 0
         
         for image in queryset:
             try:
-                # 刪除圖片文件
-                if image.image and hasattr(image.image, 'path') and os.path.exists(image.image.path):
-                    try:
-                        os.remove(image.image.path)
-                        deleted_files += 1
-                    except Exception as e:
-                        self.message_user(request, f"刪除文件失敗 {image.image.path}: {e}", level='WARNING')
-                
-                # 刪除數據庫記錄
+                # 刪除數據庫記錄，由信號減少圖片檔案的引用次數
                 image.delete()
                 deleted_count += 1
                 
@@ -121,7 +111,7 @@ class PostTemplateImageAdmin(admin.ModelAdmin):
                 self.message_user(request, f"刪除記錄失敗 {image.id}: {e}", level='ERROR')
         
         if deleted_count > 0:
-            self.message_user(request, f"成功刪除 {deleted_count} 個模板圖片記錄，{deleted_files} 個圖片文件")
+            self.message_user(request, f"成功刪除 {deleted_count} 個模板圖片記錄")
         else:
             self.message_user(request, "沒有刪除任何記錄", level='WARNING')
     
@@ -130,6 +120,25 @@ class PostTemplateImageAdmin(admin.ModelAdmin):
     actions = ['delete_selected', 'delete_selected_with_files']
 
 
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    """圖片檔案管理界面"""
+    list_display = ('sha256', 'file', 'size', 'ref_count', 'created_at', 'updated_at')
+    list_filter = ('created_at',)
+    search_fields = ('sha256', 'file')
+    ordering = ('-created_at',)
+    readonly_fields = ('sha256', 'file', 'size', 'ref_count', 'created_at', 'updated_at')
+
+
+@admin.register(OrphanedMediaFile)
+class OrphanedMediaFileAdmin(admin.ModelAdmin):
+    """未引用圖片檔案管理界面（由 cleanup_media 指令維護）"""
+    list_display = ('path', 'size', 'detected_at')
+    search_fields = ('path',)
+    ordering = ('detected_at',)
+    readonly_fields = ('path', 'directory', 'size', 'detected_at')
+
+
 @admin.register(SocialMediaPost)
 class SocialMediaPostAdmin(admin.ModelAdmin):
     """社交媒體貼文管理界面"""
@@ -201,7 +210,7 @@ class ScheduleAdmin(admin.ModelAdmin):
     list_display = ('name', 'user', 'platform', 'get_template_display', 'status', 'is_active', 'execution_days_display', 'posting_times_display', 'total_executions', 'created_at')
     list_filter = (UserFilter, ExecutionDaysFilter, 'status', 'is_active', 'platform', 'template', 'created_at')
     search_fields = ('name', 'user__username', 'platform', 'template__title')
-    readonly_fields = ('total_executions', 'successful_executions', 'failed_executions', 'last_execution_time', 'created_at', 'updated_at')
+    readonly_fields = ('total_executions', 'successful_executions', 'failed_executions', 'last_execution_time', 'next_execution_at', 'created_at', 'updated_at')
     
     fieldsets = (
         ('基本資訊', {
@@ -215,10 +224,10 @@ class ScheduleAdmin(admin.ModelAdmin):
             'description': '選擇要使用的貼文模板，選擇後會自動更新發文內容和圖片'
         }),
         ('發文內容', {
-            'fields': ('platform', 'message_content', 'template_images', 'target_communities')
+            'fields': ('platform', 'message_content', 'template_images', 'target_communities', 'typing_mode')
         }),
         ('執行統計', {
-            'fields': ('total_executions', 'successful_executions', 'failed_executions', 'last_execution_time'),
+            'fields': ('total_executions', 'successful_executions', 'failed_executions', 'last_execution_time', 'next_execution_at'),
             'classes': ('collapse',)
         }),
         ('時間資訊', {
@@ -433,7 +442,7 @@ class ScheduleExecutionAdmin(admin.ModelAdmin):
         'created_at'
     )
     search_fields = ('schedule__name', 'schedule__user__username')
-    readonly_fields = ('schedule', 'scheduled_time', 'created_at', 'updated_at')
+    readonly_fields = ('schedule', 'scheduled_time', 'worker_id', 'heartbeat_at', 'attempts', 'created_at', 'updated_at')
     list_per_page = 50
     ordering = ('-scheduled_time',)
     actions = ['retry_failed_executions', 'cancel_pending_executions']
@@ -451,6 +460,10 @@ class ScheduleExecutionAdmin(admin.ModelAdmin):
         ('發布統計', {
             'fields': ('posts_published', 'posts_failed')
         }),
+        ('工作佇列', {
+            'fields': ('worker_id', 'heartbeat_at', 'attempts'),
+            'classes': ('collapse',)
+        }),
         ('時間資訊', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -0,0 +1,90 @@
+"""
+發文圖片附加
+每次執行（立即發文或一次排程）只解析、檢查一次圖片路徑，
+發文時以單一 send_keys 送出所有檔案（檔案欄位支援 multiple 時），再一起等待縮圖出現。
+"""
+
+import logging
+import os
+
+from django.conf import settings
+
+from . import waits
+from .image_pipeline import get_post_ready_path
+
+logger = logging.getLogger(__name__)
+
+# 計算發文表單中已產生的上傳預覽圖數量
+THUMBNAIL_COUNT_SCRIPT = """
+const scope = arguments[0].closest('form') || document;
+return scope.querySelectorAll('img[src^="blob:"], img[src^="data:image"]').length;
+"""
+
+
+def to_absolute_path(image):
+    """把模板圖片資料（'/media/...'、絕對路徑或 {'url': ...}）轉成本機絕對路徑"""
+    if isinstance(image, dict):
+        image = image.get('url')
+    if not image:
+        return None
+
+    path = str(image)
+    media_url = settings.MEDIA_URL
+    if path.startswith(media_url):
+        relative_path = path[len(media_url):].replace('/', os.sep)
+        return os.path.join(str(settings.MEDIA_ROOT), relative_path)
+    return path
+
+
+def resolve_image_paths(images):
+    """解析並檢查圖片路徑，回傳存在的絕對路徑（去重且保留順序，有發文版本時使用發文版本）"""
+    resolved = []
+    seen = set()
+    for image in images or []:
+        path = to_absolute_path(image)
+        if not path or path in seen:
+            continue
+        seen.add(path)
+        if os.path.isfile(path):
+            # 已產生發文版本（縮圖壓縮）時上傳發文版本
+            resolved.append(get_post_ready_path(path) or path)
+        else:
+            logger.warning(f'找不到圖片檔案，略過: {path}')
+    return resolved
+
+
+def _thumbnail_count(driver, file_input):
+    try:
+        return driver.execute_script(THUMBNAIL_COUNT_SCRIPT, file_input) or 0
+    except Exception:
+        return 0
+
+
+def attach_images(driver, file_input, paths, timeout=None):
+    """
+    把圖片送進檔案欄位並等待所有縮圖出現，回傳是否在時限內看到全部縮圖
+    檔案欄位支援 multiple 時一次送出所有路徑（以換行分隔），否則逐一送出
+    """
+    if not paths:
+        return True
+
+    baseline = _thumbnail_count(driver, file_input)
+    if len(paths) > 1 and file_input.get_attribute('multiple') is not None:
+        file_input.send_keys('\n'.join(paths))
+    else:
+        for path in paths:
+            file_input.send_keys(path)
+
+    expected = baseline + len(paths)
+    ready = waits.wait_until(
+        driver,
+        lambda d: _thumbnail_count(d, file_input) >= expected,
+        timeout=timeout or max(waits.get_ready_timeout(), 5 * len(paths)),
+        label='image_thumbnails',
+    )
+    if ready is None:
+        # 找不到預覽圖（頁面結構改變）時退回等待 DOM 穩定
+        logger.warning(f'等待圖片縮圖逾時（預期 {len(paths)} 張），改為等待頁面穩定')
+        waits.wait_for_dom_quiet(driver, label='image_upload')
+        return False
+    return True
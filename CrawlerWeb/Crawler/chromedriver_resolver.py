@@ -0,0 +1,175 @@
+"""
+ChromeDriver 路徑解析與快取
+在程序啟動時解析一次 ChromeDriver 位置並寫入版本清單（manifest），
+之後建立驅動程式時直接使用記憶中的路徑，發文流程中不會再連網下載。
+"""
+
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VERSION_PATTERN = re.compile(r'(\d+)\.(\d+)\.(\d+)\.(\d+)')
+
+CHROME_BINARY_CANDIDATES = [
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+_resolved_path = None
+_resolve_lock = threading.Lock()
+_prime_thread = None
+
+
+class ChromedriverUnavailable(RuntimeError):
+    """沒有可用且版本相符的 ChromeDriver"""
+
+
+def get_manifest_path():
+    """版本清單檔案位置"""
+    return str(getattr(settings, 'CHROMEDRIVER_MANIFEST_PATH', settings.BASE_DIR / 'chromedriver_manifest.json'))
+
+
+def _parse_version(text):
+    match = VERSION_PATTERN.search(text or '')
+    return match.group(0) if match else None
+
+
+def _major(version):
+    return version.split('.', 1)[0] if version else None
+
+
+def _run_version_command(binary):
+    try:
+        result = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return _parse_version(result.stdout or result.stderr)
+
+
+def get_installed_chrome_version():
+    """取得本機安裝的 Chrome 版本（只讀取本機資訊，不連網）"""
+    if sys.platform.startswith('win32'):
+        import winreg
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, r'Software\Google\Chrome\BLBeacon') as key:
+                    version, _ = winreg.QueryValueEx(key, 'version')
+                    return _parse_version(version)
+            except OSError:
+                continue
+        return None
+
+    for binary in CHROME_BINARY_CANDIDATES:
+        version = _run_version_command(binary)
+        if version:
+            return version
+    return None
+
+
+def get_driver_binary_version(driver_path):
+    """取得 ChromeDriver 執行檔的版本"""
+    return _run_version_command(driver_path)
+
+
+def load_manifest():
+    """讀取版本清單，不存在或格式錯誤時回傳 None"""
+    try:
+        with open(get_manifest_path(), 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def save_manifest(manifest):
+    """寫入版本清單（先寫暫存檔再替換，避免寫到一半被讀取）"""
+    path = get_manifest_path()
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def is_manifest_valid(manifest, chrome_version):
+    """檢查清單中的 ChromeDriver 是否存在且與已安裝的 Chrome 主版本相符"""
+    if not manifest:
+        return False
+    driver_path = manifest.get('driver_path')
+    if not driver_path or not os.path.isfile(driver_path):
+        return False
+    if chrome_version is None:
+        # 偵測不到 Chrome 版本時只能信任清單內容
+        logger.warning('無法偵測 Chrome 版本，沿用清單中的 ChromeDriver')
+        return True
+    return _major(manifest.get('driver_version')) == _major(chrome_version)
+
+
+def resolve_chromedriver(allow_download=True, force=False):
+    """
+    解析 ChromeDriver 路徑並記憶結果
+    allow_download=False 時只使用清單中的快取，不會連網
+    """
+    global _resolved_path
+    with _resolve_lock:
+        if _resolved_path and not force:
+            return _resolved_path
+
+        chrome_version = get_installed_chrome_version()
+        manifest = None if force else load_manifest()
+
+        if not is_manifest_valid(manifest, chrome_version):
+            if not allow_download:
+                raise ChromedriverUnavailable(
+                    '找不到與 Chrome 版本相符的 ChromeDriver，請先執行 python manage.py resolve_chromedriver'
+                )
+
+            from webdriver_manager.chrome import ChromeDriverManager
+            driver_path = ChromeDriverManager().install()
+            manifest = {
+                'driver_path': driver_path,
+                'driver_version': get_driver_binary_version(driver_path),
+                'chrome_version': chrome_version,
+                'resolved_at': timezone.now().isoformat(),
+            }
+            save_manifest(manifest)
+            logger.info(f'已解析 ChromeDriver: {driver_path} (Chrome {chrome_version})')
+
+        _resolved_path = manifest['driver_path']
+        return _resolved_path
+
+
+def prime_chromedriver():
+    """程序啟動時在背景解析 ChromeDriver，不阻塞啟動流程"""
+    global _prime_thread
+
+    def _prime():
+        try:
+            resolve_chromedriver(allow_download=True)
+        except Exception as e:
+            logger.error(f'預先解析 ChromeDriver 失敗: {str(e)}')
+
+    if _prime_thread is None:
+        _prime_thread = threading.Thread(target=_prime, name='chromedriver-prime', daemon=True)
+        _prime_thread.start()
+    return _prime_thread
+
+
+def get_chromedriver_path():
+    """建立驅動程式時使用：只讀快取，絕不連網"""
+    if _resolved_path:
+        return _resolved_path
+    if _prime_thread is not None and _prime_thread.is_alive():
+        _prime_thread.join()
+    return resolve_chromedriver(allow_download=False)
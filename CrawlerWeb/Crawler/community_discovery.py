@@ -0,0 +1,206 @@
+"""
+Facebook 社團探索
+在「已加入的社團」頁面邊捲動邊收集社團連結：每捲動一次只處理新出現的連結，
+等待新節點出現而不是固定睡眠；頁面依加入時間排序，連續遇到一串已知社團時即可提早停止。
+連結的讀取與過濾在頁面內以單一 execute_script 完成，失敗時才退回逐一讀取 WebElement。
+"""
+
+import logging
+
+from django.conf import settings
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+GROUPS_JOINED_URL = 'https://www.facebook.com/groups/joins/?nav_source=tab&ordering=viewer_added'
+
+# 依序嘗試，使用第一個找得到元素的 XPath
+GROUP_LINK_XPATHS = [
+    # 社團列表容器內的社團連結，排除導航元素
+    '/html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div[2]/div/div/div/div/div/div/div/div/div/div[3]//a[contains(@href, "/groups/") and not(contains(@href, "joins")) and not(contains(@href, "create")) and not(contains(@href, "feed")) and not(contains(@href, "discover"))]',
+
+    # 更精確的社團連結選擇器，排除導航項目
+    '//a[contains(@href, "/groups/") and not(contains(@href, "joins")) and not(contains(@href, "create")) and not(contains(@href, "feed")) and not(contains(@href, "discover")) and not(contains(@href, "browse"))]',
+
+    # 基於 aria-label 的選擇器
+    '//a[contains(@href, "/groups/") and @aria-label]',
+
+    # 通用的社團連結選擇器（作為備用）
+    '//a[contains(@href, "/groups/")]',
+]
+
+EXCLUDED_URL_PARTS = ('joins', 'create', 'feed', 'discover', 'browse')
+EXCLUDED_NAME_PREFIXES = ('查看', '加入', '查看更多', '顯示更多')
+EXCLUDED_NAMES = ('探索', '你的動態消息', '動態消息', '瀏覽', '發現')
+
+# 在頁面內一次完成 XPath 查詢、讀取與過濾，回傳 {xpath_index, count, links: [[name, url], ...]}
+# 名稱取連結文字，沒有文字時使用 aria-label（與 _read_links 相同）
+# arguments: [xpaths, xpath_index（-1 表示使用第一個有結果的）, start, excluded_url_parts, excluded_name_prefixes, excluded_names]
+EXTRACT_LINKS_SCRIPT = """
+const [xpaths, fixedIndex, start, urlParts, namePrefixes, names] = arguments;
+const snapshot = (xpath) => document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+let xpathIndex = fixedIndex;
+let result = null;
+if (xpathIndex >= 0) {
+    result = snapshot(xpaths[xpathIndex]);
+} else {
+    for (let i = 0; i < xpaths.length; i++) {
+        const candidate = snapshot(xpaths[i]);
+        if (candidate.snapshotLength > 0) {
+            xpathIndex = i;
+            result = candidate;
+            break;
+        }
+    }
+}
+if (result === null) {
+    return {xpath_index: -1, count: 0, links: []};
+}
+const links = [];
+for (let i = start; i < result.snapshotLength; i++) {
+    const element = result.snapshotItem(i);
+    const url = element.href || '';
+    const name = (element.innerText || '').trim() || (element.getAttribute('aria-label') || '').trim();
+    if (!name || !url || !url.includes('groups')) continue;
+    if (urlParts.some((part) => url.includes(part))) continue;
+    if (namePrefixes.some((prefix) => name.startsWith(prefix)) || names.includes(name)) continue;
+    links.push([name, url]);
+}
+return {xpath_index: xpathIndex, count: result.snapshotLength, links: links};
+"""
+
+# 目前頁面上的社團連結數量與頁面高度，用來判斷捲動後是否載入了新內容
+PAGE_PROGRESS_SCRIPT = (
+    "return [document.querySelectorAll('a[href*=\"/groups/\"]').length, document.body.scrollHeight];"
+)
+
+
+def get_known_run_limit():
+    """連續遇到多少個已知社團就停止捲動"""
+    return getattr(settings, 'CRAWLER_COMMUNITY_KNOWN_RUN', 20)
+
+
+def get_scroll_timeout():
+    """捲動後等待新社團出現的最長秒數，逾時即視為已到底"""
+    return getattr(settings, 'CRAWLER_COMMUNITY_SCROLL_TIMEOUT', 4)
+
+
+def is_group_link(name, url):
+    """判斷連結是否為社團（排除導航、探索等項目）"""
+    if not name or not url or 'groups' not in url:
+        return False
+    if any(part in url for part in EXCLUDED_URL_PARTS):
+        return False
+    if name.startswith(EXCLUDED_NAME_PREFIXES) or name in EXCLUDED_NAMES:
+        return False
+    return True
+
+
+def _extract_links_in_page(driver, xpath_index, start):
+    """一次 execute_script 取回新出現的社團連結，回傳 (xpath_index, 連結數量, [(name, url), ...])"""
+    payload = driver.execute_script(
+        EXTRACT_LINKS_SCRIPT,
+        GROUP_LINK_XPATHS,
+        -1 if xpath_index is None else xpath_index,
+        start,
+        list(EXCLUDED_URL_PARTS),
+        list(EXCLUDED_NAME_PREFIXES),
+        list(EXCLUDED_NAMES),
+    )
+    found_index = payload['xpath_index']
+    links = [(name, url) for name, url in payload['links']]
+    return (None if found_index < 0 else found_index), payload['count'], links
+
+
+def _read_links(driver, xpath_index, start):
+    """
+    以 WebElement 逐一讀取連結（頁面內腳本失敗時的備用方式）
+    回傳 (xpath_index, 連結數量, [(name, url), ...])
+    """
+    if xpath_index is None:
+        for index, candidate in enumerate(GROUP_LINK_XPATHS):
+            if driver.find_elements(By.XPATH, candidate):
+                xpath_index = index
+                break
+        else:
+            return None, 0, []
+
+    elements = driver.find_elements(By.XPATH, GROUP_LINK_XPATHS[xpath_index])
+    links = []
+    for element in elements[start:]:
+        try:
+            name = element.text.strip() or (element.get_attribute('aria-label') or '').strip()
+            links.append((name, element.get_attribute('href')))
+        except Exception:
+            continue
+    return xpath_index, len(elements), links
+
+
+def _wait_for_more(driver, last_progress, timeout):
+    """等待連結數量或頁面高度增加，逾時回傳 None"""
+    def _progressed(d):
+        progress = d.execute_script(PAGE_PROGRESS_SCRIPT)
+        if progress[0] > last_progress[0] or progress[1] > last_progress[1]:
+            return progress
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.25).until(_progressed)
+    except TimeoutException:
+        return None
+
+
+def harvest_group_links(driver, known_urls=None, known_run_limit=None, scroll_timeout=None):
+    """
+    邊捲動邊收集社團連結，回傳 (communities, complete)
+    - known_urls：資料庫中已知的社團網址；為 None 時完整掃描到頁面底部
+    - complete：是否已捲動到底（提早停止時為 False，呼叫端不應據此刪除社團）
+    """
+    known_urls = set(known_urls or ())
+    known_run_limit = known_run_limit or get_known_run_limit()
+    scroll_timeout = scroll_timeout or get_scroll_timeout()
+
+    driver.get(GROUPS_JOINED_URL)
+    WebDriverWait(driver, 30).until(lambda d: d.execute_script('return document.readyState') == 'complete')
+
+    communities = []
+    seen_urls = set()
+    xpath_index = None  # 第一個有結果的 XPath，之後的批次沿用同一個
+    processed = 0
+    known_run = 0
+    use_script = True
+    progress = driver.execute_script(PAGE_PROGRESS_SCRIPT)
+
+    while True:
+        links = []
+        if use_script:
+            try:
+                xpath_index, processed, links = _extract_links_in_page(driver, xpath_index, processed)
+            except Exception as e:
+                logger.warning(f'頁面內擷取社團連結失敗，改用 XPath 逐一讀取: {str(e)}')
+                use_script = False
+        if not use_script:
+            xpath_index, processed, links = _read_links(driver, xpath_index, processed)
+
+        if xpath_index is not None:
+            for name, url in links:
+                if url in seen_urls or not is_group_link(name, url):
+                    continue
+                seen_urls.add(url)
+                communities.append({'name': name, 'url': url})
+
+                if url in known_urls:
+                    known_run += 1
+                else:
+                    known_run = 0
+
+            if known_urls and known_run >= known_run_limit:
+                logger.info(f'連續遇到 {known_run} 個已知社團，停止捲動（已收集 {len(communities)} 個）')
+                return communities, False
+
+        driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
+        progress = _wait_for_more(driver, progress, scroll_timeout)
+        if progress is None:
+            return communities, True
@@ -0,0 +1,102 @@
+"""
+社團同步
+把爬取到的社團清單與資料庫一次比對：在記憶體中算出新增、更新與移除的項目，
+再以 bulk_create / bulk_update / 單一 delete 套用，整個過程在同一個交易內完成。
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Community
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def _normalize(communities):
+    """以網址去重，保留第一次出現的項目"""
+    scraped = {}
+    for community in communities:
+        url = community.get('url')
+        if url and url not in scraped:
+            scraped[url] = community
+    return scraped
+
+
+def sync_communities(user, communities, community_type='facebook', prune=True):
+    """
+    同步使用者的社團
+    - 資料庫沒有的網址：新增
+    - 名稱或成員數量有變動：更新
+    - prune=True 時，資料庫有但這次沒爬到的同類型社團：刪除
+    回傳 {'added': n, 'updated': n, 'removed': n, 'total': n}
+    """
+    scraped = _normalize(communities)
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = {
+            url: (community_id, name, member_count, existing_type)
+            for community_id, url, name, member_count, existing_type in Community.objects.filter(
+                user=user
+            ).values_list('id', 'url', 'name', 'member_count', 'community_type')
+        }
+
+        to_create = []
+        to_update = []
+        for url, data in scraped.items():
+            name = data.get('name', '')
+            member_count = data.get('member_count')
+
+            if url not in existing:
+                to_create.append(Community(
+                    user=user,
+                    name=name,
+                    community_type=community_type,
+                    url=url,
+                    description=f'Facebook 社團：{name}' if community_type == 'facebook' else '',
+                    member_count=member_count or 0,
+                    is_active=True,
+                    is_public=True
+                ))
+                continue
+
+            community_id, old_name, old_member_count, _ = existing[url]
+            new_member_count = old_member_count if member_count is None else member_count
+            if name and (name != old_name or new_member_count != old_member_count):
+                to_update.append(Community(
+                    id=community_id,
+                    name=name,
+                    member_count=new_member_count,
+                    updated_at=now
+                ))
+
+        stale_ids = []
+        if prune:
+            stale_ids = [
+                community_id
+                for url, (community_id, _, _, existing_type) in existing.items()
+                if existing_type == community_type and url not in scraped
+            ]
+
+        if to_create:
+            # 與其他請求同時新增時，以 (user, url) 唯一約束略過重複
+            Community.objects.bulk_create(to_create, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        if to_update:
+            Community.objects.bulk_update(to_update, ['name', 'member_count', 'updated_at'], batch_size=BATCH_SIZE)
+        removed = 0
+        if stale_ids:
+            _, deleted_per_model = Community.objects.filter(id__in=stale_ids).delete()
+            removed = deleted_per_model.get(Community._meta.label, 0)
+
+    result = {
+        'added': len(to_create),
+        'updated': len(to_update),
+        'removed': removed,
+        'total': len(scraped),
+    }
+    logger.info(f'同步 {user} 的社團：新增 {result["added"]}，更新 {result["updated"]}，移除 {result["removed"]}')
+    return result
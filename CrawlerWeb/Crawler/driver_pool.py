@@ -0,0 +1,369 @@
+"""
+Chrome 驅動程式池
+預先啟動並重複使用瀏覽器工作階段，避免每個請求都冷啟動 Chrome。
+每個使用者的瀏覽器互相隔離（Cookie 不會被其他使用者沿用）。
+"""
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPoolExhausted(RuntimeError):
+    """在等待時間內無法取得可用的瀏覽器"""
+
+
+def _default_driver_factory(headless):
+    """使用 FacebookAutomationView 的設定建立新的驅動程式"""
+    from .views import FacebookAutomationView
+    return FacebookAutomationView()._setup_driver(headless=headless)
+
+
+class PooledDriver:
+    """池中的單一瀏覽器工作階段"""
+
+    def __init__(self, driver, key):
+        self.driver = driver
+        self.key = key
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.lease_count = 0
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+    @property
+    def idle_time(self):
+        return time.monotonic() - self.last_used_at
+
+
+class DriverPool:
+    """
+    有上限的瀏覽器池
+    - 以 (使用者 ID, 是否 headless) 為鍵隔離工作階段
+    - 借出前做健康檢查，超過存活時間或閒置過久的瀏覽器會被回收
+    - 總數達上限時會先關閉其他使用者的閒置瀏覽器，仍不足則等待歸還
+    """
+
+    def __init__(self, max_size=4, max_idle_per_user=1, max_age=1800,
+                 idle_timeout=600, acquire_timeout=120, driver_factory=None):
+        self.max_size = max(1, int(max_size))
+        self.max_idle_per_user = max(0, int(max_idle_per_user))
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.driver_factory = driver_factory or _default_driver_factory
+
+        self._cond = threading.Condition()
+        self._idle = {}      # key -> [PooledDriver, ...]
+        self._leased = {}    # id(driver) -> PooledDriver
+        self._total = 0      # 閒置 + 借出 + 建立中的數量
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # 借出 / 歸還
+    # ------------------------------------------------------------------
+    def acquire(self, user_id, headless=False):
+        """借出一個屬於該使用者的瀏覽器"""
+        key = (user_id, bool(headless))
+        deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            entry, create, stale = self._reserve(key, deadline)
+            self._quit_entries(stale)
+
+            if create:
+                try:
+                    driver = self.driver_factory(headless)
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                entry = PooledDriver(driver, key)
+            elif not self._is_healthy(entry):
+                logger.info(f'瀏覽器健康檢查失敗，重新建立 (user={user_id})')
+                self._discard(entry)
+                continue
+
+            entry.lease_count += 1
+            entry.last_used_at = time.monotonic()
+            with self._cond:
+                self._leased[id(entry.driver)] = entry
+            return entry.driver
+
+    def release(self, driver, discard=False):
+        """歸還瀏覽器；discard=True 表示此瀏覽器狀態不可信，直接關閉"""
+        if driver is None:
+            return
+
+        with self._cond:
+            entry = self._leased.pop(id(driver), None)
+
+        if entry is None:
+            # 不是由池借出的瀏覽器，直接關閉
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        if discard or self._closed or self._is_expired(entry) or not self._reset(entry):
+            self._discard(entry)
+            return
+
+        entry.last_used_at = time.monotonic()
+        overflow = []
+        with self._cond:
+            idle = self._idle.setdefault(entry.key, [])
+            idle.append(entry)
+            while len(idle) > self.max_idle_per_user:
+                overflow.append(idle.pop(0))
+            self._total -= len(overflow)
+            self._cond.notify_all()
+        self._quit_entries(overflow)
+
+    @contextmanager
+    def lease(self, user_id, headless=False):
+        """以 with 語法借用瀏覽器，發生例外時不會把瀏覽器放回池中"""
+        driver = self.acquire(user_id, headless=headless)
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, discard=True)
+            raise
+        else:
+            self.release(driver)
+
+    def prewarm(self, user_id, count=1, headless=False):
+        """預先啟動瀏覽器並放入閒置池，讓該使用者至少有 count 個閒置瀏覽器；回傳新啟動的數量"""
+        key = (user_id, bool(headless))
+        with self._cond:
+            missing = min(count, self.max_idle_per_user) - len(self._idle.get(key, ()))
+        drivers = []
+        try:
+            for _ in range(missing):
+                drivers.append(self._create(user_id, headless))
+        except DriverPoolExhausted:
+            pass
+        finally:
+            for driver in drivers:
+                self.release(driver)
+        return len(drivers)
+
+    def shutdown(self):
+        """關閉所有閒置的瀏覽器，借出中的瀏覽器會在歸還時關閉"""
+        with self._cond:
+            self._closed = True
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+            self._total -= len(entries)
+            self._cond.notify_all()
+        self._quit_entries(entries)
+
+    def stats(self):
+        """池的使用狀況"""
+        with self._cond:
+            return {
+                'total': self._total,
+                'leased': len(self._leased),
+                'idle': sum(len(idle) for idle in self._idle.values()),
+                'max_size': self.max_size,
+            }
+
+    # ------------------------------------------------------------------
+    # 內部方法
+    # ------------------------------------------------------------------
+    def _create(self, user_id, headless):
+        """預熱用：直接建立新的瀏覽器並登記為借出；池已滿時不關閉其他使用者的瀏覽器，拋出 DriverPoolExhausted"""
+        key = (user_id, bool(headless))
+        with self._cond:
+            if self._closed:
+                raise DriverPoolExhausted('瀏覽器池已關閉')
+            stale = self._prune_expired()
+            full = self._total >= self.max_size
+            if not full:
+                self._total += 1
+        self._quit_entries(stale)
+        if full:
+            raise DriverPoolExhausted(f'瀏覽器池已滿（上限 {self.max_size}），略過預熱')
+
+        try:
+            driver = self.driver_factory(headless)
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        entry = PooledDriver(driver, key)
+        with self._cond:
+            self._leased[id(driver)] = entry
+        return driver
+
+    def _reserve(self, key, deadline):
+        """
+        在鎖內決定要沿用哪個閒置瀏覽器或建立新的
+        回傳 (entry, create, stale)，stale 為需要在鎖外關閉的瀏覽器
+        """
+        stale = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DriverPoolExhausted('瀏覽器池已關閉')
+
+                stale.extend(self._prune_expired())
+
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop(), False, stale
+
+                if self._total < self.max_size:
+                    self._total += 1
+                    return None, True, stale
+
+                victim = self._pop_idle_victim()
+                if victim is not None:
+                    stale.append(victim)
+                    self._total -= 1
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DriverPoolExhausted(f'瀏覽器池已滿（上限 {self.max_size}），請稍後再試')
+                self._cond.wait(remaining)
+
+    def _prune_expired(self):
+        """移除過期的閒置瀏覽器（需在鎖內呼叫）"""
+        expired = []
+        for key in list(self._idle):
+            keep = []
+            for entry in self._idle[key]:
+                if self._is_expired(entry) or (self.idle_timeout and entry.idle_time > self.idle_timeout):
+                    expired.append(entry)
+                else:
+                    keep.append(entry)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        self._total -= len(expired)
+        return expired
+
+    def _pop_idle_victim(self):
+        """挑出閒置最久的瀏覽器讓出名額（需在鎖內呼叫）"""
+        victim_key = None
+        victim = None
+        for key, idle in self._idle.items():
+            for entry in idle:
+                if victim is None or entry.last_used_at < victim.last_used_at:
+                    victim_key, victim = key, entry
+        if victim is not None:
+            self._idle[victim_key].remove(victim)
+            if not self._idle[victim_key]:
+                del self._idle[victim_key]
+        return victim
+
+    def _is_expired(self, entry):
+        return bool(self.max_age) and entry.age > self.max_age
+
+    def _is_healthy(self, entry):
+        """確認瀏覽器仍可回應"""
+        try:
+            entry.driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, entry):
+        """歸還前清除頁面狀態（保留 Cookie）"""
+        driver = entry.driver
+        try:
+            try:
+                driver.switch_to.alert.accept()
+            except Exception:
+                pass
+            driver.get('about:blank')
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify_all()
+        self._quit_entries([entry])
+
+    def _quit_entries(self, entries):
+        for entry in entries:
+            try:
+                entry.driver.quit()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """取得全域共用的瀏覽器池（依 settings 設定建立）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DriverPool(
+                    max_size=getattr(settings, 'CRAWLER_DRIVER_POOL_SIZE', 4),
+                    max_idle_per_user=getattr(settings, 'CRAWLER_DRIVER_POOL_MAX_IDLE_PER_USER', 1),
+                    max_age=getattr(settings, 'CRAWLER_DRIVER_POOL_MAX_AGE', 1800),
+                    idle_timeout=getattr(settings, 'CRAWLER_DRIVER_POOL_IDLE_TIMEOUT', 600),
+                    acquire_timeout=getattr(settings, 'CRAWLER_DRIVER_POOL_ACQUIRE_TIMEOUT', 120),
+                )
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def prewarm_in_background(user_id, count=1, headless=False):
+    """在背景執行緒預熱瀏覽器（例如使用者保存 Cookie 後），不阻塞請求"""
+    def run():
+        from django.db import connection
+        try:
+            get_driver_pool().prewarm(user_id, count=count, headless=headless)
+        except Exception as e:
+            logger.warning(f'預熱瀏覽器失敗 (user={user_id}): {str(e)}')
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name=f'prewarm-{user_id}', daemon=True).start()
+
+
+def prewarm_for_upcoming_schedules(headless=True):
+    """
+    為即將執行的排程預熱瀏覽器（排程執行器啟動及閒置時呼叫）
+    只處理在閒置逾時內就會到期的排程，依到期先後最多預熱到池的上限；回傳新啟動的數量
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from .models import Schedule
+
+    pool = get_driver_pool()
+    window = timedelta(seconds=pool.idle_timeout or 600)
+    user_ids = Schedule.objects.filter(
+        is_active=True,
+        status='active',
+        next_execution_at__lte=timezone.now() + window
+    ).order_by('next_execution_at').values_list('user_id', flat=True)
+
+    started = 0
+    for user_id in list(dict.fromkeys(user_ids))[:pool.max_size]:
+        try:
+            started += pool.prewarm(user_id, headless=headless)
+        except Exception as e:
+            logger.warning(f'預熱瀏覽器失敗 (user={user_id}): {str(e)}')
+    return started
@@ -0,0 +1,117 @@
+"""
+資料匯出
+社團、貼文數據與排程執行記錄以 StreamingHttpResponse 逐列輸出 NDJSON 或 CSV，
+資料以 values_list().iterator(chunk_size=...) 分批讀取，記憶體用量不隨筆數增加。
+"""
+
+import csv
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Community, ScheduleExecution, SocialMediaPost
+
+# 每個資料集：查詢、輸出欄位（values_list 的欄位名稱）
+EXPORTS = {
+    'communities': {
+        'queryset': lambda user: Community.objects.filter(user=user).order_by('id'),
+        'fields': (
+            'id', 'name', 'community_type', 'url', 'description', 'member_count', 'tags',
+            'is_active', 'is_public', 'last_activity', 'created_at', 'updated_at',
+        ),
+    },
+    'posts': {
+        'queryset': lambda user: SocialMediaPost.objects.filter(user=user).order_by('id'),
+        'fields': (
+            'id', 'platform', 'post_id', 'content', 'post_url', 'reach_count', 'like_count',
+            'share_count', 'view_time_seconds', 'save_count', 'comment_count', 'posted_at',
+            'data_collected_at', 'created_at', 'updated_at',
+        ),
+    },
+    'executions': {
+        'queryset': lambda user: ScheduleExecution.objects.filter(schedule__user=user).order_by('id'),
+        'fields': (
+            'id', 'schedule_id', 'schedule__name', 'status', 'scheduled_time', 'started_at',
+            'completed_at', 'execution_duration', 'posts_published', 'posts_failed',
+            'result_message', 'error_details', 'attempts', 'created_at',
+        ),
+    },
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def get_chunk_size():
+    return getattr(settings, 'CRAWLER_EXPORT_CHUNK_SIZE', 2000)
+
+
+def _to_text(value):
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        # 以當地時間輸出，方便在試算表中閱讀
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+# 試算表會把這些字元開頭的儲存格當成公式執行（CSV injection）
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value, ensure_ascii=False)
+    value = _to_text(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # 爬取到的社團名稱、貼文內容等可能以公式字元開頭，加上 ' 讓試算表視為文字
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """csv.writer 需要的檔案介面，直接回傳寫入的內容"""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(user, dataset):
+    export = EXPORTS[dataset]
+    fields = export['fields']
+    queryset = export['queryset'](user).values_list(*fields)
+    for row in queryset.iterator(chunk_size=get_chunk_size()):
+        yield fields, row
+
+
+def stream_ndjson(user, dataset):
+    for fields, row in iter_rows(user, dataset):
+        yield json.dumps(dict(zip(fields, map(_to_text, row))), ensure_ascii=False) + '\n'
+
+
+def stream_csv(user, dataset):
+    writer = csv.writer(_Echo())
+    fields = EXPORTS[dataset]['fields']
+    # BOM 讓 Excel 以 UTF-8 開啟中文
+    yield '\ufeff' + writer.writerow(fields)
+    for _, row in iter_rows(user, dataset):
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def export_response(user, dataset, export_format):
+    """建立匯出的串流回應；dataset 或 export_format 不支援時拋出 ValueError"""
+    if dataset not in EXPORTS:
+        raise ValueError(f'不支援的匯出資料: {dataset}')
+    if export_format not in FORMATS:
+        raise ValueError(f'不支援的匯出格式: {export_format}')
+
+    stream = stream_csv if export_format == 'csv' else stream_ndjson
+    response = StreamingHttpResponse(stream(user, dataset), content_type=FORMATS[export_format])
+    filename = f'{dataset}_{timezone.localtime():%Y%m%d_%H%M%S}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
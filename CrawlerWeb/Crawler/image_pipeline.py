@@ -0,0 +1,133 @@
+"""
+模板圖片正規化
+上傳的模板圖片在背景轉成「發文用」版本：依 EXIF 轉正、縮到平台建議尺寸、重新壓縮為 JPEG 並移除中繼資料。
+發文版本與原圖放在同一個目錄，檔名由原圖推導（abc.png -> abc_post.jpg），
+因此複製的圖片（只保存原圖網址）與共用同一個 ImageBlob 的圖片都能找到同一份發文版本。
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+RENDITION_SUFFIX = '_post.jpg'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_max_dimension():
+    return getattr(settings, 'CRAWLER_IMAGE_MAX_DIMENSION', 2048)
+
+
+def get_jpeg_quality():
+    return getattr(settings, 'CRAWLER_IMAGE_JPEG_QUALITY', 85)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'CRAWLER_IMAGE_RENDER_WORKERS', 2),
+                thread_name_prefix='image-render',
+            )
+        return _executor
+
+
+def rendition_name(original_name):
+    """由原圖檔名推導發文版本的檔名"""
+    root, _ = os.path.splitext(original_name)
+    return f'{root}{RENDITION_SUFFIX}'
+
+
+def is_rendition(path):
+    return path.endswith(RENDITION_SUFFIX)
+
+
+def get_post_ready_path(original_path):
+    """原圖的發文版本絕對路徑，尚未產生時回傳 None"""
+    if not original_path or is_rendition(original_path):
+        return None
+    path = rendition_name(original_path)
+    return path if os.path.isfile(path) else None
+
+
+def delete_rendition(original_path):
+    """刪除原圖時一併刪除發文版本"""
+    path = get_post_ready_path(original_path)
+    if path:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f'刪除發文版本圖片失敗 {path}: {str(e)}')
+
+
+def normalize_image(source_path, target_path):
+    """
+    產生發文版本，回傳是否有產生
+    動畫 GIF / WebP 保持原樣（轉成 JPEG 會失去動畫）
+    """
+    with Image.open(source_path) as image:
+        if image.format == 'GIF' or getattr(image, 'is_animated', False):
+            return False
+
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            # 透明背景填白後再轉 JPEG
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        max_dimension = get_max_dimension()
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        # 先寫暫存檔再替換；不傳 exif / icc_profile 即不保留中繼資料
+        temp_path = f'{target_path}.tmp'
+        image.save(temp_path, 'JPEG', quality=get_jpeg_quality(), optimize=True, progressive=True)
+        os.replace(temp_path, target_path)
+    return True
+
+
+def render_post_ready(image_id):
+    """產生指定模板圖片的發文版本並更新資料庫"""
+    from .models import PostTemplate, PostTemplateImage
+
+    image = PostTemplateImage.objects.filter(id=image_id).select_related('template').first()
+    if image is None or not image.image:
+        return None
+
+    original_name = image.image.name
+    target_name = rendition_name(original_name)
+    target_path = os.path.join(str(settings.MEDIA_ROOT), target_name)
+    # 內容相同的圖片共用檔案，發文版本已由其他模板圖片產生時直接使用
+    if not os.path.isfile(target_path) and not normalize_image(image.image.path, target_path):
+        return None
+
+    PostTemplateImage.objects.filter(id=image_id).update(post_ready=target_name)
+    # 發文版本改變了實際上傳的檔案，清除模板的圖片快取
+    PostTemplate.objects.filter(pk=image.template_id).update(media_bundle=None)
+    return target_name
+
+
+def _render_in_background(image_id):
+    try:
+        render_post_ready(image_id)
+    except Exception as e:
+        logger.error(f'產生模板圖片 {image_id} 的發文版本失敗: {str(e)}')
+    finally:
+        connection.close()
+
+
+def schedule_post_ready_render(image_id):
+    """交易提交後在背景執行緒產生發文版本，不阻塞 API 回應"""
+    transaction.on_commit(lambda: _get_executor().submit(_render_in_background, image_id))
@@ -0,0 +1,126 @@
+"""
+模板圖片儲存（依內容去重）
+上傳的圖片以 SHA-256 命名存放在 blobs/ 底下，內容相同的上傳與複製的模板圖片共用同一個 ImageBlob。
+ImageBlob.ref_count 記錄引用它的 PostTemplateImage 數量：建立模板圖片時加一，
+刪除時由 models 中的信號減一，歸零時刪除檔案（連同發文版本），不必掃描其他模板是否使用同一張圖片。
+"""
+
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .image_pipeline import delete_rendition
+from .models import ImageBlob, PostTemplateImage
+
+logger = logging.getLogger(__name__)
+
+
+def hash_upload(uploaded_file):
+    """計算上傳檔案的 SHA-256 與大小，計算後把檔案指標移回開頭"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest(), size
+
+
+def _acquire(**lookup):
+    """符合條件的 ImageBlob 引用次數加一並回傳，不存在時回傳 None"""
+    updated = ImageBlob.objects.filter(**lookup).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
+    if not updated:
+        return None
+    return ImageBlob.objects.get(**lookup)
+
+
+def acquire_blob_for_upload(uploaded_file):
+    """取得上傳檔案對應的 ImageBlob（引用次數已加一），內容已存在時不再寫入檔案"""
+    sha256, size = hash_upload(uploaded_file)
+    blob = _acquire(sha256=sha256)
+    if blob is not None:
+        return blob
+
+    blob = ImageBlob(sha256=sha256, size=size, ref_count=1)
+    blob.file.save(uploaded_file.name, uploaded_file, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+        return blob
+    except IntegrityError:
+        # 相同內容的另一個上傳先建立了 ImageBlob，改用既有的並刪除剛寫入的檔案
+        default_storage.delete(blob.file.name)
+        return _acquire(sha256=sha256)
+
+
+def acquire_blob_for_url(url):
+    """取得圖片網址（'/media/...'）對應的 ImageBlob（引用次數已加一），不是本站圖片檔案時回傳 None"""
+    media_url = settings.MEDIA_URL
+    if not url or not url.startswith(media_url):
+        return None
+    return _acquire(file=url[len(media_url):])
+
+
+def create_template_image(template, order, uploaded_file=None, url=None):
+    """
+    建立模板圖片並引用對應的 ImageBlob
+    上傳的圖片直接指向 blob 檔案；複製的圖片維持把網址保存在 alt_text 的做法
+    """
+    with transaction.atomic():
+        if uploaded_file is not None:
+            blob = acquire_blob_for_upload(uploaded_file)
+            return PostTemplateImage.objects.create(
+                template=template,
+                blob=blob,
+                image=blob.file.name,
+                order=order,
+            )
+
+        blob = acquire_blob_for_url(url)
+        return PostTemplateImage.objects.create(
+            template=template,
+            blob=blob,
+            image='',
+            order=order,
+            alt_text=blob.file.url if blob else (url or ''),
+        )
+
+
+def release_blob(blob_id):
+    """引用次數減一，交易提交後若已無引用則刪除檔案"""
+    ImageBlob.objects.filter(id=blob_id, ref_count__gt=0).update(
+        ref_count=F('ref_count') - 1,
+        updated_at=timezone.now(),
+    )
+    transaction.on_commit(lambda: delete_unreferenced_blob(blob_id))
+
+
+def delete_unreferenced_blob(blob_id):
+    """刪除沒有引用的 ImageBlob 與其檔案，回傳釋放的位元組數"""
+    with transaction.atomic():
+        # 鎖定後再確認引用次數，期間有新的引用則保留
+        blob = ImageBlob.objects.select_for_update().filter(id=blob_id, ref_count=0).first()
+        if blob is None:
+            return 0
+        references = blob.template_images.count()
+        if references:
+            # 引用次數與實際不符（例如手動修改資料），修正後保留
+            ImageBlob.objects.filter(id=blob_id).update(ref_count=references)
+            logger.warning(f'圖片檔案 {blob.sha256} 的引用次數不正確，已修正為 {references}')
+            return 0
+        name = blob.file.name
+        size = blob.size
+        blob.delete()
+
+    try:
+        delete_rendition(os.path.join(str(settings.MEDIA_ROOT), name))
+        default_storage.delete(name)
+    except Exception as e:
+        logger.warning(f'刪除圖片檔案失敗 {name}: {str(e)}')
+    return size
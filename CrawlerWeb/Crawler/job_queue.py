@@ -0,0 +1,274 @@
+"""
+排程執行工作佇列
+以 ScheduleExecution 資料表作為持久化佇列：派送器把到期的排程寫成 pending 記錄，
+執行器程序以「比較後設定」（status='pending' 才更新為 running）認領工作，
+兩個程序不會同時認領同一筆。SQLite 與 PostgreSQL 皆適用。
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ScheduleExecution
+from .schedule_timing import canonical_slot
+
+logger = logging.getLogger(__name__)
+
+# 在派送迴圈內直接執行時使用的執行程序名稱
+INLINE_WORKER_ID = 'inline'
+
+
+def get_lease_seconds():
+    """執行中的工作超過此秒數沒有心跳即視為執行器已死亡"""
+    return getattr(settings, 'CRAWLER_WORKER_LEASE_SECONDS', 300)
+
+
+def get_max_attempts():
+    return getattr(settings, 'CRAWLER_WORKER_MAX_ATTEMPTS', 2)
+
+
+def enqueue_execution(schedule, scheduled_time):
+    """
+    為排程的某個時間點建立 pending 執行記錄，回傳 (execution, created)
+    (schedule, slot) 有唯一約束：時間點已被佔用時插入直接失敗，改回傳既有記錄
+    """
+    slot = canonical_slot(scheduled_time)
+    try:
+        with transaction.atomic():
+            execution = ScheduleExecution.objects.create(
+                schedule=schedule,
+                scheduled_time=scheduled_time,
+                slot=slot,
+                status='pending'
+            )
+        return execution, True
+    except IntegrityError:
+        # 排程暫停或修改時間時取消、從未執行過的記錄重新放回佇列
+        revived = ScheduleExecution.objects.filter(
+            schedule=schedule,
+            slot=slot,
+            status='cancelled',
+            attempts=0
+        ).update(
+            status='pending',
+            scheduled_time=scheduled_time,
+            completed_at=None,
+            result_message='',
+            updated_at=timezone.now()
+        )
+        return ScheduleExecution.objects.get(schedule=schedule, slot=slot), revived == 1
+
+
+def sync_pending_executions(schedule):
+    """
+    排程啟用、暫停、取消或修改時間後同步佇列中的 pending 記錄：
+    不再對應下次執行時間的記錄標記為取消，活躍排程的下次執行時間補上 pending 記錄
+    """
+    now = timezone.now()
+    next_slot = None
+    if schedule.is_active and schedule.status == 'active' and schedule.next_execution_at:
+        next_slot = canonical_slot(schedule.next_execution_at)
+
+    stale = ScheduleExecution.objects.filter(schedule=schedule, status='pending')
+    if next_slot is not None:
+        stale = stale.exclude(slot=next_slot)
+    cancelled = stale.update(
+        status='cancelled',
+        completed_at=now,
+        result_message='排程已變更，取消原定執行',
+        updated_at=now
+    )
+
+    if next_slot is not None:
+        enqueue_execution(schedule, schedule.next_execution_at)
+    return cancelled
+
+
+def claim_slot(schedule, scheduled_time, worker_id):
+    """
+    直接以 running 狀態插入執行記錄來認領時間點，回傳 execution；時間點已被佔用時回傳 None
+    既有記錄仍是 pending（例如建立排程時預先寫入的記錄）或是從未執行就被取消時改以比較後設定認領
+    """
+    slot = canonical_slot(scheduled_time)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            return ScheduleExecution.objects.create(
+                schedule=schedule,
+                scheduled_time=scheduled_time,
+                slot=slot,
+                status='running',
+                worker_id=worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=1
+            )
+    except IntegrityError:
+        pass
+
+    existing, _ = enqueue_execution(schedule, scheduled_time)
+    if existing.status == 'pending' and claim_execution(existing.id, worker_id):
+        existing.refresh_from_db()
+        return existing
+    return None
+
+
+def claim_execution(execution_id, worker_id):
+    """以比較後設定認領指定的執行記錄，成功回傳 True"""
+    now = timezone.now()
+    claimed = ScheduleExecution.objects.filter(
+        id=execution_id,
+        status='pending'
+    ).update(
+        status='running',
+        worker_id=worker_id,
+        started_at=now,
+        heartbeat_at=now,
+        attempts=F('attempts') + 1,
+        updated_at=now
+    )
+    return claimed == 1
+
+
+def claim_next_execution(worker_id, batch_size=10):
+    """認領最早到期的 pending 執行記錄（只限活躍的排程），沒有可認領的工作時回傳 None"""
+    candidate_ids = list(
+        ScheduleExecution.objects.filter(
+            status='pending',
+            scheduled_time__lte=timezone.now(),
+            schedule__is_active=True,
+            schedule__status='active'
+        ).order_by('scheduled_time').values_list('id', flat=True)[:batch_size]
+    )
+
+    for execution_id in candidate_ids:
+        if claim_execution(execution_id, worker_id):
+            return ScheduleExecution.objects.select_related('schedule', 'schedule__user', 'schedule__template').get(id=execution_id)
+    return None
+
+
+def heartbeat(execution_id, worker_id):
+    """更新執行中工作的心跳時間，回傳此工作是否仍屬於該執行器"""
+    return ScheduleExecution.objects.filter(
+        id=execution_id,
+        worker_id=worker_id,
+        status='running'
+    ).update(heartbeat_at=timezone.now()) == 1
+
+
+def _requeue(queryset, reason):
+    """
+    把執行中的工作放回佇列，已達嘗試上限者標記為失敗
+    重新執行時依 target_progress 略過已發文的社團（見 ExecutionProgress）
+    """
+    now = timezone.now()
+    failed = queryset.filter(attempts__gte=get_max_attempts()).update(
+        status='failed',
+        completed_at=now,
+        error_details=f'{reason}，已達重試上限',
+        updated_at=now
+    )
+    requeued = queryset.filter(attempts__lt=get_max_attempts()).update(
+        status='pending',
+        worker_id='',
+        heartbeat_at=None,
+        updated_at=now
+    )
+    return requeued, failed
+
+
+def reclaim_worker_executions(worker_id):
+    """執行器程序結束時，回收它正在處理的工作"""
+    return _requeue(
+        ScheduleExecution.objects.filter(status='running', worker_id=worker_id),
+        f'執行程序 {worker_id} 中斷'
+    )
+
+
+def reclaim_stale_executions():
+    """
+    回收心跳逾時的工作（執行器當機或被強制結束）
+    在派送迴圈內直接執行（worker_id='inline'）的工作沒有心跳，不回收
+    """
+    stale_before = timezone.now() - timedelta(seconds=get_lease_seconds())
+    return _requeue(
+        ScheduleExecution.objects.filter(
+            status='running',
+            heartbeat_at__lt=stale_before
+        ).exclude(worker_id__in=['', INLINE_WORKER_ID]),
+        '執行程序心跳逾時'
+    )
+
+
+def cancel_expired_executions(grace):
+    """
+    取消從未執行且已錯過時間點太久的 pending 記錄
+    （例如派送器停機期間累積的記錄，避免重新啟動後補發過時的貼文）
+    只在派送器啟動、執行程序開始認領之前呼叫；執行期間等待空閒執行程序的記錄不可取消
+    """
+    now = timezone.now()
+    return ScheduleExecution.objects.filter(
+        status='pending',
+        attempts=0,
+        scheduled_time__lt=now - grace
+    ).update(
+        status='cancelled',
+        completed_at=now,
+        result_message='錯過執行時間，已取消',
+        updated_at=now
+    )
+
+
+class ExecutionProgress:
+    """
+    記錄執行中每個社團的發文進度（保存在 ScheduleExecution.target_progress）
+    工作被回收後重新執行時，已成功的社團不再發文；
+    發文到一半被中斷（狀態仍為 started）的社團可能已經送出，同樣不再發文，改記為失敗
+    """
+
+    STARTED = 'started'
+    SUCCESS = 'success'
+    FAILED = 'failed'
+
+    def __init__(self, execution):
+        self.execution_id = execution.id
+        self.targets = dict(execution.target_progress or {})
+        self._lock = threading.Lock()
+
+    def split(self, communities):
+        """
+        把社團分成 (待發文, 已處理)，communities 為 normalize_communities 的結果
+        已處理的社團回傳 (success_count, failed_count)
+        """
+        remaining = []
+        success_count = 0
+        failed_count = 0
+        for community in communities:
+            state = self.targets.get(community['url'])
+            if state == self.SUCCESS:
+                success_count += 1
+            elif state == self.STARTED:
+                failed_count += 1
+            else:
+                remaining.append(community)
+        if success_count or failed_count:
+            logger.info(f'執行記錄 {self.execution_id} 重新執行：略過已發文 {success_count} 個、中斷 {failed_count} 個社團')
+        return remaining, (success_count, failed_count)
+
+    def mark(self, url, state):
+        """更新單一社團的進度並立即寫入資料庫（多個發文執行緒共用）"""
+        with self._lock:
+            self.targets[url] = state
+            ScheduleExecution.objects.filter(id=self.execution_id).update(
+                target_progress=dict(self.targets),
+                updated_at=timezone.now()
+            )
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.targets)
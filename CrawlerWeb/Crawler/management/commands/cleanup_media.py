@@ -0,0 +1,89 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from Crawler.media_gc import collect_media_garbage
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '清理沒有被任何模板引用的圖片檔案'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='忽略目錄索引，重新列出所有目錄',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='只統計可以刪除的檔案，不實際刪除',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=None,
+            help='檔案未被引用超過此時數才刪除，預設讀取 CRAWLER_MEDIA_GC_GRACE_HOURS',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='每批刪除的檔案數量，預設讀取 CRAWLER_MEDIA_GC_BATCH_SIZE',
+        )
+        parser.add_argument(
+            '--continuous',
+            action='store_true',
+            help='持續運行模式（在背景定期清理）',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=3600,
+            help='持續運行模式的清理間隔（秒），預設3600秒',
+        )
+
+    def handle(self, *args, **options):
+        grace_hours = options['grace_hours']
+        kwargs = {
+            'grace_period': timedelta(hours=grace_hours) if grace_hours is not None else None,
+            'batch_size': options['batch_size'],
+            'full_scan': options['full'],
+            'dry_run': options['dry_run'],
+        }
+
+        if not options['continuous']:
+            self.report(collect_media_garbage(**kwargs), options['dry_run'])
+            return
+
+        self.stdout.write(f'圖片清理已啟動，每 {options["interval"]} 秒執行一次')
+        while True:
+            try:
+                self.report(collect_media_garbage(**kwargs), options['dry_run'])
+                # 只有第一次需要完整掃描
+                kwargs['full_scan'] = False
+                connections.close_all()
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('圖片清理已停止')
+                break
+            except Exception as e:
+                logger.error(f'圖片清理錯誤: {str(e)}')
+                self.stdout.write(f'錯誤: {str(e)}')
+                time.sleep(options['interval'])
+
+    def report(self, stats, dry_run):
+        action = '可刪除' if dry_run else '已刪除'
+        self.stdout.write(
+            f'檢查 {stats["directories"]} 個目錄（列出 {stats["listed_directories"]} 個），'
+            f'新發現 {stats["new_orphans"]} 個未引用檔案'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {stats["deleted_files"]} 個檔案、{stats["deleted_blobs"]} 個圖片檔案記錄，'
+            f'共 {stats["reclaimed_bytes"] / 1024 / 1024:.2f} MB（{stats["reclaimed_bytes"]} 位元組）'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from Crawler.chromedriver_resolver import (
+    get_installed_chrome_version, get_manifest_path, load_manifest, resolve_chromedriver
+)
+
+
+class Command(BaseCommand):
+    help = '解析 ChromeDriver 並更新版本清單'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='忽略現有清單，重新下載並解析 ChromeDriver',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'已安裝的 Chrome 版本: {get_installed_chrome_version() or "未知"}')
+
+        driver_path = resolve_chromedriver(allow_download=True, force=options['force'])
+        manifest = load_manifest() or {}
+
+        self.stdout.write(self.style.SUCCESS(f'ChromeDriver 路徑: {driver_path}'))
+        self.stdout.write(f'ChromeDriver 版本: {manifest.get("driver_version") or "未知"}')
+        self.stdout.write(f'版本清單: {get_manifest_path()}')
@@ -1,9 +1,19 @@
 from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from Crawler.models import Schedule, ScheduleExecution
+from Crawler.models import Schedule
+from Crawler.schedule_timing import FireTimeQueue
+from Crawler import job_queue, waits
+from Crawler.attachments import attach_images, resolve_image_paths
+from Crawler.driver_pool import prewarm_for_upcoming_schedules
+from Crawler.media_bundle import get_bundle_paths
 from datetime import datetime, timedelta
 import logging
+import os
+import socket
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
@@ -11,6 +21,9 @@ from selenium.webdriver.common.by import By
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# 執行器啟動或延遲時，仍會補執行錯過不超過此時間的排程
+MISFIRE_GRACE = timedelta(minutes=5)
+
 class Command(BaseCommand):
     help = '執行排程發文檢查和執行'
 
@@ -18,33 +31,86 @@ class Command(BaseCommand):
         parser.add_argument(
             '--continuous',
             action='store_true',
-            help='持續運行模式（每分鐘檢查一次）',
+            help='持續運行模式（睡到下一個排程到期時間才執行）',
         )
         parser.add_argument(
             '--interval',
             type=int,
             default=60,
-            help='檢查間隔（秒），預設60秒',
+            help='檢查排程設定是否變更的間隔（秒），預設60秒',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='執行器程序數量（僅持續運行模式），0 表示在派送迴圈內直接執行，預設讀取 CRAWLER_SCHEDULER_WORKERS',
         )
 
     def handle(self, *args, **options):
+        # 啟動時解析一次 ChromeDriver，執行排程時不再連網
+        from Crawler.chromedriver_resolver import resolve_chromedriver
+        try:
+            resolve_chromedriver(allow_download=True)
+        except Exception as e:
+            logger.error(f'解析 ChromeDriver 失敗: {str(e)}')
+            self.stdout.write(f'解析 ChromeDriver 失敗: {str(e)}')
+        
         if options['continuous']:
+            workers = options['workers']
+            if workers is None:
+                workers = getattr(settings, 'CRAWLER_SCHEDULER_WORKERS', 0)
             self.stdout.write('開始持續運行排程執行器...')
-            self.run_continuous_scheduler(options['interval'])
+            self.run_continuous_scheduler(options['interval'], workers)
         else:
             self.stdout.write('執行單次排程檢查...')
             self.run_single_check()
 
-    def run_continuous_scheduler(self, interval):
-        """持續運行排程執行器"""
+    def run_continuous_scheduler(self, interval, workers=0):
+        """
+        持續運行排程執行器
+        以每個排程的 next_execution_at 建立優先佇列，只在下一個到期時間醒來；
+        排程設定變更時才重新讀取該排程的觸發時間。
+        workers > 0 時本程序只負責派送（寫入 pending 執行記錄），由執行器程序認領執行
+        """
         import time
         
+        self.worker_processes = {}
+        if workers > 0:
+            self.start_workers(workers)
+        
+        fire_queue = FireTimeQueue()
+        last_sync = timezone.now()
+        self.load_schedule_queue(fire_queue)
+        
         while True:
             try:
-                self.run_single_check()
-                self.stdout.write(f'等待 {interval} 秒後進行下次檢查...')
-                time.sleep(interval)
+                now = timezone.now()
+                for schedule_id, fire_time in fire_queue.pop_due(now):
+                    schedule = Schedule.objects.filter(id=schedule_id, is_active=True, status='active').first()
+                    if schedule is None:
+                        # 排程已刪除或停用
+                        continue
+                    fire_queue.upsert(schedule.id, self.run_due_schedule(schedule, fire_time, enqueue_only=workers > 0))
+                
+                if workers > 0:
+                    self.supervise_workers()
+                else:
+                    # 在派送迴圈內直接執行時，為即將到期的排程預先啟動瀏覽器
+                    prewarm_for_upcoming_schedules()
+                
+                # 睡到下一個到期時間，但最多 interval 秒就要檢查排程是否變更
+                sleep_seconds = interval
+                next_fire_time = fire_queue.peek_time()
+                if next_fire_time is not None:
+                    sleep_seconds = min(interval, max(0.0, (next_fire_time - timezone.now()).total_seconds()))
+                    self.stdout.write(f'下一個排程時間: {timezone.localtime(next_fire_time)}，等待 {sleep_seconds:.0f} 秒')
+                time.sleep(sleep_seconds)
+                
+                sync_started = timezone.now()
+                self.sync_changed_schedules(fire_queue, last_sync)
+                last_sync = sync_started
             except KeyboardInterrupt:
+                self.stop_workers()
                 self.stdout.write('排程執行器已停止')
                 break
             except Exception as e:
@@ -52,211 +118,266 @@ class Command(BaseCommand):
                 self.stdout.write(f'錯誤: {str(e)}')
                 time.sleep(interval)
 
-    def run_single_check(self):
-        """執行單次排程檢查"""
-        # 使用本地時間而不是 UTC 時間
-        now = timezone.now()
-        local_now = now.astimezone()  # 轉換為本地時間
-        self.stdout.write(f'本地時間: {local_now}')
+    def start_workers(self, count):
+        """以 spawn 方式啟動執行器程序（不繼承父程序的資料庫連線與瀏覽器）"""
+        import multiprocessing
+        
+        self.worker_context = multiprocessing.get_context('spawn')
+        self.worker_stop_event = self.worker_context.Event()
+        self.worker_poll_interval = getattr(settings, 'CRAWLER_WORKER_POLL_INTERVAL', 5)
+        
+        # 前次執行遺留、沒有心跳的工作先放回佇列
+        job_queue.reclaim_stale_executions()
+        # 派送器停機期間累積、啟動時已過期的記錄只在這裡清除一次；
+        # 執行期間 pending 記錄可能只是在等待空閒的執行程序，不能因為等太久而取消
+        expired = job_queue.cancel_expired_executions(MISFIRE_GRACE)
+        if expired:
+            self.stdout.write(f'取消 {expired} 個錯過執行時間的工作')
+        connections.close_all()
+        
+        # 多台主機或多個派送器共用佇列時，執行程序名稱必須唯一，回收工作時才不會動到其他派送器的工作
+        worker_prefix = f'{socket.gethostname()[:60]}-{os.getpid()}'
+        for index in range(count):
+            self.start_worker(f'{worker_prefix}-worker-{index}')
+        self.stdout.write(f'已啟動 {count} 個執行器程序')
+
+    def start_worker(self, worker_id):
+        from Crawler.schedule_worker import worker_main
+        
+        process = self.worker_context.Process(
+            target=worker_main,
+            args=(worker_id, self.worker_poll_interval, job_queue.get_lease_seconds(), self.worker_stop_event),
+            name=f'scheduler-{worker_id}',
+            daemon=True,
+        )
+        process.start()
+        self.worker_processes[worker_id] = process
+
+    def supervise_workers(self):
+        """重新啟動已死亡的執行器程序，並回收它們及心跳逾時的工作"""
+        for worker_id, process in list(self.worker_processes.items()):
+            if process.is_alive():
+                continue
+            requeued, failed = job_queue.reclaim_worker_executions(worker_id)
+            logger.warning(f'執行器程序 {worker_id} 已結束 (exitcode={process.exitcode})，放回 {requeued} 個工作，{failed} 個標記失敗')
+            self.stdout.write(f'重新啟動執行器程序 {worker_id}')
+            self.start_worker(worker_id)
         
-        # 獲取所有活躍的排程
+        requeued, failed = job_queue.reclaim_stale_executions()
+        if requeued or failed:
+            logger.warning(f'回收心跳逾時的工作：放回 {requeued} 個，{failed} 個標記失敗')
+
+    def stop_workers(self):
+        """
+        通知執行器程序結束並等待它們完成手上的工作（不在發文途中強制終止）
+        等待期間再按一次 Ctrl+C 會直接結束，未完成的工作依心跳逾時回收，重新執行時略過已發文的社團
+        """
+        if not self.worker_processes:
+            return
+        self.worker_stop_event.set()
+        self.stdout.write('等待執行器程序完成目前的工作...')
+        for process in self.worker_processes.values():
+            process.join()
+        for worker_id in self.worker_processes:
+            job_queue.reclaim_worker_executions(worker_id)
+        self.worker_processes = {}
+
+    def load_schedule_queue(self, fire_queue):
+        """啟動時載入所有活躍排程的下次執行時間"""
         active_schedules = Schedule.objects.filter(
             is_active=True,
-            status='active'
-        )
+            status='active',
+            next_execution_at__isnull=False
+        ).values_list('id', 'next_execution_at')
         
-        executed_count = 0
-        for schedule in active_schedules:
+        for schedule_id, next_execution_at in active_schedules:
+            fire_queue.upsert(schedule_id, next_execution_at)
+        self.stdout.write(f'已載入 {len(fire_queue)} 個排程')
+
+    def sync_changed_schedules(self, fire_queue, since):
+        """只重新讀取自上次同步後有變更的排程"""
+        changed_schedules = Schedule.objects.filter(
+            updated_at__gte=since
+        ).values_list('id', 'is_active', 'status', 'next_execution_at')
+        
+        for schedule_id, is_active, status, next_execution_at in changed_schedules:
+            if is_active and status == 'active':
+                fire_queue.upsert(schedule_id, next_execution_at)
+            else:
+                fire_queue.remove(schedule_id)
+
+    def run_due_schedule(self, schedule, fire_time, enqueue_only=False):
+        """
+        執行（或只排入佇列）到期的排程並推進 next_execution_at，回傳新的下次執行時間
+        錯過超過 MISFIRE_GRACE 的時間點（例如執行器停機期間）不補執行
+        """
+        now = timezone.now()
+        
+        if fire_time < now - MISFIRE_GRACE:
+            self.stdout.write(f'排程 {schedule.id} 錯過時間 {timezone.localtime(fire_time):%Y-%m-%d %H:%M}，跳過')
+        elif enqueue_only:
+            execution, created = job_queue.enqueue_execution(schedule, fire_time)
+            if execution.status == 'pending':
+                self.stdout.write(f'排程 {schedule.id} 已排入佇列 ({timezone.localtime(fire_time):%H:%M})')
+            else:
+                self.stdout.write(f'排程 {schedule.id} 在時間 {timezone.localtime(fire_time):%H:%M} 已經執行過，跳過')
+        else:
             try:
-                if self.should_execute_schedule(schedule, local_now):
-                    self.execute_schedule(schedule, now)  # 執行記錄仍使用 UTC 時間
-                    executed_count += 1
+                self.execute_schedule(schedule, fire_time)
             except Exception as e:
                 logger.error(f'執行排程 {schedule.id} 時發生錯誤: {str(e)}')
                 self.stdout.write(f'排程 {schedule.id} 執行失敗: {str(e)}')
         
-        self.stdout.write(f'本次檢查完成，執行了 {executed_count} 個排程')
+        return schedule.advance_next_execution(max(fire_time, timezone.now() - MISFIRE_GRACE))
 
-    def should_execute_schedule(self, schedule, now):
-        """檢查排程是否應該執行"""
-        # 檢查是否為執行日期
-        current_weekday = now.strftime('%A').lower()
-        if current_weekday not in schedule.execution_days:
-            return False
-        
-        # 檢查當前時間點是否已經執行過這個排程
-        from datetime import timedelta
-        
-        # 檢查是否為執行時間
-        current_time = now.time()
-        time_matched = False
-        matched_time_str = None
-        
-        for time_str in schedule.posting_times:
-            try:
-                schedule_time = datetime.strptime(time_str, '%H:%M').time()
-                # 如果當前時間在排程時間的5分鐘內，則執行
-                time_diff = abs((current_time.hour * 60 + current_time.minute) - 
-                               (schedule_time.hour * 60 + schedule_time.minute))
-                if time_diff <= 5:  # 5分鐘的容錯時間
-                    time_matched = True
-                    matched_time_str = time_str
-                    break
-            except ValueError:
-                continue
-        
-        if not time_matched:
-            return False
+    def run_single_check(self):
+        """執行單次排程檢查：以 next_execution_at 範圍查詢取出到期的排程"""
+        now = timezone.now()
+        self.stdout.write(f'本地時間: {timezone.localtime(now)}')
         
-        # 檢查這個特定時間點是否已經執行過
-        # 計算當前時間點的前後5分鐘範圍
-        current_minutes = current_time.hour * 60 + current_time.minute
+        due_schedules = Schedule.objects.filter(
+            is_active=True,
+            status='active',
+            next_execution_at__lte=now
+        ).order_by('next_execution_at')
         
-        for time_str in schedule.posting_times:
+        executed_count = 0
+        for schedule in due_schedules:
             try:
-                schedule_time = datetime.strptime(time_str, '%H:%M').time()
-                schedule_minutes = schedule_time.hour * 60 + schedule_time.minute
-                
-                # 如果時間差在5分鐘內，檢查是否已執行
-                if abs(current_minutes - schedule_minutes) <= 5:
-                    # 檢查這個時間範圍是否已經執行過
-                    time_start = now.replace(hour=schedule_time.hour, minute=schedule_time.minute, second=0, microsecond=0)
-                    time_end = time_start + timedelta(minutes=10)  # 10分鐘的執行窗口
-                    
-                    from Crawler.models import ScheduleExecution
-                    existing_execution = ScheduleExecution.objects.filter(
-                        schedule=schedule,
-                        scheduled_time__gte=time_start,
-                        scheduled_time__lt=time_end,
-                        status__in=['started', 'completed', 'failed']
-                    ).first()
-                    
-                    if existing_execution:
-                        self.stdout.write(f'排程 {schedule.id} 在時間 {time_str} 已經執行過，跳過')
-                        return False
-                    
-            except ValueError:
-                continue
+                fire_time = schedule.next_execution_at
+                self.run_due_schedule(schedule, fire_time)
+                if fire_time >= now - MISFIRE_GRACE:
+                    executed_count += 1
+            except Exception as e:
+                logger.error(f'執行排程 {schedule.id} 時發生錯誤: {str(e)}')
+                self.stdout.write(f'排程 {schedule.id} 執行失敗: {str(e)}')
         
-        return True
+        self.stdout.write(f'本次檢查完成，執行了 {executed_count} 個排程')
+
+    def execute_schedule(self, schedule, fire_time):
+        """在目前程序內直接執行排程（與執行器程序相同的認領流程）"""
+        execution = job_queue.claim_slot(schedule, fire_time, job_queue.INLINE_WORKER_ID)
+        if execution is None:
+            self.stdout.write(f'排程 {schedule.id} 在時間 {timezone.localtime(fire_time):%H:%M} 已經執行過，跳過')
+            return
+        self.run_execution(execution)
 
-    def execute_schedule(self, schedule, now):
-        """執行排程"""
+    def run_execution(self, execution):
+        """執行已認領（status=running）的執行記錄"""
+        # 認領後到發文前排程可能已被暫停或取消，重新讀取狀態
+        schedule = Schedule.objects.select_related('user', 'template').get(id=execution.schedule_id)
+        execution.schedule = schedule
+        if not schedule.is_active or schedule.status != 'active':
+            execution.mark_as_cancelled('排程已暫停或取消，未執行')
+            self.stdout.write(f'排程 {schedule.id} 已暫停或取消，跳過執行')
+            return
         self.stdout.write(f'執行排程: {schedule.name}')
         
-        # 創建執行記錄
-        execution = ScheduleExecution.objects.create(
-            schedule=schedule,
-            scheduled_time=now,
-            status='started'
-        )
-        
+        # 重新執行（工作被回收後）時略過已發文的社團
+        progress = job_queue.ExecutionProgress(execution)
         try:
-            # 標記為開始執行
-            execution.mark_as_started()
-            
-            # 執行發文邏輯
-            success_count = self.post_to_communities(schedule)
+            # 執行發文邏輯（多個社團平行發文）
+            report, (skipped_success, skipped_failed) = self.post_to_communities(schedule, progress)
+            success_count = report.success_count + skipped_success
+            failed_count = report.failed_count + skipped_failed
+            execution.target_progress = progress.snapshot()
             
             # 更新執行記錄
             if success_count > 0:
-                execution.mark_as_completed()
-                execution.posts_published = success_count
-                self.stdout.write(f'排程執行成功，發布了 {success_count} 個貼文')
+                execution.mark_as_completed(
+                    success_count=success_count,
+                    failure_count=failed_count,
+                    message=f'成功 {success_count} 個，失敗 {failed_count} 個'
+                )
+                self.stdout.write(f'排程執行成功，發布了 {success_count} 個貼文，失敗 {failed_count} 個')
             else:
-                execution.mark_as_failed()
-                execution.posts_failed = len(schedule.target_communities)
+                execution.posts_failed = failed_count or len(schedule.target_communities)
+                execution.mark_as_failed('沒有成功發布任何貼文')
                 self.stdout.write('排程執行失敗，沒有成功發布任何貼文')
             
-            # 更新排程統計
-            schedule.total_executions += 1
-            if execution.status == 'completed':
-                schedule.successful_executions += 1
-            else:
-                schedule.failed_executions += 1
-            schedule.last_execution_time = now
-            schedule.save()
-            
         except Exception as e:
-            execution.mark_as_failed()
+            execution.target_progress = progress.snapshot()
             execution.posts_failed = len(schedule.target_communities)
+            execution.mark_as_failed(str(e))
             logger.error(f'排程執行異常: {str(e)}')
             self.stdout.write(f'排程執行異常: {str(e)}')
+        
+        waits.get_wait_recorder().log_summary('排程發文等待耗時統計（累計）')
+        
+        # 更新排程統計（多個程序可能同時更新，使用 F() 原子遞增）
+        succeeded = execution.status == 'completed'
+        Schedule.objects.filter(id=schedule.id).update(
+            total_executions=F('total_executions') + 1,
+            successful_executions=F('successful_executions') + (1 if succeeded else 0),
+            failed_executions=F('failed_executions') + (0 if succeeded else 1),
+            last_execution_time=execution.scheduled_time
+        )
 
-    def post_to_communities(self, schedule):
-        """向社群發布貼文 - 使用與立即發文相同的邏輯"""
+    def post_to_communities(self, schedule, progress):
+        """
+        向社群發布貼文 - 使用與立即發文相同的邏輯
+        回傳 (PostingReport, (略過的成功數, 略過的失敗數))；progress 記錄每個社團的進度，重新執行時略過已處理的社團
+        """
         from Crawler.views import FacebookAutomationView
+        from Crawler.posting_engine import ParallelPostingEngine, PostingReport, normalize_communities
         
-        success_count = 0
+        # 創建 Facebook 自動化視圖實例
+        facebook_view = FacebookAutomationView()
         
+        # 獲取用戶的 Cookie
+        from Accounts.models import WebsiteCookie
         try:
-            # 創建 Facebook 自動化視圖實例
-            facebook_view = FacebookAutomationView()
-            
-            # 獲取用戶的 Cookie
-            from Accounts.models import WebsiteCookie
+            website_cookie = WebsiteCookie.objects.get(
+                user=schedule.user,
+                website=schedule.platform,
+                is_active=True
+            )
+        except WebsiteCookie.DoesNotExist:
+            self.stdout.write(f'用戶 {schedule.user.username} 沒有 {schedule.platform} 的 Cookie')
+            report = PostingReport(normalize_communities(schedule.target_communities))
+            report.fill_missing('沒有可用的 Cookie')
+            return report, (0, 0)
+        
+        # 有關聯模板時使用模板的圖片快取（圖片變更才重建），否則解析排程中保存的圖片網址
+        if schedule.template_id:
+            image_paths = get_bundle_paths(schedule.template)
+        else:
+            image_paths = resolve_image_paths(schedule.template_images)
+        
+        communities, skipped = progress.split(normalize_communities(schedule.target_communities))
+        
+        def post_one(driver, community):
+            # 送出前先記錄為 started，程序在發文途中死亡時重試不會重複發文
+            progress.mark(community['url'], progress.STARTED)
             try:
-                website_cookie = WebsiteCookie.objects.get(
-                    user=schedule.user,
-                    website=schedule.platform,
-                    is_active=True
+                success = self.post_single_community_improved(
+                    driver,
+                    community,
+                    schedule.message_content,
+                    image_paths,
+                    facebook_view,
+                    schedule.typing_mode
                 )
-            except WebsiteCookie.DoesNotExist:
-                self.stdout.write(f'用戶 {schedule.user.username} 沒有 {schedule.platform} 的 Cookie')
-                return 0
-            
-            # 設置驅動程式（使用無痕模式）
-            driver = facebook_view._setup_driver(headless=True)  # 排程執行使用 headless 模式
-            
-            try:
-                # 登入 Facebook
-                driver.get("https://www.facebook.com/")
-                
-                # 添加 Cookie
-                for name, value in website_cookie.cookie_data.items():
-                    driver.add_cookie({'name': name, 'value': value})
-                
-                driver.refresh()
-                import time
-                time.sleep(2)
-                
-                # 向每個目標社群發布貼文
-                for community_data in schedule.target_communities:
-                    try:
-                        community_url = community_data.get('url')
-                        if not community_url:
-                            continue
-                        
-                        # 前往社群並發布貼文
-                        success = self.post_single_community_improved(
-                            driver, 
-                            community_data, 
-                            schedule.message_content,
-                            schedule.template_images,
-                            facebook_view
-                        )
-                        
-                        if success:
-                            success_count += 1
-                        
-                        # 人類化延遲
-                        facebook_view.human_delay(1.5, 3.0)
-                        
-                    except Exception as e:
-                        logger.error(f'向社群 {community_data.get("name", "未知")} 發布失敗: {str(e)}')
-                        continue
-                
-            finally:
-                driver.quit()
-                
-        except Exception as e:
-            logger.error(f'發布貼文時發生錯誤: {str(e)}')
+            except Exception:
+                progress.mark(community['url'], progress.FAILED)
+                raise
+            progress.mark(community['url'], progress.SUCCESS if success else progress.FAILED)
+            return success
         
-        return success_count
+        # 目標社群分散到多個 headless 瀏覽器平行發文（瀏覽器從池中借用）
+        report = ParallelPostingEngine().run(
+            schedule.user_id,
+            communities,
+            prepare_session=lambda driver: facebook_view._login_with_cookies(driver, website_cookie.cookie_data),
+            post_one=post_one,
+            pace=lambda: facebook_view.human_delay(1.5, 3.0, label='between_communities'),
+            headless=True,
+        )
+        return report, skipped
 
     # 舊的發文方法已移除，現在使用 post_single_community_improved
 
-    def post_single_community_improved(self, driver, community_data, message, template_images, facebook_view):
+    def post_single_community_improved(self, driver, community_data, message, image_paths, facebook_view, typing_mode=None):
         """向單個社群發布貼文 - 使用與立即發文相同的人類化邏輯"""
         try:
             from selenium.webdriver.common.by import By
@@ -266,6 +387,7 @@ class Command(BaseCommand):
             community_url = community_data.get('url')
             driver.get(community_url)
             driver.refresh()
+            waits.wait_for_document_ready(driver, label='community_page')
             
             # 等待發文按鈕出現
             element = WebDriverWait(driver, 30).until(
@@ -302,24 +424,26 @@ class Command(BaseCommand):
             
             # 人類化的鼠標移動和文字輸入
             facebook_view.human_move_mouse(driver, post_input)
-            facebook_view.human_type(post_input, message)
+            facebook_view.human_type(post_input, message, mode=typing_mode)
             
             # 隨機人類行為
             facebook_view.random_human_behavior(driver)
             
             # 上傳圖片（如果有的話）
-            if template_images:
-                self.upload_images_improved(driver, template_images, facebook_view)
+            if image_paths:
+                self.upload_images_improved(driver, image_paths, facebook_view)
             
             # 點擊發文按鈕
             submit_button = driver.find_element(
                 By.XPATH,
                 '/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[3]/div[1]/div/div'
             )
+            # 等待發文完成：發文對話框關閉且送出的請求（含圖片上傳）都已結束
+            composer = submit_button.find_element(By.XPATH, './ancestor::form')
+            waits.track_requests(driver)
             submit_button.click()
-            
-            # 等待發文完成
-            facebook_view.human_delay(2.0, 3.0)
+            if not waits.wait_for_submission(driver, composer, label='after_submit'):
+                logger.warning('等待貼文送出完成逾時')
             
             return True
             
@@ -327,12 +451,10 @@ class Command(BaseCommand):
             logger.error(f'向社群發布貼文失敗: {str(e)}')
             return False
 
-    def upload_images_improved(self, driver, template_images, facebook_view):
-        """上傳圖片 - 使用與立即發文相同的邏輯"""
+    def upload_images_improved(self, driver, image_paths, facebook_view):
+        """上傳圖片（image_paths 為已解析的絕對路徑）- 使用與立即發文相同的邏輯"""
         try:
             from selenium.webdriver.common.by import By
-            import os
-            from django.conf import settings
             
             # 上傳圖片按鈕
             post_img_but = WebDriverWait(driver, 30).until(
@@ -344,7 +466,7 @@ class Command(BaseCommand):
                 )
             )
             post_img_but.click()
-            facebook_view.human_delay(2.0, 3.0)
+            facebook_view.human_delay(0.5, 1.0, label='open_image_dialog')
             # 隨機點一個地方
             post_click = WebDriverWait(driver, 30).until(
                 EC.any_of(
@@ -370,28 +492,8 @@ class Command(BaseCommand):
             )
 
             
-            # 處理每張圖片
-            for img_data in template_images:
-                try:
-                    if isinstance(img_data, dict) and 'url' in img_data:
-                        img_path = img_data['url']
-                    else:
-                        img_path = str(img_data)
-                    
-                    # 轉換圖片路徑為絕對路徑
-                    if img_path.startswith('/media/'):
-                        relative_path = img_path.replace('/media/', '')
-                        relative_path = relative_path.replace('/', os.sep)
-                        absolute_path = os.path.join(settings.BASE_DIR, 'media', relative_path)
-                        
-                        if os.path.exists(absolute_path):
-                            post_img.send_keys(absolute_path)
-                            facebook_view.human_delay(2.0, 3.0)
-                    
-
-                except Exception as e:
-                    logger.error(f'上傳圖片失敗: {str(e)}')
-                    continue
+            # 一次送出所有圖片並等待縮圖出現
+            attach_images(driver, post_img, image_paths)
             
             post_img = WebDriverWait(driver, 30).until(
                 EC.any_of(
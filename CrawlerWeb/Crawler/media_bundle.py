@@ -0,0 +1,73 @@
+"""
+模板圖片快取（media bundle）
+把模板圖片解析成本機絕對路徑，連同檔案大小與 SHA-256 保存在 PostTemplate.media_bundle，
+排程執行時直接使用，不必每次重新轉換網址、檢查檔案；已產生發文版本的圖片使用發文版本。
+PostTemplateImage 新增、修改或刪除時由 models 中的信號清除快取，下次使用時重新建立。
+"""
+
+import hashlib
+import logging
+import os
+
+from django.utils import timezone
+
+from .attachments import to_absolute_path
+from .image_pipeline import get_post_ready_path
+from .models import PostTemplate
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_media_bundle(template):
+    """
+    重新建立模板的圖片快取並保存
+    bundle = {'digest': ..., 'built_at': ..., 'images': [{'order', 'url', 'path', 'original_path', 'size', 'sha256'}, ...]}
+    已產生發文版本的圖片，path 指向發文版本；digest 由圖片內容雜湊依序組成，內容相同的模板會得到相同的 digest
+    """
+    images = []
+    for image in template.images.all().order_by('order'):
+        url = image.get_image_url()
+        original_path = to_absolute_path(url)
+        if not original_path or not os.path.isfile(original_path):
+            logger.warning(f'模板 {template.id} 的圖片不存在，略過: {url}')
+            continue
+        path = get_post_ready_path(original_path) or original_path
+        images.append({
+            'order': image.order,
+            'url': url,
+            'path': path,
+            'original_path': original_path,
+            'size': os.path.getsize(path),
+            'sha256': file_sha256(path),
+        })
+
+    bundle = {
+        'digest': hashlib.sha256(''.join(item['sha256'] for item in images).encode()).hexdigest(),
+        'built_at': timezone.now().isoformat(),
+        'images': images,
+    }
+    PostTemplate.objects.filter(pk=template.pk).update(media_bundle=bundle)
+    template.media_bundle = bundle
+    return bundle
+
+
+def get_media_bundle(template):
+    """取得模板的圖片快取，尚未建立（或已被清除）時才重新建立"""
+    if template.media_bundle is None:
+        return build_media_bundle(template)
+    return template.media_bundle
+
+
+def get_bundle_paths(template):
+    """排程發文使用的圖片絕對路徑（依排序）"""
+    return [item['path'] for item in get_media_bundle(template)['images']]
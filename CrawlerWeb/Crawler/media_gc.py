@@ -0,0 +1,238 @@
+"""
+未引用圖片清理
+資料庫本身就是引用檔案的索引（ImageBlob.file、PostTemplateImage 的 image / post_ready / alt_text、
+Schedule.template_images 中的 /media/... 網址），
+磁碟則以 MediaDirectory 記錄每個目錄上次列出時的修改時間，只重新列出有新增或刪除檔案的目錄。
+沒有被引用的檔案先記錄到 OrphanedMediaFile，超過保留期限仍未被引用才分批刪除；
+引用次數歸零但未被刪除的 ImageBlob 也在此一併回收。
+"""
+
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .image_pipeline import is_rendition, rendition_name
+from .image_store import delete_unreferenced_blob
+from .models import ImageBlob, MediaDirectory, OrphanedMediaFile, PostTemplateImage, Schedule
+
+logger = logging.getLogger(__name__)
+
+
+def get_gc_dirs():
+    return getattr(settings, 'CRAWLER_MEDIA_GC_DIRS', ['templates', 'blobs'])
+
+
+def get_grace_period():
+    return timedelta(hours=getattr(settings, 'CRAWLER_MEDIA_GC_GRACE_HOURS', 24))
+
+
+def get_batch_size():
+    return getattr(settings, 'CRAWLER_MEDIA_GC_BATCH_SIZE', 200)
+
+
+def _absolute(name):
+    return os.path.join(str(settings.MEDIA_ROOT), name.replace('/', os.sep))
+
+
+def referenced_names(directory):
+    """directory 底下被引用的檔案名稱（相對 MEDIA_ROOT），被引用圖片的發文版本也視為被引用"""
+    prefix = f'{directory}/'
+    media_url = settings.MEDIA_URL
+    names = set(ImageBlob.objects.filter(file__startswith=prefix).values_list('file', flat=True))
+    names.update(PostTemplateImage.objects.filter(image__startswith=prefix).values_list('image', flat=True))
+    names.update(PostTemplateImage.objects.filter(post_ready__startswith=prefix).values_list('post_ready', flat=True))
+    names.update(
+        url[len(media_url):]
+        for url in PostTemplateImage.objects.filter(alt_text__startswith=f'{media_url}{prefix}').values_list('alt_text', flat=True)
+    )
+    names.update(_schedule_image_names(prefix))
+    names.update([rendition_name(name) for name in names if not is_rendition(name)])
+    return names
+
+
+def _schedule_image_names(prefix):
+    """排程在建立時複製了模板圖片網址，執行時直接使用這些檔案"""
+    media_prefix = f'{settings.MEDIA_URL}{prefix}'
+    for images in Schedule.objects.exclude(template_images=[]).values_list('template_images', flat=True).iterator():
+        for image in images or []:
+            url = image.get('url') if isinstance(image, dict) else image
+            if isinstance(url, str) and url.startswith(media_prefix):
+                yield url[len(settings.MEDIA_URL):]
+
+
+class MediaGarbageCollector:
+    """一次清理的狀態與統計"""
+
+    def __init__(self, grace_period=None, batch_size=None, full_scan=False, dry_run=False):
+        self.grace_period = grace_period if grace_period is not None else get_grace_period()
+        self.batch_size = batch_size or get_batch_size()
+        self.full_scan = full_scan
+        self.dry_run = dry_run
+        self.stats = {
+            'directories': 0,
+            'listed_directories': 0,
+            'new_orphans': 0,
+            'deleted_files': 0,
+            'deleted_blobs': 0,
+            'reclaimed_bytes': 0,
+        }
+
+    # 掃描
+    def scan(self):
+        """增量掃描設定的目錄，更新未引用檔案清單"""
+        self._known = {entry.path: entry for entry in MediaDirectory.objects.all()}
+        for directory in get_gc_dirs():
+            self._scan_directory(directory.strip('/'))
+
+    def _known_children(self, directory):
+        prefix = f'{directory}/'
+        return [path for path in self._known if path.startswith(prefix) and '/' not in path[len(prefix):]]
+
+    def _forget_directory(self, directory):
+        """目錄已不存在：移除它與子目錄的索引和未引用記錄"""
+        prefix = f'{directory}/'
+        MediaDirectory.objects.filter(path=directory).delete()
+        MediaDirectory.objects.filter(path__startswith=prefix).delete()
+        OrphanedMediaFile.objects.filter(directory=directory).delete()
+        OrphanedMediaFile.objects.filter(directory__startswith=prefix).delete()
+
+    def _scan_directory(self, directory):
+        try:
+            mtime = os.stat(_absolute(directory)).st_mtime
+        except FileNotFoundError:
+            if directory in self._known:
+                self._forget_directory(directory)
+            return
+
+        self.stats['directories'] += 1
+        known = self._known.get(directory)
+        if not self.full_scan and known is not None and known.mtime == mtime:
+            # 目錄沒有新增或刪除項目，只需往下檢查已知的子目錄
+            for child in self._known_children(directory):
+                self._scan_directory(child)
+            return
+
+        self.stats['listed_directories'] += 1
+        files = {}
+        subdirectories = []
+        with os.scandir(_absolute(directory)) as entries:
+            for entry in entries:
+                name = f'{directory}/{entry.name}'
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    files[name] = entry.stat().st_size
+
+        self._update_orphans(directory, files)
+        # 記錄列出前取得的修改時間，列出期間的變動會在下次掃描時發現
+        MediaDirectory.objects.update_or_create(path=directory, defaults={'mtime': mtime})
+
+        for child in set(self._known_children(directory)) - set(subdirectories):
+            self._forget_directory(child)
+        for child in subdirectories:
+            self._scan_directory(child)
+
+    def _update_orphans(self, directory, files):
+        referenced = referenced_names(directory)
+        existing = set(OrphanedMediaFile.objects.filter(directory=directory).values_list('path', flat=True))
+
+        # 已不存在或重新被引用的檔案不再是候選
+        resolved = [path for path in existing if path not in files or path in referenced]
+        if resolved:
+            OrphanedMediaFile.objects.filter(path__in=resolved).delete()
+
+        orphans = [
+            OrphanedMediaFile(path=path, directory=directory, size=size)
+            for path, size in files.items()
+            if path not in referenced and path not in existing
+        ]
+        OrphanedMediaFile.objects.bulk_create(orphans, batch_size=self.batch_size, ignore_conflicts=True)
+        self.stats['new_orphans'] += len(orphans)
+
+    # 刪除
+    def collect(self):
+        """分批刪除超過保留期限的未引用檔案與引用次數為零的 ImageBlob"""
+        cutoff = timezone.now() - self.grace_period
+        self._collect_files(cutoff)
+        self._collect_blobs(cutoff)
+
+    def _collect_files(self, cutoff):
+        referenced_by_directory = {}
+        last_id = 0
+        while True:
+            batch = list(
+                OrphanedMediaFile.objects.filter(detected_at__lte=cutoff, id__gt=last_id).order_by('id')[:self.batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            done = []
+            for orphan in batch:
+                # 刪除前以最新的引用狀態再確認一次（每個目錄每次清理只查詢一次）
+                if orphan.directory not in referenced_by_directory:
+                    referenced_by_directory[orphan.directory] = referenced_names(orphan.directory)
+                if orphan.path in referenced_by_directory[orphan.directory]:
+                    done.append(orphan.id)
+                    continue
+
+                path = _absolute(orphan.path)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    done.append(orphan.id)
+                    continue
+                if stat.st_mtime > cutoff.timestamp():
+                    # 期間被覆寫過，等下次清理
+                    continue
+
+                if not self.dry_run:
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logger.warning(f'刪除未引用圖片失敗 {orphan.path}: {str(e)}')
+                        continue
+                    done.append(orphan.id)
+                self.stats['deleted_files'] += 1
+                self.stats['reclaimed_bytes'] += stat.st_size
+
+            if done:
+                OrphanedMediaFile.objects.filter(id__in=done).delete()
+
+    def _collect_blobs(self, cutoff):
+        blobs = ImageBlob.objects.filter(ref_count=0, updated_at__lte=cutoff).order_by('id')
+        if self.dry_run:
+            for size in blobs.values_list('size', flat=True).iterator(chunk_size=self.batch_size):
+                self.stats['deleted_blobs'] += 1
+                self.stats['reclaimed_bytes'] += size
+            return
+
+        last_id = 0
+        while True:
+            blob_ids = list(blobs.filter(id__gt=last_id).values_list('id', flat=True)[:self.batch_size])
+            if not blob_ids:
+                break
+            last_id = blob_ids[-1]
+            for blob_id in blob_ids:
+                size = delete_unreferenced_blob(blob_id)
+                if size:
+                    self.stats['deleted_blobs'] += 1
+                    self.stats['reclaimed_bytes'] += size
+
+    def run(self):
+        self.scan()
+        self.collect()
+        logger.info(
+            f'圖片清理完成: 檢查 {self.stats["directories"]} 個目錄（列出 {self.stats["listed_directories"]} 個），'
+            f'新發現 {self.stats["new_orphans"]} 個未引用檔案，刪除 {self.stats["deleted_files"]} 個檔案、'
+            f'{self.stats["deleted_blobs"]} 個圖片檔案記錄，釋放 {self.stats["reclaimed_bytes"]} 位元組'
+        )
+        return self.stats
+
+
+def collect_media_garbage(**kwargs):
+    """執行一次圖片清理並回傳統計"""
+    return MediaGarbageCollector(**kwargs).run()
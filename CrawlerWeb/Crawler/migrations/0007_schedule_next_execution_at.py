@@ -0,0 +1,37 @@
+# Generated by Django 5.0.3 on 2026-10-18 20:12
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_next_execution_at(apps, schema_editor):
+    """為現有排程計算下次執行時間"""
+    from Crawler.schedule_timing import compute_next_fire_time
+
+    Schedule = apps.get_model('Crawler', 'Schedule')
+    now = timezone.now()
+    for schedule in Schedule.objects.filter(is_active=True, status='active'):
+        schedule.next_execution_at = compute_next_fire_time(schedule.execution_days, schedule.posting_times, now)
+        schedule.save(update_fields=['next_execution_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0006_schedule_template'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='next_execution_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='下次執行時間'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['status', 'is_active', 'next_execution_at'], name='crawler_schedule_due_idx'),
+        ),
+        migrations.RunPython(populate_next_execution_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.3 on 2026-10-18 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0007_schedule_next_execution_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleexecution',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='嘗試次數'),
+        ),
+        migrations.AddField(
+            model_name='scheduleexecution',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='最後心跳時間'),
+        ),
+        migrations.AddField(
+            model_name='scheduleexecution',
+            name='worker_id',
+            field=models.CharField(blank=True, max_length=100, verbose_name='執行程序'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleexecution',
+            index=models.Index(fields=['status', 'scheduled_time'], name='crawler_execution_queue_idx'),
+        ),
+    ]
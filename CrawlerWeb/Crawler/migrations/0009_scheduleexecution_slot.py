@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+def populate_slots(apps, schema_editor):
+    """為現有執行記錄填入時間點；同一時間點有多筆時只保留最早的一筆"""
+    ScheduleExecution = apps.get_model('Crawler', 'ScheduleExecution')
+    seen = set()
+    for execution in ScheduleExecution.objects.order_by('id').only('id', 'schedule_id', 'scheduled_time'):
+        slot = execution.scheduled_time.replace(second=0, microsecond=0)
+        key = (execution.schedule_id, slot)
+        if key in seen:
+            continue
+        seen.add(key)
+        ScheduleExecution.objects.filter(id=execution.id).update(slot=slot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0008_scheduleexecution_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleexecution',
+            name='slot',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='排程時間點'),
+        ),
+        migrations.RunPython(populate_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='scheduleexecution',
+            constraint=models.UniqueConstraint(fields=('schedule', 'slot'), name='crawler_execution_unique_slot'),
+        ),
+    ]
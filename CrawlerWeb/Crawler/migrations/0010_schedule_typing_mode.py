@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0009_scheduleexecution_slot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='typing_mode',
+            field=models.CharField(choices=[('per_character', '逐字輸入'), ('chunked', '分段輸入'), ('insert_text', '一次插入')], default='per_character', max_length=20, verbose_name='輸入方式'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0010_schedule_typing_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posttemplate',
+            name='media_bundle',
+            field=models.JSONField(blank=True, help_text='已解析的圖片路徑、大小與雜湊，圖片變更時自動清除', null=True, verbose_name='圖片快取'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-18 21:18
+
+import Crawler.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0011_posttemplate_media_bundle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posttemplateimage',
+            name='post_ready',
+            field=models.ImageField(blank=True, upload_to=Crawler.models.template_image_upload_to, verbose_name='發文用圖片'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.0.3 on 2026-10-18 20:26
+
+import hashlib
+import os
+
+import Crawler.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def populate_blobs(apps, schema_editor):
+    """
+    為現有模板圖片建立 ImageBlob 並計算引用次數
+    內容相同的上傳圖片改指向同一個檔案，多出來的重複檔案留給圖片清理指令回收
+    """
+    ImageBlob = apps.get_model('Crawler', 'ImageBlob')
+    PostTemplateImage = apps.get_model('Crawler', 'PostTemplateImage')
+    media_root = str(settings.MEDIA_ROOT)
+    media_url = settings.MEDIA_URL
+    blobs_by_sha = {}
+    blobs_by_name = {}
+
+    def blob_for_name(name):
+        if name in blobs_by_name:
+            return blobs_by_name[name]
+        path = os.path.join(media_root, name)
+        if not os.path.isfile(path):
+            return None
+        sha256 = _file_sha256(path)
+        blob = blobs_by_sha.get(sha256)
+        if blob is None:
+            blob = ImageBlob.objects.create(sha256=sha256, file=name, size=os.path.getsize(path), ref_count=0)
+            blobs_by_sha[sha256] = blob
+        blobs_by_name[name] = blob
+        return blob
+
+    # 先處理上傳的圖片，讓 blob 優先沿用上傳圖片的檔案
+    for image in PostTemplateImage.objects.exclude(image='').order_by('id'):
+        blob = blob_for_name(image.image.name)
+        if blob is None:
+            continue
+        blob.ref_count += 1
+        fields = {'blob': blob}
+        if blob.file.name != image.image.name:
+            fields.update(image=blob.file.name, post_ready='')
+        PostTemplateImage.objects.filter(id=image.id).update(**fields)
+
+    # 複製的圖片（網址保存在 alt_text）
+    for image in PostTemplateImage.objects.filter(image='', alt_text__startswith=media_url).order_by('id'):
+        blob = blob_for_name(image.alt_text[len(media_url):])
+        if blob is None:
+            continue
+        blob.ref_count += 1
+        PostTemplateImage.objects.filter(id=image.id).update(blob=blob, alt_text=f'{media_url}{blob.file.name}')
+
+    for blob in blobs_by_sha.values():
+        ImageBlob.objects.filter(id=blob.id).update(ref_count=blob.ref_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0012_posttemplateimage_post_ready'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('file', models.FileField(max_length=255, upload_to=Crawler.models.image_blob_upload_to, verbose_name='檔案')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='檔案大小')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='引用次數')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+            ],
+            options={
+                'verbose_name': '圖片檔案',
+                'verbose_name_plural': '圖片檔案',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='posttemplateimage',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='template_images', to='Crawler.imageblob', verbose_name='圖片檔案'),
+        ),
+        migrations.RunPython(populate_blobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.3 on 2026-10-18 20:48
+
+import Crawler.models
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0013_image_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaDirectory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=255, unique=True, verbose_name='目錄')),
+                ('mtime', models.FloatField(default=0, verbose_name='目錄修改時間')),
+                ('scanned_at', models.DateTimeField(auto_now=True, verbose_name='掃描時間')),
+            ],
+            options={
+                'verbose_name': '圖片目錄索引',
+                'verbose_name_plural': '圖片目錄索引',
+                'ordering': ['path'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrphanedMediaFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=255, unique=True, verbose_name='檔案')),
+                ('directory', models.CharField(db_index=True, max_length=255, verbose_name='目錄')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='檔案大小')),
+                ('detected_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='發現時間')),
+            ],
+            options={
+                'verbose_name': '未引用的圖片檔案',
+                'verbose_name_plural': '未引用的圖片檔案',
+                'ordering': ['detected_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='imageblob',
+            name='file',
+            field=models.FileField(db_index=True, max_length=255, upload_to=Crawler.models.image_blob_upload_to, verbose_name='檔案'),
+        ),
+    ]
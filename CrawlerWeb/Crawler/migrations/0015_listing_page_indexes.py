@@ -0,0 +1,27 @@
+# Generated by Django 5.0.3 on 2026-10-18 21:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0014_media_gc_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['user', 'is_active', '-created_at', '-id'], name='crawler_community_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posttemplate',
+            index=models.Index(fields=['user', 'is_active', '-updated_at', '-id'], name='crawler_template_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='crawler_schedule_page_idx'),
+        ),
+    ]
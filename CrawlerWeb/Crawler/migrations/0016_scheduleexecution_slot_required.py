@@ -0,0 +1,40 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:10
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_missing_slots(apps, schema_editor):
+    """
+    為沒有時間點的執行記錄填入時間點
+    0009 保留了同一時間點最早的一筆，其餘重複觸發的記錄沒有時間點；這些記錄是實際執行過的歷史，不刪除，
+    改用精確的預定時間（含秒數）作為時間點，與對齊到分鐘的正常時間點區分，仍衝突時再往後加一微秒
+    """
+    ScheduleExecution = apps.get_model('Crawler', 'ScheduleExecution')
+    for execution in ScheduleExecution.objects.filter(slot__isnull=True).order_by('id').only('id', 'schedule_id', 'scheduled_time'):
+        slot = execution.scheduled_time.replace(second=0, microsecond=0)
+        taken = ScheduleExecution.objects.filter(schedule_id=execution.schedule_id)
+        if taken.filter(slot=slot).exists():
+            slot = execution.scheduled_time
+            if slot.second == 0 and slot.microsecond == 0:
+                slot += timedelta(microseconds=1)
+            while taken.filter(slot=slot).exists():
+                slot += timedelta(microseconds=1)
+        ScheduleExecution.objects.filter(id=execution.id).update(slot=slot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0015_listing_page_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_missing_slots, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='scheduleexecution',
+            name='slot',
+            field=models.DateTimeField(verbose_name='排程時間點'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-19 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0016_scheduleexecution_slot_required'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='posttemplate',
+            name='crawler_template_page_idx',
+        ),
+        migrations.AddIndex(
+            model_name='posttemplate',
+            index=models.Index(fields=['user', 'is_active', '-created_at', '-id'], name='crawler_template_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-19 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Crawler', '0017_template_page_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleexecution',
+            name='target_progress',
+            field=models.JSONField(blank=True, default=dict, verbose_name='社團發文進度'),
+        ),
+    ]
@@ -15,6 +15,12 @@ def template_image_upload_to(instance, filename):
     return f"templates/{instance.template.user.id}/{uuid.uuid4().hex}{safe_ext}"
 
 
+def image_blob_upload_to(instance, filename):
+    """圖片檔案路徑：以內容雜湊命名，前兩碼分目錄"""
+    _, ext = os.path.splitext(filename)
+    return f"blobs/{instance.sha256[:2]}/{instance.sha256}{(ext or '').lower()}"
+
+
 class Community(models.Model):
     """社團資料庫"""
     COMMUNITY_TYPE_CHOICES = [
@@ -51,6 +57,10 @@ class Community(models.Model):
         verbose_name_plural = '社團'
         unique_together = ['user', 'url']
         ordering = ['-last_activity', '-created_at']
+        indexes = [
+            # 社團列表的游標分頁（依建立時間遞減）
+            models.Index(fields=['user', 'is_active', '-created_at', '-id'], name='crawler_community_page_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.name}"
@@ -69,6 +79,7 @@ class PostTemplate(models.Model):
     content = models.TextField(verbose_name='模板內容')
     hashtags = models.JSONField(default=list, blank=True, verbose_name='標籤')
     is_active = models.BooleanField(default=True, verbose_name='是否啟用')
+    media_bundle = models.JSONField(null=True, blank=True, verbose_name='圖片快取', help_text='已解析的圖片路徑、大小與雜湊，圖片變更時自動清除')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='建立時間')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
     
@@ -76,6 +87,10 @@ class PostTemplate(models.Model):
         verbose_name = '貼文模板'
         verbose_name_plural = '貼文模板'
         ordering = ['-updated_at']
+        indexes = [
+            # 模板列表的游標分頁（依建立時間遞減；更新時間會隨編輯改變，分頁中途編輯會造成跳過或重複）
+            models.Index(fields=['user', 'is_active', '-created_at', '-id'], name='crawler_template_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
@@ -90,10 +105,30 @@ class PostTemplate(models.Model):
         return self.schedules.all()
 
 
+class ImageBlob(models.Model):
+    """模板圖片檔案（依內容雜湊去重，內容相同的模板圖片共用同一個檔案）"""
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    file = models.FileField(upload_to=image_blob_upload_to, max_length=255, db_index=True, verbose_name='檔案')
+    size = models.PositiveBigIntegerField(default=0, verbose_name='檔案大小')
+    ref_count = models.PositiveIntegerField(default=0, verbose_name='引用次數')  # 引用此檔案的模板圖片數量，歸零時刪除檔案
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='建立時間')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
+    
+    class Meta:
+        verbose_name = '圖片檔案'
+        verbose_name_plural = '圖片檔案'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count})"
+
+
 class PostTemplateImage(models.Model):
     """貼文模板圖片資料庫"""
     template = models.ForeignKey(PostTemplate, on_delete=models.CASCADE, verbose_name='模板', related_name='images')
+    blob = models.ForeignKey(ImageBlob, on_delete=models.PROTECT, null=True, blank=True, verbose_name='圖片檔案', related_name='template_images')
     image = models.ImageField(upload_to=template_image_upload_to, verbose_name='圖片')
+    post_ready = models.ImageField(upload_to=template_image_upload_to, blank=True, verbose_name='發文用圖片')  # 背景產生的縮圖壓縮版本
     order = models.PositiveIntegerField(default=0, verbose_name='排序')
     alt_text = models.CharField(max_length=200, blank=True, verbose_name='替代文字')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='建立時間')
@@ -106,6 +141,45 @@ class PostTemplateImage(models.Model):
     
     def __str__(self):
         return f"{self.template.title} - 圖片 {self.order}"
+    
+    def get_image_url(self):
+        """圖片網址：上傳的圖片使用檔案網址，複製的圖片使用 alt_text 中保存的網址"""
+        if self.image and hasattr(self.image, 'url'):
+            return self.image.url
+        if self.alt_text and (self.alt_text.startswith('http') or self.alt_text.startswith('/media/')):
+            return self.alt_text
+        return None
+
+
+class MediaDirectory(models.Model):
+    """圖片清理的目錄索引：記錄上次列出檔案時的目錄修改時間，沒有變動的目錄不必重新列出"""
+    path = models.CharField(max_length=255, unique=True, verbose_name='目錄')  # 相對 MEDIA_ROOT
+    mtime = models.FloatField(default=0, verbose_name='目錄修改時間')
+    scanned_at = models.DateTimeField(auto_now=True, verbose_name='掃描時間')
+    
+    class Meta:
+        verbose_name = '圖片目錄索引'
+        verbose_name_plural = '圖片目錄索引'
+        ordering = ['path']
+    
+    def __str__(self):
+        return self.path
+
+
+class OrphanedMediaFile(models.Model):
+    """掃描時發現沒有被引用的圖片檔案，超過保留期限仍未被引用才刪除"""
+    path = models.CharField(max_length=255, unique=True, verbose_name='檔案')  # 相對 MEDIA_ROOT
+    directory = models.CharField(max_length=255, db_index=True, verbose_name='目錄')
+    size = models.PositiveBigIntegerField(default=0, verbose_name='檔案大小')
+    detected_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='發現時間')
+    
+    class Meta:
+        verbose_name = '未引用的圖片檔案'
+        verbose_name_plural = '未引用的圖片檔案'
+        ordering = ['detected_at']
+    
+    def __str__(self):
+        return self.path
 
 
 class SocialMediaPost(models.Model):
@@ -180,6 +254,11 @@ class Schedule(models.Model):
         ('paused', '暫停'),
         ('cancelled', '取消'),
     ]
+    TYPING_MODE_CHOICES = [
+        ('per_character', '逐字輸入'),
+        ('chunked', '分段輸入'),
+        ('insert_text', '一次插入'),
+    ]
     
     # 基本資訊
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='使用者')
@@ -197,6 +276,7 @@ class Schedule(models.Model):
     message_content = models.TextField(verbose_name='發文內容')
     template_images = models.JSONField(default=list, verbose_name='模板圖片', help_text='圖片URL和排序信息')
     target_communities = models.JSONField(default=list, verbose_name='目標社團', help_text='社團信息列表')
+    typing_mode = models.CharField(max_length=20, choices=TYPING_MODE_CHOICES, default='per_character', verbose_name='輸入方式')
     
     # 模板關聯
     template = models.ForeignKey(
@@ -218,48 +298,66 @@ class Schedule(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='創建時間')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
     last_execution_time = models.DateTimeField(null=True, blank=True, verbose_name='最後執行時間')
+    next_execution_at = models.DateTimeField(null=True, blank=True, verbose_name='下次執行時間')
     
     class Meta:
         verbose_name = '排程發文設定'
         verbose_name_plural = '排程發文設定'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'is_active', 'next_execution_at'], name='crawler_schedule_due_idx'),
+            # 排程列表的游標分頁（依建立時間遞減）
+            models.Index(fields=['user', '-created_at', '-id'], name='crawler_schedule_page_idx'),
+        ]
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timing_snapshot = self._get_timing_state()
     
     def __str__(self):
         return f"{self.name} - {self.user.username}"
     
-    def get_next_execution_time(self):
-        """計算下次執行時間"""
-        if not self.posting_times or not self.execution_days:
+    def _get_timing_state(self):
+        """影響下次執行時間的欄位（有延遲載入的欄位時回傳 None）"""
+        timing_fields = {'execution_days', 'posting_times', 'status', 'is_active'}
+        if timing_fields & self.get_deferred_fields():
             return None
-        
-        from datetime import datetime, timedelta
-        now = timezone.now()
-        current_time = now.time()
-        current_weekday = now.strftime('%A').lower()
-        
-        # 檢查今天是否在執行日期中
-        if current_weekday in self.execution_days:
-            # 找到今天下一個要執行的時間
-            for time_str in sorted(self.posting_times):
-                time_obj = datetime.strptime(time_str, '%H:%M').time()
-                if time_obj > current_time:
-                    # 今天還有時間要執行
-                    next_execution = datetime.combine(now.date(), time_obj)
-                    return timezone.make_aware(next_execution)
-        
-        # 找到下一個執行日期和時間
-        for i in range(1, 8):  # 最多檢查7天
-            next_date = now.date() + timedelta(days=i)
-            next_weekday = next_date.strftime('%A').lower()
-            
-            if next_weekday in self.execution_days:
-                # 找到下一個執行日期，使用第一個時間
-                first_time = sorted(self.posting_times)[0]
-                time_obj = datetime.strptime(first_time, '%H:%M').time()
-                next_execution = datetime.combine(next_date, time_obj)
-                return timezone.make_aware(next_execution)
-        
-        return None
+        return (
+            tuple(self.execution_days or []),
+            tuple(self.posting_times or []),
+            self.status,
+            self.is_active,
+        )
+    
+    def compute_next_execution_time(self, after=None):
+        """計算 after（預設為現在）之後的下次執行時間，停用的排程回傳 None"""
+        if not self.is_active or self.status != 'active':
+            return None
+        from .schedule_timing import compute_next_fire_time
+        return compute_next_fire_time(self.execution_days, self.posting_times, after or timezone.now())
+    
+    def save(self, *args, **kwargs):
+        """保存時若排程時間設定有變更，重新計算下次執行時間"""
+        timing_state = self._get_timing_state()
+        if timing_state is None or timing_state != self._timing_snapshot or (
+            self.next_execution_at is None and self.is_active and self.status == 'active'
+        ):
+            self.next_execution_at = self.compute_next_execution_time()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'next_execution_at' not in update_fields:
+                kwargs['update_fields'] = list(update_fields) + ['next_execution_at']
+        super().save(*args, **kwargs)
+        self._timing_snapshot = self._get_timing_state()
+    
+    def advance_next_execution(self, after=None):
+        """執行後（或錯過時間點後）推進下次執行時間"""
+        self.next_execution_at = self.compute_next_execution_time(after)
+        Schedule.objects.filter(pk=self.pk).update(next_execution_at=self.next_execution_at)
+        return self.next_execution_at
+    
+    def get_next_execution_time(self):
+        """下次執行時間（由 next_execution_at 欄位保存，不再即時計算）"""
+        return self.next_execution_at
     
     def get_execution_summary(self):
         """獲取執行摘要"""
@@ -292,15 +390,10 @@ class Schedule(models.Model):
             # 更新模板圖片
             template_images = []
             for image in self.template.images.all().order_by('order'):
-                if image.image and hasattr(image.image, 'url'):
+                image_url = image.get_image_url()
+                if image_url:
                     template_images.append({
-                        'url': image.image.url,
-                        'order': image.order,
-                        'alt_text': image.alt_text or ''
-                    })
-                elif image.alt_text and image.alt_text.startswith('/media/'):
-                    template_images.append({
-                        'url': image.alt_text,
+                        'url': image_url,
                         'order': image.order,
                         'alt_text': image.alt_text or ''
                     })
@@ -327,6 +420,7 @@ class ScheduleExecution(models.Model):
     
     # 執行時間
     scheduled_time = models.DateTimeField(verbose_name='預定執行時間')
+    slot = models.DateTimeField(verbose_name='排程時間點')  # 對齊到分鐘的觸發時間，同一排程的同一時間點只能有一筆（未指定時由 scheduled_time 計算）
     started_at = models.DateTimeField(null=True, blank=True, verbose_name='開始執行時間')
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name='完成時間')
     
@@ -339,6 +433,12 @@ class ScheduleExecution(models.Model):
     posts_published = models.PositiveIntegerField(default=0, verbose_name='成功發布貼文數')
     posts_failed = models.PositiveIntegerField(default=0, verbose_name='失敗發布貼文數')
     
+    # 工作佇列（由執行器程序認領）
+    worker_id = models.CharField(max_length=100, blank=True, verbose_name='執行程序')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='最後心跳時間')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='嘗試次數')
+    target_progress = models.JSONField(default=dict, blank=True, verbose_name='社團發文進度')  # {社團網址: started/success/failed}，重試時略過已發文的社團
+    
     # 時間戳記
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='創建時間')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
@@ -347,10 +447,23 @@ class ScheduleExecution(models.Model):
         verbose_name = '排程執行記錄'
         verbose_name_plural = '排程執行記錄'
         ordering = ['-scheduled_time']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_time'], name='crawler_execution_queue_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'slot'], name='crawler_execution_unique_slot'),
+        ]
     
     def __str__(self):
         return f"{self.schedule.name} - {self.scheduled_time.strftime('%Y-%m-%d %H:%M')} - {self.status}"
     
+    def save(self, *args, **kwargs):
+        """所有建立執行記錄的路徑都帶有時間點，(schedule, slot) 唯一約束才能防止重複執行"""
+        if self.slot is None and self.scheduled_time is not None:
+            from .schedule_timing import canonical_slot
+            self.slot = canonical_slot(self.scheduled_time)
+        super().save(*args, **kwargs)
+    
     def mark_as_started(self):
         """標記為開始執行"""
         self.status = 'running'
@@ -371,6 +484,13 @@ class ScheduleExecution(models.Model):
         
         self.save()
     
+    def mark_as_cancelled(self, message=""):
+        """標記為已取消（排程在執行前被暫停或取消）"""
+        self.status = 'cancelled'
+        self.completed_at = timezone.now()
+        self.result_message = message
+        self.save()
+    
     def mark_as_failed(self, error_message=""):
         """標記為失敗"""
         self.status = 'failed'
@@ -385,10 +505,33 @@ class ScheduleExecution(models.Model):
 
 
 # Django 信號處理器
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 
+@receiver(post_save, sender=PostTemplateImage)
+@receiver(post_delete, sender=PostTemplateImage)
+def invalidate_template_media_bundle(sender, instance, **kwargs):
+    """模板圖片新增、修改或刪除時清除模板的圖片快取"""
+    PostTemplate.objects.filter(pk=instance.template_id).update(media_bundle=None)
+
+
+@receiver(post_delete, sender=PostTemplateImage)
+def release_template_image_blob(sender, instance, **kwargs):
+    """模板圖片刪除時減少圖片檔案的引用次數，歸零時刪除檔案"""
+    if instance.blob_id:
+        from .image_store import release_blob
+        release_blob(instance.blob_id)
+
+
+@receiver(post_save, sender=PostTemplateImage)
+def render_post_ready_image(sender, instance, created, **kwargs):
+    """新上傳的模板圖片在背景產生發文版本"""
+    if created and instance.image:
+        from .image_pipeline import schedule_post_ready_render
+        schedule_post_ready_render(instance.id)
+
+
 @receiver(pre_delete, sender=PostTemplate)
 def delete_related_schedules(sender, instance, **kwargs):
     """
@@ -0,0 +1,107 @@
+"""
+列表 API 的游標分頁與欄位選擇
+- 分頁：未帶 limit 時每頁 CRAWLER_API_PAGE_SIZE 筆，回應中的 next_cursor 用於取得下一頁。
+  依（不會隨編輯改變的排序欄位, id）遞減排序，游標記錄上一頁最後一筆的這兩個值，
+  下一頁以 WHERE (欄位, id) < (值, id) 查詢，不使用 OFFSET，頁數越後面也不會變慢
+- 欄位選擇：fields=id,name,url 只回傳指定的欄位（id 一律回傳），未指定時回傳全部欄位
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+
+class PaginationError(ValueError):
+    """分頁或欄位參數錯誤"""
+
+
+class PageRequest:
+    def __init__(self, limit, after=None):
+        self.limit = limit
+        self.after = after  # (排序欄位值, id)，第一頁為 None
+
+
+def get_default_page_size():
+    return getattr(settings, 'CRAWLER_API_PAGE_SIZE', 50)
+
+
+def get_max_page_size():
+    return getattr(settings, 'CRAWLER_API_MAX_PAGE_SIZE', 200)
+
+
+def encode_cursor(value, pk):
+    payload = json.dumps([value.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(value), int(pk)
+    except (ValueError, TypeError):
+        raise PaginationError('無效的分頁游標')
+
+
+def parse_page_request(request):
+    """讀取 limit / cursor 參數，未帶 limit 時使用預設的每頁筆數"""
+    limit = request.GET.get('limit')
+    cursor = request.GET.get('cursor')
+
+    try:
+        limit = int(limit) if limit is not None else get_default_page_size()
+    except ValueError:
+        raise PaginationError('limit 必須是整數')
+    if limit < 1:
+        raise PaginationError('limit 必須大於 0')
+
+    return PageRequest(
+        limit=min(limit, get_max_page_size()),
+        after=decode_cursor(cursor) if cursor else None,
+    )
+
+
+def parse_fields(request, allowed_fields):
+    """讀取 fields 參數，回傳要輸出的欄位集合；未指定時回傳 None（全部欄位）"""
+    value = request.GET.get('fields')
+    if not value:
+        return None
+    fields = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = fields - set(allowed_fields)
+    if unknown:
+        raise PaginationError(f'不支援的欄位: {", ".join(sorted(unknown))}')
+    return fields | {'id'}
+
+
+def project(data, fields):
+    """只保留指定的欄位"""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def paginate(queryset, order_field, page=None):
+    """
+    依（order_field, id）遞減排序並取出一頁，回傳 (rows, next_cursor)
+    page 為 None 時回傳全部資料，next_cursor 為 None
+    """
+    queryset = queryset.order_by(f'-{order_field}', '-id')
+    if page is None:
+        return list(queryset), None
+
+    if page.after is not None:
+        value, pk = page.after
+        queryset = queryset.filter(
+            Q(**{f'{order_field}__lt': value}) | Q(**{order_field: value, 'id__lt': pk})
+        )
+
+    # 多取一筆判斷是否還有下一頁
+    rows = list(queryset[:page.limit + 1])
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, order_field), last.id)
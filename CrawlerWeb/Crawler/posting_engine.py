@@ -0,0 +1,187 @@
+"""
+多社團平行發文引擎
+把一次發文（立即發文或排程）的目標社團分散到多個瀏覽器同時處理，
+並以「每個帳號」與「全域」兩層上限控制同時開啟的瀏覽器數量。
+"""
+
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from .driver_pool import get_driver_pool
+
+logger = logging.getLogger(__name__)
+
+_global_slots = None
+_account_slots = {}
+_slots_lock = threading.Lock()
+
+
+def _get_global_slots():
+    global _global_slots
+    with _slots_lock:
+        if _global_slots is None:
+            _global_slots = threading.BoundedSemaphore(get_max_global())
+        return _global_slots
+
+
+def _get_account_slots(user_id):
+    with _slots_lock:
+        if user_id not in _account_slots:
+            _account_slots[user_id] = threading.BoundedSemaphore(get_max_per_account())
+        return _account_slots[user_id]
+
+
+def get_max_per_account():
+    return max(1, int(getattr(settings, 'CRAWLER_POSTING_MAX_PER_ACCOUNT', 2)))
+
+
+def get_max_global():
+    return max(1, int(getattr(settings, 'CRAWLER_POSTING_MAX_GLOBAL', 4)))
+
+
+def normalize_communities(communities):
+    """統一社團格式為 {'url': ..., 'name': ...}，略過沒有網址的項目"""
+    normalized = []
+    for community in communities:
+        if isinstance(community, dict):
+            url = community.get('url')
+            name = community.get('name', '')
+        else:
+            url = str(community) if community else None
+            name = ''
+        if url:
+            normalized.append({'url': url, 'name': name})
+    return normalized
+
+
+class PostingReport:
+    """一次平行發文的結果（依輸入順序保存每個社團的結果）"""
+
+    def __init__(self, communities):
+        self.communities = communities
+        self._results = [None] * len(communities)
+        self._lock = threading.Lock()
+
+    def record(self, index, success, message=''):
+        community = self.communities[index]
+        with self._lock:
+            self._results[index] = {
+                'url': community['url'],
+                'name': community['name'],
+                'status': 'success' if success else 'failed',
+                'message': message or ('發文成功' if success else '發文失敗'),
+            }
+
+    def fill_missing(self, message):
+        """把沒有被任何瀏覽器處理到的社團標記為失敗"""
+        for index, result in enumerate(self._results):
+            if result is None:
+                self.record(index, False, message)
+
+    @property
+    def results(self):
+        return [result for result in self._results if result is not None]
+
+    @property
+    def success_count(self):
+        return sum(1 for result in self.results if result['status'] == 'success')
+
+    @property
+    def failed_count(self):
+        return sum(1 for result in self.results if result['status'] == 'failed')
+
+    def as_dict(self):
+        return {
+            'success_count': self.success_count,
+            'failed_count': self.failed_count,
+            'results': self.results,
+        }
+
+
+class ParallelPostingEngine:
+    """
+    平行發文引擎
+    - prepare_session(driver)：每個瀏覽器開始前呼叫一次（例如加入 Cookie 登入）
+    - post_one(driver, community)：發文到單一社團，回傳 True/False 或拋出例外
+    - pace()：同一個瀏覽器在兩次發文之間呼叫（人類化延遲）
+    """
+
+    def __init__(self, max_workers=None, driver_pool=None):
+        self.max_workers = max_workers
+        self.driver_pool = driver_pool or get_driver_pool()
+
+    def run(self, user_id, communities, prepare_session, post_one, pace=None, headless=False):
+        communities = normalize_communities(communities)
+        report = PostingReport(communities)
+        if not communities:
+            return report
+
+        worker_count = min(len(communities), get_max_per_account(), get_max_global())
+        if self.max_workers:
+            worker_count = min(worker_count, self.max_workers)
+
+        work = queue.Queue()
+        for index in range(len(communities)):
+            work.put(index)
+
+        threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(user_id, headless, work, report, prepare_session, post_one, pace),
+                name=f'posting-{user_id}-{i}',
+                daemon=True,
+            )
+            for i in range(worker_count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report.fill_missing('沒有可用的瀏覽器處理此社團')
+        return report
+
+    def _worker(self, user_id, headless, work, report, prepare_session, post_one, pace):
+        account_slots = _get_account_slots(user_id)
+        global_slots = _get_global_slots()
+
+        with account_slots, global_slots:
+            if work.empty():
+                return
+
+            driver = None
+            driver_dirty = False
+            try:
+                driver = self.driver_pool.acquire(user_id, headless=headless)
+                prepare_session(driver)
+
+                first = True
+                while True:
+                    try:
+                        index = work.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    if not first and pace:
+                        pace()
+                    first = False
+
+                    community = report.communities[index]
+                    try:
+                        success = post_one(driver, community)
+                        report.record(index, bool(success))
+                    except Exception as e:
+                        driver_dirty = True
+                        logger.error(f'向社團 {community["name"] or community["url"]} 發文失敗: {str(e)}')
+                        report.record(index, False, str(e))
+            except Exception as e:
+                driver_dirty = True
+                logger.error(f'發文瀏覽器初始化失敗 (user={user_id}): {str(e)}')
+            finally:
+                if driver is not None:
+                    self.driver_pool.release(driver, discard=driver_dirty)
+                connection.close()
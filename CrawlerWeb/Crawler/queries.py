@@ -0,0 +1,194 @@
+"""
+列表查詢
+排程、模板與社團列表以固定次數的查詢取得，不隨筆數增加：
+- 排程以 select_related 一併取得模板，並以 annotate 計算模板圖片數量
+- 模板的圖片以依 order 排序的 Prefetch 一次取得
+列表可依 pagination 的游標分頁，並只查詢、輸出 fields 指定的欄位。
+"""
+
+from django.db.models import Count, Prefetch
+
+from .models import Community, PostTemplate, PostTemplateImage, Schedule
+from .pagination import paginate, project
+
+COMMUNITY_FIELDS = (
+    'id', 'name', 'community_type', 'url', 'description', 'member_count', 'is_active',
+    'is_public', 'last_activity', 'created_at', 'updated_at', 'tags',
+)
+TEMPLATE_FIELDS = (
+    'id', 'title', 'content', 'hashtags', 'images', 'image_count', 'created_at', 'updated_at',
+)
+SCHEDULE_FIELDS = (
+    'id', 'name', 'description', 'status', 'is_active', 'execution_days', 'posting_times',
+    'platform', 'target_communities', 'total_executions', 'successful_executions',
+    'failed_executions', 'last_execution_time', 'next_execution', 'created_at', 'updated_at',
+    'template',
+)
+
+
+def _wants(fields, *names):
+    return fields is None or any(name in fields for name in names)
+
+
+def _page(queryset, order_field, serialize, page):
+    rows, next_cursor = paginate(queryset, order_field, page)
+    return {
+        'items': [serialize(row) for row in rows],
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    }
+
+
+# 社團
+def _community_value(community, field):
+    value = getattr(community, field)
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def serialize_community(community, fields=None):
+    # 只讀取要輸出的欄位，避免觸發延遲載入欄位的查詢
+    return {field: _community_value(community, field) for field in COMMUNITY_FIELDS if fields is None or field in fields}
+
+
+def user_communities_queryset(user, fields=None):
+    queryset = Community.objects.filter(user=user, is_active=True)
+    if fields is not None:
+        # 只讀取需要的欄位（created_at 用於排序與游標）
+        queryset = queryset.only(*(fields | {'created_at'}))
+    return queryset
+
+
+def get_community_page(user, page=None, fields=None):
+    """用戶的社團列表（1 次查詢），依建立時間遞減"""
+    return _page(
+        user_communities_queryset(user, fields),
+        'created_at',
+        lambda community: serialize_community(community, fields),
+        page,
+    )
+
+
+# 模板
+def ordered_images_prefetch():
+    """模板圖片依排序一次取得，結果放在 template.ordered_images"""
+    return Prefetch('images', queryset=PostTemplateImage.objects.order_by('order'), to_attr='ordered_images')
+
+
+def serialize_images(images):
+    """模板圖片資料，略過既沒有圖片檔案也沒有網址的圖片"""
+    images_data = []
+    for image in images:
+        image_url = image.get_image_url()
+        if not image_url:
+            continue
+        images_data.append({
+            'id': image.id,
+            'url': image_url,
+            'order': image.order,
+            'alt_text': image.alt_text
+        })
+    return images_data
+
+
+def serialize_template(template, fields=None):
+    data = {
+        'id': template.id,
+        'title': template.title,
+        'content': template.content,
+        'hashtags': template.hashtags,
+        'created_at': template.created_at.isoformat(),
+        'updated_at': template.updated_at.isoformat()
+    }
+    if hasattr(template, 'ordered_images'):
+        images_data = serialize_images(template.ordered_images)
+        data['images'] = images_data
+        data['image_count'] = len(images_data)
+    return project(data, fields)
+
+
+def user_templates_queryset(user, fields=None):
+    queryset = PostTemplate.objects.filter(user=user, is_active=True)
+    if _wants(fields, 'images', 'image_count'):
+        queryset = queryset.prefetch_related(ordered_images_prefetch())
+    return queryset
+
+
+def get_template_page(user, page=None, fields=None):
+    """用戶的活躍模板列表（2 次查詢，不需要圖片時 1 次），依建立時間遞減"""
+    return _page(
+        user_templates_queryset(user, fields),
+        'created_at',
+        lambda template: serialize_template(template, fields),
+        page,
+    )
+
+
+def get_template_list(user, fields=None):
+    return get_template_page(user, fields=fields)['items']
+
+
+def get_template_detail(user, template_id):
+    """單一模板（2 次查詢），找不到時拋出 PostTemplate.DoesNotExist"""
+    return serialize_template(user_templates_queryset(user).get(id=template_id))
+
+
+# 排程
+def user_schedules_queryset(user, fields=None):
+    queryset = Schedule.objects.filter(user=user)
+    if _wants(fields, 'template'):
+        queryset = queryset.select_related('template').annotate(
+            template_image_count=Count('template__images')
+        )
+    return queryset
+
+
+def serialize_schedule(schedule, fields=None):
+    next_execution = schedule.next_execution_at
+    schedule_data = {
+        'id': schedule.id,
+        'name': schedule.name,
+        'description': schedule.description,
+        'status': schedule.status,
+        'is_active': schedule.is_active,
+        'execution_days': schedule.execution_days,
+        'posting_times': schedule.posting_times,
+        'platform': schedule.platform,
+        'target_communities': schedule.target_communities,
+        'total_executions': schedule.total_executions,
+        'successful_executions': schedule.successful_executions,
+        'failed_executions': schedule.failed_executions,
+        'last_execution_time': schedule.last_execution_time.isoformat() if schedule.last_execution_time else None,
+        'next_execution': next_execution.isoformat() if next_execution else None,
+        'created_at': schedule.created_at.isoformat(),
+        'updated_at': schedule.updated_at.isoformat()
+    }
+
+    # 添加模板信息
+    if _wants(fields, 'template'):
+        template = schedule.template
+        if template:
+            schedule_data['template'] = {
+                'id': template.id,
+                'title': template.title,
+                'content': template.content,
+                'hashtags': template.hashtags,
+                'image_count': schedule.template_image_count,
+                'is_active': template.is_active
+            }
+        else:
+            schedule_data['template'] = None
+    return project(schedule_data, fields)
+
+
+def get_schedule_page(user, page=None, fields=None):
+    """用戶的排程列表（1 次查詢），依建立時間遞減"""
+    return _page(
+        user_schedules_queryset(user, fields),
+        'created_at',
+        lambda schedule: serialize_schedule(schedule, fields),
+        page,
+    )
+
+
+def get_schedule_list(user, fields=None):
+    return get_schedule_page(user, fields=fields)['items']
@@ -0,0 +1,104 @@
+"""
+排程時間計算
+計算排程的下次觸發時間，並提供以觸發時間排序的優先佇列，
+讓排程執行器只需在下一個到期時間醒來，而不必每分鐘檢查所有排程。
+"""
+
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def parse_posting_times(posting_times):
+    """將 ["09:00", "14:30"] 轉成排序後的 time 物件，忽略格式錯誤的項目"""
+    parsed = set()
+    for time_str in posting_times or []:
+        try:
+            parsed.add(datetime.strptime(time_str, '%H:%M').time())
+        except (TypeError, ValueError):
+            continue
+    return sorted(parsed)
+
+
+def canonical_slot(fire_time):
+    """觸發時間對齊到分鐘，作為執行記錄的唯一時間點"""
+    return fire_time.replace(second=0, microsecond=0)
+
+
+def compute_next_fire_time(execution_days, posting_times, after):
+    """
+    計算 after 之後（不含）的下一個觸發時間
+    以專案時區（settings.TIME_ZONE）解讀執行日期與發文時間，回傳 aware datetime
+    """
+    times = parse_posting_times(posting_times)
+    days = set(execution_days or [])
+    if not times or not days:
+        return None
+
+    local_after = timezone.localtime(after)
+    for offset in range(8):  # 最多檢查 7 天後（含今天共 8 天）
+        date = local_after.date() + timedelta(days=offset)
+        if WEEKDAYS[date.weekday()] not in days:
+            continue
+        for time_obj in times:
+            candidate = timezone.make_aware(datetime.combine(date, time_obj))
+            if candidate > after:
+                return candidate
+    return None
+
+
+class FireTimeQueue:
+    """
+    以下次觸發時間排序的排程佇列
+    同一個排程重新排入時，舊的項目會在取出時被略過（lazy invalidation）
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}  # schedule_id -> (fire_time, seq)
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, schedule_id):
+        return schedule_id in self._entries
+
+    def upsert(self, schedule_id, fire_time):
+        """排入或更新排程的觸發時間；fire_time 為 None 時移除"""
+        if fire_time is None:
+            self.remove(schedule_id)
+            return
+        seq = next(self._counter)
+        self._entries[schedule_id] = (fire_time, seq)
+        heapq.heappush(self._heap, (fire_time, seq, schedule_id))
+
+    def remove(self, schedule_id):
+        self._entries.pop(schedule_id, None)
+
+    def _discard_stale(self):
+        while self._heap:
+            fire_time, seq, schedule_id = self._heap[0]
+            if self._entries.get(schedule_id) == (fire_time, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def peek_time(self):
+        """下一個觸發時間，佇列為空時回傳 None"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """取出所有觸發時間 <= now 的排程，回傳 [(schedule_id, fire_time), ...]"""
+        due = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            fire_time, _, schedule_id = heapq.heappop(self._heap)
+            del self._entries[schedule_id]
+            due.append((schedule_id, fire_time))
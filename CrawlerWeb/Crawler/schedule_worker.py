@@ -0,0 +1,81 @@
+"""
+排程執行器程序
+由 run_scheduler --workers N 以獨立程序啟動，從 ScheduleExecution 佇列認領到期的工作並執行，
+執行期間以背景執行緒定期更新心跳，讓派送器能辨識並回收已死亡程序的工作。
+"""
+
+import logging
+import os
+import signal
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _heartbeat_loop(execution_id, worker_id, interval, stop_event):
+    from django.db import connection
+    from Crawler.job_queue import heartbeat
+
+    try:
+        while not stop_event.wait(interval):
+            try:
+                if not heartbeat(execution_id, worker_id):
+                    # 工作已被派送器回收，不再更新
+                    return
+            except Exception as e:
+                logger.error(f'更新執行記錄 {execution_id} 心跳失敗: {str(e)}')
+    finally:
+        connection.close()
+
+
+def worker_main(worker_id, poll_interval, lease_seconds, stop_event):
+    """
+    執行器程序進入點（以 spawn 方式啟動，需自行初始化 Django）
+    派送器設定 stop_event 後，完成手上的工作才結束，不會在發文途中停止
+    """
+    # 終端機的 Ctrl+C 會送到整個程序群組，由派送器透過 stop_event 通知結束
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CrawlerWeb.settings')
+    import django
+    django.setup()
+
+    from django.db import close_old_connections
+    from Crawler.driver_pool import prewarm_for_upcoming_schedules
+    from Crawler.job_queue import claim_next_execution, reclaim_worker_executions
+    from Crawler.management.commands.run_scheduler import Command
+
+    command = Command()
+    heartbeat_interval = max(1, lease_seconds // 3)
+    logger.info(f'執行程序 {worker_id} 已啟動 (pid={os.getpid()})')
+
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            execution = claim_next_execution(worker_id)
+            if execution is None:
+                # 閒置時為即將到期的排程預先啟動瀏覽器，認領後不必冷啟動 Chrome
+                prewarm_for_upcoming_schedules()
+                stop_event.wait(poll_interval)
+                continue
+
+            beat_stop = threading.Event()
+            beat = threading.Thread(
+                target=_heartbeat_loop,
+                args=(execution.id, worker_id, heartbeat_interval, beat_stop),
+                name=f'heartbeat-{execution.id}',
+                daemon=True,
+            )
+            beat.start()
+            try:
+                command.run_execution(execution)
+            except Exception as e:
+                logger.error(f'執行程序 {worker_id} 處理執行記錄 {execution.id} 失敗: {str(e)}')
+            finally:
+                beat_stop.set()
+                beat.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # 正常結束時把手上的工作放回佇列
+        reclaim_worker_executions(worker_id)
+        logger.info(f'執行程序 {worker_id} 已停止')
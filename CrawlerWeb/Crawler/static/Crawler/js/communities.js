@@ -10,8 +10,7 @@ async function loadCommunities() {
 
 	try {
 		console.log('開始載入社團列表...');
-		const response = await fetch('/crawler/api/communities/');
-		const result = await response.json();
+		const { response, result } = await window.fetchAllPages('/crawler/api/communities/', 'communities');
 		console.log('社團列表響應:', result);
 
 		if (response.ok && result.success) {
@@ -107,7 +106,9 @@ async function refreshCommunities() {
 				'X-CSRFToken': csrfToken,
 			},
 			body: JSON.stringify({
-				action: 'refresh'
+				action: 'refresh',
+				// 完整掃描，刪除已退出的社團
+				full_scan: true
 			})
 		});
 
@@ -231,8 +232,7 @@ async function loadFacebookCommunitiesFromDatabase() {
 	const communitiesList = document.getElementById('communitiesList');
 	
 	try {
-		const response = await fetch('/crawler/api/communities/');
-		const result = await response.json();
+		const { response, result } = await window.fetchAllPages('/crawler/api/communities/', 'communities');
 		
 		if (response.ok && result.success) {
 			const facebookCommunities = result.communities.filter(community => 
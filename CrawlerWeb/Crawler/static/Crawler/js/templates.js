@@ -39,8 +39,7 @@ async function loadPostTemplates() {
 	const currentSelectedHashtag = hashtagFilter ? hashtagFilter.value : 'all';
 	
 	try {
-		const response = await fetch('/crawler/api/templates/');
-		const result = await response.json();
+		const { response, result } = await window.fetchAllPages('/crawler/api/templates/', 'templates');
 		
 		if (response.ok && result.success) {
 			// 更新標籤篩選器選項
@@ -232,14 +231,13 @@ async function updateCopyTemplateOptions() {
 	
 	try {
 		console.log('開始調用 API: /crawler/api/templates/');
-		const response = await fetch('/crawler/api/templates/');
+		const { response, result } = await window.fetchAllPages('/crawler/api/templates/', 'templates');
 		console.log('API 響應狀態:', response.status, response.statusText);
 		
 		if (!response.ok) {
 			throw new Error(`API 請求失敗: ${response.status} ${response.statusText}`);
 		}
 		
-		const result = await response.json();
 		console.log('API 返回的數據:', result);
 		
 		if (result.success) {
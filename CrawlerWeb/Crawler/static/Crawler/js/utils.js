@@ -427,7 +427,32 @@ function removeTemplateImageFromUpload(index) {
 	}
 }
 
+// 依 next_cursor 逐頁載入列表 API（每頁大小由伺服器決定），回傳合併所有頁面後的 { response, result }
+async function fetchAllPages(url, key) {
+	const items = [];
+	let cursor = null;
+	let response;
+	let result;
+	do {
+		const separator = url.includes('?') ? '&' : '?';
+		response = await fetch(cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url);
+		result = await response.json();
+		if (!response.ok || !result.success) {
+			return { response, result };
+		}
+		items.push(...(result[key] || []));
+		cursor = result.has_more ? result.next_cursor : null;
+	} while (cursor);
+
+	result[key] = items;
+	result.count = items.length;
+	result.has_more = false;
+	result.next_cursor = null;
+	return { response, result };
+}
+
 // 導出全局函數
+window.fetchAllPages = fetchAllPages;
 window.handleCopySave = handleCopySave;
 window.handleImageUpload = handleImageUpload;
 window.removeImage = removeImage;
@@ -1,3 +1,345 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from datetime import timedelta
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import job_queue, waits
+from .driver_pool import DriverPool
+from .management.commands.run_scheduler import Command
+from .media_gc import referenced_names
+from .models import Community, PostTemplate, PostTemplateImage, Schedule, ScheduleExecution
+from .queries import get_schedule_list, get_template_detail, get_template_list
+from .typing_strategies import InsertTextTyping
+
+User = get_user_model()
+
+
+def create_template_with_schedule(user, index):
+    template = PostTemplate.objects.create(user=user, title=f'模板 {index}', content='內容')
+    # 依相反順序建立，確認圖片依 order 排序
+    for order in reversed(range(3)):
+        PostTemplateImage.objects.create(template=template, order=order, alt_text=f'/media/templates/{index}_{order}.jpg')
+    Schedule.objects.create(
+        user=user,
+        name=f'排程 {index}',
+        execution_days=['monday'],
+        posting_times=['09:00'],
+        message_content='內容',
+        target_communities=[],
+        template=template,
+    )
+    return template
+
+
+class ListingQueryCountTests(TestCase):
+    """排程與模板列表的查詢次數不隨筆數增加"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='listing_user', email='listing@example.com', password='password')
+        for index in range(3):
+            create_template_with_schedule(cls.user, index)
+
+    def test_schedule_list_uses_one_query(self):
+        with self.assertNumQueries(1):
+            schedules = get_schedule_list(self.user)
+        self.assertEqual(len(schedules), 3)
+        self.assertTrue(all(schedule['template']['image_count'] == 3 for schedule in schedules))
+
+    def test_template_list_uses_two_queries(self):
+        with self.assertNumQueries(2):
+            templates = get_template_list(self.user)
+        self.assertEqual(len(templates), 3)
+        for template in templates:
+            self.assertEqual([image['order'] for image in template['images']], [0, 1, 2])
+
+    def test_template_detail_uses_two_queries(self):
+        template = PostTemplate.objects.filter(user=self.user).first()
+        with self.assertNumQueries(2):
+            data = get_template_detail(self.user, template.id)
+        self.assertEqual(data['image_count'], 3)
+
+    def test_listing_views_do_not_grow_with_rows(self):
+        self.client.force_login(self.user)
+        for name in ('schedule_api', 'user_templates', 'post_templates'):
+            with CaptureQueriesContext(connection) as before:
+                self.client.get(reverse(name))
+            create_template_with_schedule(self.user, f'{name}_extra')
+            with CaptureQueriesContext(connection) as after:
+                response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(before), len(after), name)
+
+
+class CursorPaginationTests(TestCase):
+    """列表 API 的游標分頁與欄位選擇"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='page_user', email='page@example.com', password='password')
+        for index in range(5):
+            create_template_with_schedule(cls.user, index)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_pages_cover_every_row_once(self):
+        expected = [schedule['id'] for schedule in get_schedule_list(self.user)]
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(reverse('schedule_api'), {'limit': 2, 'cursor': cursor}).json()
+            self.assertLessEqual(response['count'], 2)
+            seen.extend(schedule['id'] for schedule in response['schedules'])
+            if not response['has_more']:
+                break
+            cursor = response['next_cursor']
+        self.assertEqual(seen, expected)
+
+    @override_settings(CRAWLER_API_PAGE_SIZE=2)
+    def test_listing_is_paginated_by_default(self):
+        response = self.client.get(reverse('post_templates')).json()
+        self.assertEqual(response['count'], 2)
+        self.assertTrue(response['has_more'])
+
+    def test_editing_template_while_paging_does_not_skip_rows(self):
+        expected = [template['id'] for template in get_template_list(self.user)]
+        first = self.client.get(reverse('post_templates'), {'limit': 2}).json()
+        # 分頁途中編輯最後一筆模板（updated_at 會變成最新）
+        last = PostTemplate.objects.get(id=expected[-1])
+        last.title = '已編輯'
+        last.save()
+
+        seen = [template['id'] for template in first['templates']]
+        cursor = first['next_cursor']
+        while cursor:
+            response = self.client.get(reverse('post_templates'), {'limit': 2, 'cursor': cursor}).json()
+            seen.extend(template['id'] for template in response['templates'])
+            cursor = response['next_cursor']
+        self.assertEqual(seen, expected)
+
+    def test_fields_projection(self):
+        response = self.client.get(reverse('user_templates'), {'limit': 10, 'fields': 'title'}).json()
+        self.assertEqual(set(response['templates'][0]), {'id', 'title'})
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(reverse('post_templates'), {'cursor': 'bad'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('schedule_api'), {'fields': 'password'}).status_code, 400)
+
+
+class ScheduleQueueTests(TestCase):
+    """暫停、取消或修改時間的排程不會由執行器程序發文"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='queue_user', email='queue@example.com', password='password')
+        self.schedule = Schedule.objects.create(
+            user=self.user,
+            name='排程',
+            execution_days=['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'],
+            posting_times=['09:00'],
+            message_content='內容',
+            target_communities=[],
+        )
+        job_queue.sync_pending_executions(self.schedule)
+        # 讓預先寫入的記錄到期
+        ScheduleExecution.objects.filter(schedule=self.schedule).update(scheduled_time=timezone.now() - timedelta(minutes=1))
+
+    def test_paused_schedule_is_not_claimed(self):
+        self.schedule.status = 'paused'
+        self.schedule.is_active = False
+        self.schedule.save()
+        self.assertIsNone(job_queue.claim_next_execution('worker-test'))
+
+        job_queue.sync_pending_executions(self.schedule)
+        self.assertEqual(self.schedule.executions.get().status, 'cancelled')
+
+        # 重新啟用時同一時間點的記錄回到佇列
+        self.schedule.status = 'active'
+        self.schedule.is_active = True
+        self.schedule.save()
+        job_queue.sync_pending_executions(self.schedule)
+        self.assertEqual(self.schedule.executions.get().status, 'pending')
+
+    def test_retimed_schedule_moves_pending_row(self):
+        old_slot = self.schedule.executions.get().slot
+        self.schedule.posting_times = ['21:30']
+        self.schedule.save()
+        job_queue.sync_pending_executions(self.schedule)
+
+        self.assertEqual(self.schedule.executions.get(slot=old_slot).status, 'cancelled')
+        pending = self.schedule.executions.get(status='pending')
+        self.assertEqual(timezone.localtime(pending.slot).strftime('%H:%M'), '21:30')
+
+    def test_waiting_rows_are_not_cancelled_while_dispatching(self):
+        # 執行程序都在忙時，記錄等待超過 MISFIRE_GRACE 仍要留在佇列
+        ScheduleExecution.objects.filter(schedule=self.schedule).update(scheduled_time=timezone.now() - timedelta(minutes=30))
+        command = Command()
+        command.worker_processes = {}
+        command.supervise_workers()
+        self.assertEqual(self.schedule.executions.get().status, 'pending')
+
+    def test_retry_skips_communities_already_posted(self):
+        execution = self.schedule.executions.get()
+        progress = job_queue.ExecutionProgress(execution)
+        progress.mark('https://facebook.com/groups/a', progress.SUCCESS)
+        progress.mark('https://facebook.com/groups/b', progress.STARTED)
+        progress.mark('https://facebook.com/groups/c', progress.FAILED)
+
+        # 執行程序中斷後重新執行，從資料庫讀回進度
+        execution.refresh_from_db()
+        communities = [{'url': f'https://facebook.com/groups/{name}', 'name': name} for name in 'abcd']
+        remaining, skipped = job_queue.ExecutionProgress(execution).split(communities)
+        self.assertEqual([community['name'] for community in remaining], ['c', 'd'])
+        self.assertEqual(skipped, (1, 1))
+
+    def test_rows_created_without_slot_are_unique_per_slot(self):
+        scheduled_time = timezone.now() + timedelta(days=3)
+        ScheduleExecution.objects.create(schedule=self.schedule, scheduled_time=scheduled_time)
+        with self.assertRaises(IntegrityError):
+            ScheduleExecution.objects.create(schedule=self.schedule, scheduled_time=scheduled_time)
+
+
+class MediaReferenceTests(TestCase):
+    """排程保存的圖片網址不會被當成未引用檔案"""
+
+    def test_schedule_images_are_referenced(self):
+        user = User.objects.create_user(username='media_user', email='media@example.com', password='password')
+        Schedule.objects.create(
+            user=user,
+            name='排程',
+            execution_days=['monday'],
+            posting_times=['09:00'],
+            message_content='內容',
+            target_communities=[],
+            template_images=[{'url': '/media/templates/old_copy.jpg', 'order': 0}, '/media/blobs/ab/abcd.png'],
+        )
+        self.assertIn('templates/old_copy.jpg', referenced_names('templates'))
+        self.assertIn('blobs/ab/abcd.png', referenced_names('blobs'))
+
+
+class FakeEditor:
+    """記錄點擊、插入與按鍵順序的假編輯器與驅動程式"""
+
+    def __init__(self):
+        self.events = []
+        self.parent = self
+        self.switch_to = self
+
+    @property
+    def active_element(self):
+        return self
+
+    def click(self):
+        self.events.append('click')
+
+    def send_keys(self, keys):
+        self.events.append('enter')
+
+    def execute_cdp_cmd(self, command, params):
+        self.events.append(params['text'])
+
+
+class FakeDriver:
+    """健康檢查與重設一律成功的假驅動程式"""
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+class ScriptTimeoutTests(SimpleTestCase):
+    """等待網路閒置後還原共用瀏覽器的腳本逾時"""
+
+    def test_script_timeout_is_restored(self):
+        driver = FakeDriver()
+        driver.timeouts = SimpleNamespace(script=30)
+        driver.script_timeouts = []
+        driver.set_script_timeout = driver.script_timeouts.append
+        driver.execute_async_script = lambda script, *args: True
+
+        self.assertTrue(waits.wait_for_network_idle(driver, timeout=60))
+        self.assertEqual(driver.script_timeouts, [65, 30])
+
+
+class DriverPoolPrewarmTests(SimpleTestCase):
+    """預熱只補足閒置瀏覽器，不會關閉其他使用者的瀏覽器"""
+
+    def setUp(self):
+        self.created = []
+        self.pool = DriverPool(max_size=2, driver_factory=self.create_driver)
+
+    def create_driver(self, headless):
+        driver = FakeDriver()
+        self.created.append(driver)
+        return driver
+
+    def test_prewarm_tops_up_idle_drivers(self):
+        self.assertEqual(self.pool.prewarm(1), 1)
+        self.assertEqual(self.pool.prewarm(1), 0)
+        # 借出時沿用預熱的瀏覽器
+        self.assertIs(self.pool.acquire(1), self.created[0])
+
+    def test_prewarm_does_not_evict_other_users(self):
+        self.pool.prewarm(1)
+        self.pool.prewarm(2)
+        self.assertEqual(self.pool.prewarm(3), 0)
+        self.assertEqual(self.pool.stats()['idle'], 2)
+
+
+@override_settings(CRAWLER_PACING_POLICY='off')
+class InsertTextTypingTests(SimpleTestCase):
+    def test_clicks_once_and_inserts_at_caret(self):
+        editor = FakeEditor()
+        InsertTextTyping().type(editor, '第一行\n第二行\n\n第四行')
+        self.assertEqual(editor.events, ['click', '第一行', 'enter', '第二行', 'enter', 'enter', '第四行'])
+
+
+class DataExportTests(TestCase):
+    """匯出只包含自己的資料，CSV 儲存格不會被試算表當成公式"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='export_user', email='export@example.com', password='password')
+        other = User.objects.create_user(username='other_user', email='other@example.com', password='password')
+        Community.objects.create(user=cls.user, name='=HYPERLINK("http://evil")', url='https://facebook.com/groups/1', tags=['a'])
+        Community.objects.create(user=cls.user, name='一般社團', url='https://facebook.com/groups/2')
+        Community.objects.create(user=other, name='別人的社團', url='https://facebook.com/groups/3')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('data_export', args=['communities'])
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertIn('attachment; filename="communities_', response['Content-Disposition'])
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['=HYPERLINK("http://evil")', '一般社團'])
+        self.assertEqual(rows[0]['tags'], ['a'])
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(response['Content-Disposition'].endswith('.csv"'))
+        content = b''.join(response.streaming_content).decode()
+        self.assertTrue(content.startswith('\ufeff'))
+        rows = list(csv.DictReader(io.StringIO(content[1:])))
+        self.assertEqual([row['name'] for row in rows], ['\'=HYPERLINK("http://evil")', '一般社團'])
+        self.assertEqual(rows[0]['tags'], '["a"]')
+
+    def test_invalid_dataset_or_format(self):
+        self.assertEqual(self.client.get(reverse('data_export', args=['users'])).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'format': 'xlsx'}).status_code, 400)
@@ -0,0 +1,127 @@
+"""
+文字輸入策略
+- per_character：逐字 send_keys，每個字之間隨機延遲（原本的 human_type）
+- chunked：以詞或短句為單位分段送出，段落之間隨機延遲
+- insert_text：透過 CDP Input.insertText（或 document.execCommand('insertText')）一次插入整段文字
+立即發文與排程執行都以 get_typing_strategy(mode) 取得策略，排程的模式保存在 Schedule.typing_mode。
+"""
+
+import logging
+import random
+import re
+
+from django.conf import settings
+from selenium.webdriver.common.keys import Keys
+
+from . import waits
+
+logger = logging.getLogger(__name__)
+
+# 英數字詞（含後方空白）、單一標點或空白、其他文字（中文等）最多 6 個字一段
+CHUNK_PATTERN = re.compile(r'[A-Za-z0-9_\-\'.@#:/]+\s*|\n|[^\S\n]+|[^\w\s]|[^\x00-\x7f\s]{1,6}')
+
+# 在目前的游標位置插入文字（不重新 focus，避免游標移回編輯器開頭或點擊位置）
+INSERT_TEXT_SCRIPT = """
+return document.execCommand('insertText', false, arguments[0]);
+"""
+
+
+class TypingStrategy:
+    """輸入策略介面"""
+
+    mode = None
+
+    def type(self, element, text):
+        raise NotImplementedError
+
+
+class PerCharacterTyping(TypingStrategy):
+    """逐字輸入"""
+
+    mode = 'per_character'
+
+    def __init__(self, min_delay=0.05, max_delay=0.15):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    def type(self, element, text):
+        for char in text:
+            element.send_keys(char)
+            # 隨機延遲，模擬人類打字速度
+            waits.pace(self.min_delay, self.max_delay, label='typing')
+
+
+class ChunkedTyping(TypingStrategy):
+    """以詞或短句為單位分段輸入，每段 1~3 個片段"""
+
+    mode = 'chunked'
+
+    def __init__(self, min_delay=0.15, max_delay=0.45, max_pieces=3):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_pieces = max_pieces
+
+    def split(self, text):
+        pieces = CHUNK_PATTERN.findall(text)
+        chunks = []
+        index = 0
+        while index < len(pieces):
+            size = random.randint(1, self.max_pieces)
+            chunks.append(''.join(pieces[index:index + size]))
+            index += size
+        return chunks
+
+    def type(self, element, text):
+        for chunk in self.split(text):
+            element.send_keys(chunk)
+            waits.pace(self.min_delay, self.max_delay, label='typing_chunk')
+
+
+class InsertTextTyping(TypingStrategy):
+    """
+    一次插入整段文字（不經過逐鍵事件）
+    換行仍以 Enter 送出，讓編輯器建立新段落
+    """
+
+    mode = 'insert_text'
+
+    def _insert(self, driver, text):
+        """在目前的游標位置插入文字"""
+        try:
+            driver.execute_cdp_cmd('Input.insertText', {'text': text})
+        except Exception:
+            # 非 Chromium 或不支援 CDP 時改用 execCommand
+            if not driver.execute_script(INSERT_TEXT_SCRIPT, text):
+                driver.switch_to.active_element.send_keys(text)
+
+    def type(self, element, text):
+        driver = element.parent
+        # 只在開始時點擊一次，之後都在游標位置插入；再次點擊會把游標移到點擊處，後面的行會插進前面的段落
+        element.click()
+        lines = text.split('\n')
+        for index, line in enumerate(lines):
+            if index > 0:
+                driver.switch_to.active_element.send_keys(Keys.ENTER)
+            if line:
+                self._insert(driver, line)
+        waits.pace(0.3, 0.8, label='typing_insert')
+
+
+_STRATEGIES = {
+    strategy.mode: strategy
+    for strategy in (PerCharacterTyping, ChunkedTyping, InsertTextTyping)
+}
+
+
+def get_default_typing_mode():
+    return getattr(settings, 'CRAWLER_TYPING_MODE', 'per_character')
+
+
+def get_typing_strategy(mode=None, **kwargs):
+    """依模式取得輸入策略，未知的模式使用預設值"""
+    mode = mode or get_default_typing_mode()
+    strategy_class = _STRATEGIES.get(mode)
+    if strategy_class is None:
+        logger.warning(f'未知的輸入模式 {mode}，改用 {get_default_typing_mode()}')
+        strategy_class = _STRATEGIES.get(get_default_typing_mode(), PerCharacterTyping)
+    return strategy_class(**kwargs)
@@ -33,6 +33,9 @@ urlpatterns = [
 	
 	# 用戶模板選項 API
 	path('api/user/templates/', views.UserTemplatesView.as_view(), name='user_templates'),
+	
+	# 資料匯出 API（communities / posts / executions，?format=ndjson 或 csv）
+	path('api/export/<str:dataset>/', views.DataExportView.as_view(), name='data_export'),
 ]
 
 
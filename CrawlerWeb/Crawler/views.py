@@ -6,10 +6,10 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.conf import settings
+from django.db import transaction
 from Accounts.models import WebsiteCookie
 from .models import Community, PostTemplate, PostTemplateImage
 import json
-import time
 import os
 import random
 from selenium import webdriver
@@ -17,11 +17,26 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from .models import Schedule, ScheduleExecution
+from .job_queue import sync_pending_executions
+from .driver_pool import get_driver_pool, prewarm_in_background
+from .chromedriver_resolver import get_chromedriver_path
+from .posting_engine import ParallelPostingEngine
+from .community_sync import sync_communities
+from .community_discovery import harvest_group_links
+from . import waits
+from .typing_strategies import PerCharacterTyping, get_default_typing_mode, get_typing_strategy
+from .attachments import attach_images, resolve_image_paths
+from .image_store import create_template_image
+from .exports import export_response
+from .pagination import PaginationError, parse_fields, parse_page_request
+from .queries import (
+    COMMUNITY_FIELDS, SCHEDULE_FIELDS, TEMPLATE_FIELDS,
+    get_community_page, get_schedule_page, get_template_detail, get_template_page,
+)
 from django.utils import timezone
 import logging
 from datetime import datetime, timedelta
@@ -79,20 +94,16 @@ class FacebookAutomationView(View):
 	Facebook 自動化視圖
 	"""
 	
-	def human_delay(self, min_seconds=1, max_seconds=3.0):
-		"""人類化的隨機延遲"""
-		delay = random.uniform(min_seconds, max_seconds)
-		# 調試訊息已移除
-		time.sleep(delay)
+	def human_delay(self, min_seconds=1, max_seconds=3.0, label='human_delay'):
+		"""人類化的隨機延遲（節奏延遲，長度依 CRAWLER_PACING_POLICY 縮放）"""
+		waits.pace(min_seconds, max_seconds, label=label)
 	
-	def human_type(self, element, text, min_delay=0.05, max_delay=0.15):
-		"""人類化的打字速度"""
-		# 調試訊息已移除
-		for char in text:
-			element.send_keys(char)
-			# 隨機延遲，模擬人類打字速度
-			delay = random.uniform(min_delay, max_delay)
-			time.sleep(delay)
+	def human_type(self, element, text, min_delay=0.05, max_delay=0.15, mode=None):
+		"""人類化的文字輸入（mode 為 per_character、chunked 或 insert_text，預設讀取 CRAWLER_TYPING_MODE）"""
+		strategy = get_typing_strategy(mode)
+		if isinstance(strategy, PerCharacterTyping):
+			strategy = PerCharacterTyping(min_delay, max_delay)
+		strategy.type(element, text)
 
 	def human_scroll(self, driver, direction="down", distance=None):
 		"""人類化的滾動行為"""
@@ -105,7 +116,7 @@ class FacebookAutomationView(View):
 			driver.execute_script(f"window.scrollBy(0, -{distance});")
 		
 		# 調試訊息已移除
-		self.human_delay(0.3, 1.0)
+		self.human_delay(0.3, 1.0, label='human_scroll')
 	
 	def human_move_mouse(self, driver, element):
 		"""人類化的鼠標移動"""
@@ -114,7 +125,7 @@ class FacebookAutomationView(View):
 		actions.move_to_element(element)
 		actions.perform()
 
-		self.human_delay(0.2, 0.8)
+		self.human_delay(0.2, 0.8, label='human_move_mouse')
 	
 	def random_human_behavior(self, driver):
 		"""隨機的人類行為"""
@@ -238,6 +249,9 @@ class FacebookAutomationView(View):
 
 			driver.quit()
 			
+			# 預先啟動之後取得社團與發文會用到的瀏覽器
+			prewarm_in_background(request.user.id)
+			
 			# 準備回應訊息
 			message = f'成功獲取並保存 {len(filtered_cookies)} 個 {platform} Cookie'
 			if platform == 'facebook' and communities:
@@ -268,8 +282,8 @@ class FacebookAutomationView(View):
 			except WebsiteCookie.DoesNotExist:
 				return JsonResponse({'error': '請先登入 Facebook 並保存 Cookie'}, status=400)
 			
-			# 使用保存的 Cookie 登入並獲取社團
-			driver = self._setup_driver()
+			# 使用保存的 Cookie 登入並獲取社團（從瀏覽器池借用）
+			driver = get_driver_pool().acquire(request.user.id)
 			driver.get("https://www.facebook.com/")
 			
 			# 添加 Cookie
@@ -278,63 +292,23 @@ class FacebookAutomationView(View):
 				for name, value in cookie_data.items():
 					driver.add_cookie({'name': name, 'value': value})
 			else:
+				get_driver_pool().release(driver)
 				return JsonResponse({'error': 'Cookie 資料格式錯誤'}, status=400)
 			
 			driver.refresh()
-			time.sleep(2)
+			waits.wait_for_document_ready(driver, label='login_refresh')
 			
-			# 前往社團頁面
-			driver.get("https://www.facebook.com/groups/joins/?nav_source=tab&ordering=viewer_added")
-			
-			# 滾動到底部獲取所有社團
-			self._scroll_to_bottom(driver)
-			
-			# 獲取社團列表
-			communities = []
-			try:
-				community_container = driver.find_element(
-					By.XPATH, 
-					'/html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div[2]/div/div/div/div/div/div/div/div/div/div[3]'
-				)
-				community_links = community_container.find_elements(By.TAG_NAME, 'a')
-				
-				for link in community_links:
-					name = link.text
-					url = link.get_attribute('href')
-					if name and url and '查看社團' not in name:
-						communities.append({
-							'name': name,
-							'url': url
-						})
-			except Exception as e:
-				pass  # 如果無法獲取社團，繼續執行
-			
-			# 更新資料庫：刪除舊的社團並添加新的社團
-			existing_communities = Community.objects.filter(
-				user=request.user,
-				community_type='facebook'
-			)
+			# 邊捲動邊收集社團（增量模式遇到一串已知社團即停止）
+			known_urls = self._get_known_community_urls(request.user, data.get('full_scan', False))
+			communities, complete = self._discover_facebook_communities(driver, known_urls)
 			
-			# 創建現有社團 URL 的集合
-			existing_urls = set(community.url for community in existing_communities)
-			new_urls = set(community['url'] for community in communities)
+			get_driver_pool().release(driver)
+			driver = None
 			
-			# 刪除不再存在的社團
-			urls_to_delete = existing_urls - new_urls
-			deleted_count = 0
-			if urls_to_delete:
-				deleted_communities = Community.objects.filter(
-					user=request.user,
-					community_type='facebook',
-					url__in=urls_to_delete
-				)
-				deleted_count = deleted_communities.count()
-				deleted_communities.delete()
-
-			# 添加新的社團
-			added_count = self._save_communities_to_db(request.user, communities)
-
-			driver.quit()
+			# 更新資料庫：一次比對新增、更新與刪除（只有完整掃描才刪除沒看到的社團）
+			sync_result = sync_communities(request.user, communities, prune=complete)
+			added_count = sync_result['added']
+			deleted_count = sync_result['removed']
 			
 			return JsonResponse({
 				'success': True,
@@ -342,13 +316,15 @@ class FacebookAutomationView(View):
 				'count': len(communities),
 				'message': f'社團列表已更新！新增 {added_count} 個，刪除 {deleted_count} 個',
 				'added_count': added_count,
+				'updated_count': sync_result['updated'],
 				'deleted_count': deleted_count,
-				'total_count': len(communities)
+				'total_count': len(communities),
+				'complete': complete
 			})
 			
 		except Exception as e:
 			if 'driver' in locals():
-				driver.quit()
+				get_driver_pool().release(driver, discard=True)
 			return JsonResponse({'error': f'獲取社團失敗: {str(e)}'}, status=500)
 	
 	def post_to_community(self, request, data):
@@ -360,6 +336,7 @@ class FacebookAutomationView(View):
 			
 			# 處理圖片路徑，支援模板圖片和額外圖片
 			template_images = data.get('template_images', [])
+			typing_mode = data.get('typing_mode')
 			additional_images = data.get('additional_images', [])
 			image_paths = data.get('image_paths', [])  # 保持向後兼容
 			
@@ -372,8 +349,8 @@ class FacebookAutomationView(View):
 			if image_paths:
 				all_image_paths.extend(image_paths)
 			
-			# 去重
-			all_image_paths = list(set(all_image_paths))
+			# 解析並檢查圖片路徑（去重），每個社團發文時不再重複處理
+			all_image_paths = resolve_image_paths(all_image_paths)
 			
 			if not community_urls or not message:
 				return JsonResponse({'error': '請提供社團連結和發文內容'}, status=400)
@@ -388,202 +365,18 @@ class FacebookAutomationView(View):
 			except WebsiteCookie.DoesNotExist:
 				return JsonResponse({'error': '請先登入 Facebook 並保存 Cookie'}, status=400)
 			
-			# 使用保存的 Cookie 登入並發文
-			driver = self._setup_driver()
-			driver.get("https://www.facebook.com/")
-			
-			# 添加 Cookie
-			for name, value in website_cookie.cookie_data.items():
-				driver.add_cookie({'name': name, 'value': value})
-			
-			driver.refresh()
-			time.sleep(2)
-			
-			success_count = 0
-			failed_count = 0
-			results = []
-			
-			# 遍歷所有選中的社團進行發文
-			for community_url in community_urls:
-				try:
-					# 前往社團並發文
-					driver.get(community_url)
-					driver.refresh()
-					
-					# 等待發文按鈕出現
-					# 等待任一發文按鈕出現
-					element = WebDriverWait(driver, 30).until(
-						EC.any_of(
-							EC.presence_of_element_located((
-								By.XPATH, 
-								'/html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div[4]/div/div[2]/div/div/div[2]/div[1]/div/div/div/div[1]/div/div[1]'
-							)),
-							EC.presence_of_element_located((
-								By.XPATH, 
-								'/html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div/div[2]/div/div/div[4]/div/div[2]/div/div/div/div[1]/div/div/div/div[1]/div/div[1]/span'
-							))
-						)
-					)
-					# 點擊發文按鈕
-					element.click()
-
-					# 等待發文表單出現
-					WebDriverWait(driver, 30).until(
-						EC.presence_of_element_located((
-							By.XPATH,
-							'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[2]/div[1]/div[1]/div[1]/div[1]/div/div/div[1]/p'
-						))
-					)
-					
-					# 輸入發文內容
-					post_input = driver.find_element(
-						By.XPATH,
-						'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[2]/div[1]/div[1]/div[1]/div[1]/div/div/div[1]/p'
-					)
-					
-					# 人類化的鼠標移動和文字輸入
-					self.human_move_mouse(driver, post_input)
-					self.human_type(post_input, message)
-					
-					# 隨機人類行為
-					self.random_human_behavior(driver)
-					
-					# 上傳圖片（如果有的話）
-					if all_image_paths:
-						try:
-							# 上傳圖片按鈕
-							# post_img_but = WebDriverWait(driver, 30).until(
-							# 	EC.any_of(
-							# 		EC.presence_of_element_located((
-							# 			By.XPATH, 
-							# 			'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[1]/div[2]/div[5]/div/span/div'
-							# 		)),
-							# 	)
-							# )
-							# post_img_but.click()
-							# self.human_delay(2.0, 3.0)
-							# 隨機點一個地方
-							# post_click = WebDriverWait(driver, 30).until(
-							# 	EC.any_of(
-							# 		EC.presence_of_element_located((
-							# 			By.XPATH, 
-							# 			'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[2]/div/div/div[1]/div[1]/h2'
-							# 		)),
-							# 	)
-							# ).click()
-
-							# 隨機點一個地方
-							post_click = WebDriverWait(driver, 30).until(
-								EC.any_of(
-									EC.presence_of_element_located((
-										By.XPATH, 
-										'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[1]/div[3]/div[2]/div[1]'
-									)),
-								)
-							).click()
-							post_click = WebDriverWait(driver, 30).until(
-								EC.any_of(
-									EC.presence_of_element_located((
-										By.XPATH, 
-										'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[1]/div[1]/div[1]'
-									)),
-								)
-							).click()
-							
-
-							# 查找圖片上傳按鈕
-							post_img = WebDriverWait(driver, 30).until(
-								EC.any_of(
-									EC.presence_of_element_located((
-										By.XPATH, 
-										'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[1]/div[2]/div[1]/input'
-									)),
-									EC.presence_of_element_located((
-										By.XPATH, 
-										'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[2]/div/div/div[2]/input'
-									)),
-									EC.presence_of_element_located((
-										By.XPATH, 
-										'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[1]/div[2]/div[1]/input'
-									)),
-								)
-							)
-
-							# 處理每張圖片
-							for i, img_path in enumerate(all_image_paths):
-								try:
-									# 轉換圖片路徑為絕對路徑
-									if img_path.startswith('/media/'):
-										# 相對路徑，轉換為絕對路徑
-										# 移除開頭的 /media/
-										relative_path = img_path.replace('/media/', '')
-										# 轉換為 Windows 路徑分隔符
-										relative_path = relative_path.replace('/', os.sep)
-										# 構建絕對路徑
-										absolute_path = os.path.join(settings.BASE_DIR, 'media', relative_path)
-
-										# 檢查文件是否存在
-										if os.path.exists(absolute_path):
-											# 上傳圖片
-											post_img.send_keys(absolute_path)
-											self.human_delay(2, 3)  # 人類化的等待時間
-										else:
-											continue
-									else:
-										# 已經是絕對路徑，直接使用
-										post_img.send_keys(img_path)
-										self.human_delay(2, 3)  # 人類化的等待時間
-										
-								except Exception as single_img_error:
-									continue
-									
-							# 所有圖片上傳完成後，再等待一下確保上傳穩定
-							if all_image_paths:
-								self.human_delay(1.5, 2.5)  # 人類化的等待時間
-								# post_img = WebDriverWait(driver, 30).until(
-								# 	EC.any_of(
-								# 		EC.presence_of_element_located((
-								# 			By.XPATH, 
-								# 			'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[2]/div/div/div[1]/div[3]/div'
-								# 		)),
-								# 	)
-								# )
-								# post_img.click()
-								
-						except Exception as img_error:
-							# 如果圖片上傳失敗，繼續執行，但記錄錯誤
-							print(f"圖片上傳失敗: {str(single_img_error)}")
-							pass
-					
-					time.sleep(1)
-					
-					# 點擊發文按鈕
-					submit_button = driver.find_element(
-						By.XPATH,
-						'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[3]/div[1]/div/div'
-					)
-					submit_button.click()
-					
-					success_count += 1
-					results.append({
-						'url': community_url,
-						'status': 'success',
-						'message': '發文成功'
-					})
-					
-					# 人類化的等待時間
-
-					self.human_delay(2.0, 4.0)
-					
-				except Exception as e:
-					failed_count += 1
-					results.append({
-						'url': community_url,
-						'status': 'failed',
-						'message': str(e)
-					})
-			
-			driver.quit()
+			# 平行發文：目標社團分散到多個瀏覽器同時處理
+			report = ParallelPostingEngine().run(
+				request.user.id,
+				community_urls,
+				prepare_session=lambda driver: self._login_with_cookies(driver, website_cookie.cookie_data),
+				post_one=lambda driver, community: self._post_single_community(driver, community['url'], message, all_image_paths, typing_mode),
+				pace=lambda: self.human_delay(2.0, 4.0, label='between_communities'),
+			)
+			success_count = report.success_count
+			failed_count = report.failed_count
+			results = report.results
+			waits.get_wait_recorder().log_summary('等待耗時統計（累計）')
 			
 			return JsonResponse({
 				'success': True,
@@ -594,10 +387,150 @@ class FacebookAutomationView(View):
 			})
 			
 		except Exception as e:
-			if 'driver' in locals():
-				driver.quit()
 			return JsonResponse({'error': f'發文失敗: {str(e)}'}, status=500)
 	
+	def _login_with_cookies(self, driver, cookie_data):
+		"""以保存的 Cookie 登入 Facebook"""
+		driver.get("https://www.facebook.com/")
+		
+		# 添加 Cookie
+		for name, value in cookie_data.items():
+			driver.add_cookie({'name': name, 'value': value})
+		
+		driver.refresh()
+		waits.wait_for_document_ready(driver, label='login_refresh')
+	
+	def _post_single_community(self, driver, community_url, message, all_image_paths, typing_mode=None):
+		"""在單一社團發文，失敗時拋出例外"""
+		# 前往社團並發文
+		driver.get(community_url)
+		driver.refresh()
+		
+		# 等待發文按鈕出現
+		# 等待任一發文按鈕出現
+		element = WebDriverWait(driver, 30).until(
+			EC.any_of(
+				EC.presence_of_element_located((
+					By.XPATH, 
+					'/html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div[4]/div/div[2]/div/div/div[2]/div[1]/div/div/div/div[1]/div/div[1]'
+				)),
+				EC.presence_of_element_located((
+					By.XPATH, 
+					'/html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div/div[2]/div/div/div[4]/div/div[2]/div/div/div/div[1]/div/div/div/div[1]/div/div[1]/span'
+				))
+			)
+		)
+		# 點擊發文按鈕
+		element.click()
+
+		# 等待發文表單出現
+		WebDriverWait(driver, 30).until(
+			EC.presence_of_element_located((
+				By.XPATH,
+				'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[2]/div[1]/div[1]/div[1]/div[1]/div/div/div[1]/p'
+			))
+		)
+		
+		# 輸入發文內容
+		post_input = driver.find_element(
+			By.XPATH,
+			'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[2]/div[1]/div[1]/div[1]/div[1]/div/div/div[1]/p'
+		)
+		
+		# 人類化的鼠標移動和文字輸入
+		self.human_move_mouse(driver, post_input)
+		self.human_type(post_input, message, mode=typing_mode)
+		
+		# 隨機人類行為
+		self.random_human_behavior(driver)
+		
+		# 上傳圖片（如果有的話）
+		if all_image_paths:
+			try:
+				# 上傳圖片按鈕
+				# post_img_but = WebDriverWait(driver, 30).until(
+				# 	EC.any_of(
+				# 		EC.presence_of_element_located((
+				# 			By.XPATH, 
+				# 			'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[1]/div[2]/div[5]/div/span/div'
+				# 		)),
+				# 	)
+				# )
+				# post_img_but.click()
+				# self.human_delay(2.0, 3.0)
+				# 隨機點一個地方
+				# post_click = WebDriverWait(driver, 30).until(
+				# 	EC.any_of(
+				# 		EC.presence_of_element_located((
+				# 			By.XPATH, 
+				# 			'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[2]/div/div/div[1]/div[1]/h2'
+				# 		)),
+				# 	)
+				# ).click()
+
+				# 隨機點一個地方
+				post_click = WebDriverWait(driver, 30).until(
+					EC.any_of(
+						EC.presence_of_element_located((
+							By.XPATH, 
+							'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[1]/div[3]/div[2]/div[1]'
+						)),
+					)
+				).click()
+				post_click = WebDriverWait(driver, 30).until(
+					EC.any_of(
+						EC.presence_of_element_located((
+							By.XPATH, 
+							'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[1]/div[1]/div[1]'
+						)),
+					)
+				).click()
+				
+
+				# 查找圖片上傳按鈕
+				post_img = WebDriverWait(driver, 30).until(
+					EC.any_of(
+						EC.presence_of_element_located((
+							By.XPATH, 
+							'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[1]/div[2]/div[1]/input'
+						)),
+						EC.presence_of_element_located((
+							By.XPATH, 
+							'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[2]/div/div/div[2]/input'
+						)),
+						EC.presence_of_element_located((
+							By.XPATH, 
+							'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[1]/div[2]/div[1]/input'
+						)),
+					)
+				)
+
+				# 一次送出所有圖片並等待縮圖出現
+				attach_images(driver, post_img, all_image_paths)
+				self.human_delay(0.5, 1.0, label='after_images')
+				
+			except Exception as img_error:
+				# 如果圖片上傳失敗，繼續執行，但記錄錯誤
+				print(f"圖片上傳失敗: {str(img_error)}")
+				pass
+		
+		waits.wait_for_dom_quiet(driver, label='before_submit')
+		
+		# 點擊發文按鈕
+		submit_button = driver.find_element(
+			By.XPATH,
+			'/html/body/div[1]/div/div[1]/div/div[4]/div/div/div[1]/div/div[2]/div/div/div/div/div[1]/form/div/div[1]/div/div/div/div[3]/div[3]/div[1]/div/div'
+		)
+		composer = submit_button.find_element(By.XPATH, './ancestor::form')
+		waits.track_requests(driver)
+		submit_button.click()
+		
+		# 等待發文對話框關閉且送出的請求結束，再前往下一個社團
+		if not waits.wait_for_submission(driver, composer, label='after_submit'):
+			logger.warning('等待貼文送出完成逾時')
+		
+		return True
+	
 	def _setup_driver(self, headless=False):
 		"""設置 Chrome 驅動程式"""
 		
@@ -628,8 +561,8 @@ class FacebookAutomationView(View):
 		options.add_experimental_option('excludeSwitches', ['enable-logging'])
 		options.add_experimental_option('useAutomationExtension', False)  # 禁用自動化擴展
 		
-		# 使用 webdriver_manager 自動管理 ChromeDriver
-		service = Service(ChromeDriverManager().install())
+		# 使用啟動時解析好的 ChromeDriver 路徑（不會連網）
+		service = Service(get_chromedriver_path())
 		
 		driver = webdriver.Chrome(service=service, options=options)
 		
@@ -648,137 +581,48 @@ class FacebookAutomationView(View):
 		return driver
 	
 	def _scroll_to_bottom(self, driver, pause_time=2):
-		"""滾動到頁面底部"""
+		"""滾動到頁面底部（頁面高度增加就繼續，最多等待 pause_time 秒）"""
 		last_height = driver.execute_script("return document.body.scrollHeight")
 		while True:
 			driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-			time.sleep(pause_time)
-			new_height = driver.execute_script("return document.body.scrollHeight")
-			if new_height == last_height:
+			def _grew(d, previous=last_height):
+				height = d.execute_script("return document.body.scrollHeight")
+				return height if height > previous else False
+			
+			new_height = waits.wait_until(driver, _grew, timeout=pause_time, label='scroll_to_bottom')
+			if new_height is None:
 				break
 			last_height = new_height
 	
 	def _get_facebook_communities(self, driver, cookies):
-		"""獲取 Facebook 社團列表"""
+		"""獲取 Facebook 社團列表（完整掃描）"""
+		communities, complete = self._discover_facebook_communities(driver)
+		return communities
+	
+	def _discover_facebook_communities(self, driver, known_urls=None):
+		"""
+		邊捲動邊收集社團，回傳 (communities, complete)
+		提供 known_urls 時連續遇到一串已知社團即停止，complete 為 False
+		"""
 		try:
-
-			# 前往社團頁面
-			driver.get("https://www.facebook.com/groups/joins/?nav_source=tab&ordering=viewer_added")
-			time.sleep(5)  # 增加等待時間
-
-			# 滾動到底部獲取所有社團
-			self._scroll_to_bottom(driver)
-			time.sleep(2)  # 滾動後再等待一下
-
-			# 獲取社團列表
-			communities = []
-			try:
-				# 嘗試多個可能的 XPath 來找到社團容器
-				# /html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div[2]/div/div/div/div/div/div/div/div/div/div[3]
-				possible_xpaths = [
-					# 使用你找到的精確路徑，並排除導航元素
-					'/html/body/div[1]/div/div[1]/div/div[3]/div/div/div[1]/div[1]/div[2]/div/div/div/div/div/div/div/div/div/div[3]//a[contains(@href, "/groups/") and not(contains(@href, "joins")) and not(contains(@href, "create")) and not(contains(@href, "feed")) and not(contains(@href, "discover"))]',
-					
-					# 更精確的社團連結選擇器，排除導航項目
-					'//a[contains(@href, "/groups/") and not(contains(@href, "joins")) and not(contains(@href, "create")) and not(contains(@href, "feed")) and not(contains(@href, "discover")) and not(contains(@href, "browse"))]',
-					
-					# 基於 aria-label 的選擇器
-					'//a[contains(@href, "/groups/") and @aria-label]',
-					
-					# 通用的社團連結選擇器（作為備用）
-					'//a[contains(@href, "/groups/")]'
-				]
-				
-				for i, xpath in enumerate(possible_xpaths):
-					try:
-
-						elements = driver.find_elements(By.XPATH, xpath)
-
-						if elements:
-							for element in elements:
-								name = element.text.strip()
-								url = element.get_attribute('href')
-
-								# 更嚴格的過濾條件
-								if (name and url and 
-									'groups' in url and 
-									'joins' not in url and 
-									'create' not in url and
-									'feed' not in url and
-									'discover' not in url and
-									'browse' not in url and
-									len(name) > 0 and
-									not name.startswith('查看') and
-									not name.startswith('加入') and
-									name != '探索' and
-									name != '你的動態消息' and
-									name != '動態消息' and
-									name != '瀏覽' and
-									name != '發現' and
-									not name.startswith('查看更多') and
-									not name.startswith('顯示更多')):
-
-									communities.append({
-										'name': name,
-										'url': url
-									})
-							break  # 如果找到元素，就跳出循環
-					except Exception as e:
-
-						continue
-				
-				# 去重
-				unique_communities = []
-				seen_urls = set()
-				for community in communities:
-					if community['url'] not in seen_urls:
-						unique_communities.append(community)
-						seen_urls.add(community['url'])
-				
-				return unique_communities
-				
-			except Exception as e:
-
-				import traceback
-				traceback.print_exc()
-				return []
-				
+			return harvest_group_links(driver, known_urls=known_urls)
 		except Exception as e:
-
-			import traceback
-			traceback.print_exc()
-			return []
+			logger.error(f'獲取 Facebook 社團失敗: {str(e)}')
+			return [], False
+	
+	def _get_known_community_urls(self, user, full_scan=False):
+		"""增量更新時使用的已知社團網址，完整掃描時回傳 None"""
+		if full_scan:
+			return None
+		return set(Community.objects.filter(
+			user=user,
+			community_type='facebook'
+		).values_list('url', flat=True))
 	
 	def _save_communities_to_db(self, user, communities):
-		"""保存社團到資料庫"""
+		"""保存社團到資料庫（只新增與更新，不刪除），回傳新增數量"""
 		try:
-
-			saved_count = 0
-			for i, community_data in enumerate(communities):
-
-				# 檢查是否已存在相同的社團
-				existing_community = Community.objects.filter(
-					user=user,
-					url=community_data['url']
-				).first()
-				
-				if not existing_community:
-					# 創建新的社團記錄
-					Community.objects.create(
-						user=user,
-						name=community_data['name'],
-						community_type='facebook',
-						url=community_data['url'],
-						description=f'Facebook 社團：{community_data["name"]}',
-						is_active=True,
-						is_public=True
-					)
-					saved_count += 1
-
-				else:
-					pass
-			
-			return saved_count
+			return sync_communities(user, communities, prune=False)['added']
 			
 		except Exception as e:
 
@@ -913,33 +757,21 @@ class CommunitiesView(View):
 			return JsonResponse({'error': '請先登入'}, status=401)
 		
 		try:
-			# 獲取用戶的所有社團
-			communities = Community.objects.filter(
-				user=request.user,
-				is_active=True
-			).order_by('-created_at')
-			
-			communities_data = []
-			for community in communities:
-				communities_data.append({
-					'id': community.id,
-					'name': community.name,
-					'community_type': community.community_type,
-					'url': community.url,
-					'description': community.description,
-					'member_count': community.member_count,
-					'is_active': community.is_active,
-					'is_public': community.is_public,
-					'last_activity': community.last_activity.isoformat() if community.last_activity else None,
-					'created_at': community.created_at.isoformat(),
-					'updated_at': community.updated_at.isoformat(),
-					'tags': community.tags
-				})
+			# 依 limit / cursor 參數分頁（預設每頁 CRAWLER_API_PAGE_SIZE 筆），fields 參數指定要回傳的欄位
+			try:
+				page = parse_page_request(request)
+				fields = parse_fields(request, COMMUNITY_FIELDS)
+			except PaginationError as e:
+				return JsonResponse({'error': str(e)}, status=400)
+			
+			result = get_community_page(request.user, page=page, fields=fields)
 			
 			return JsonResponse({
 				'success': True,
-				'communities': communities_data,
-				'count': len(communities_data)
+				'communities': result['items'],
+				'count': len(result['items']),
+				'next_cursor': result['next_cursor'],
+				'has_more': result['has_more']
 			})
 			
 		except Exception as e:
@@ -967,7 +799,7 @@ class CommunitiesView(View):
 				
 				# 使用 FacebookAutomationView 的方法來重新獲取社團
 				facebook_view = FacebookAutomationView()
-				driver = facebook_view._setup_driver()
+				driver = get_driver_pool().acquire(request.user.id)
 				
 				try:
 					# 前往 Facebook 並添加 Cookie
@@ -978,50 +810,33 @@ class CommunitiesView(View):
 						driver.add_cookie({'name': name, 'value': value})
 					
 					driver.refresh()
-					time.sleep(2)
+					waits.wait_for_document_ready(driver, label='login_refresh')
 					
-					# 獲取最新的社團列表
-
-					new_communities = facebook_view._get_facebook_communities(driver, website_cookie.cookie_data)
+					# 重新整理預設完整掃描，才能刪除已退出的社團（full_scan=false 時改用增量模式）
+					known_urls = facebook_view._get_known_community_urls(request.user, data.get('full_scan', True))
+					new_communities, complete = facebook_view._discover_facebook_communities(driver, known_urls)
 
-					# 獲取資料庫中現有的社團
-					existing_communities = Community.objects.filter(
-						user=request.user,
-						community_type='facebook'
-					)
+					get_driver_pool().release(driver)
+					driver = None
 					
-					# 創建現有社團 URL 的集合
-					existing_urls = set(community.url for community in existing_communities)
-					new_urls = set(community['url'] for community in new_communities)
-					
-					# 刪除不再存在的社團
-					urls_to_delete = existing_urls - new_urls
-					deleted_count = 0
-					if urls_to_delete:
-						deleted_communities = Community.objects.filter(
-							user=request.user,
-							community_type='facebook',
-							url__in=urls_to_delete
-						)
-						deleted_count = deleted_communities.count()
-						deleted_communities.delete()
-
-					# 添加新的社團
-					added_count = facebook_view._save_communities_to_db(request.user, new_communities)
-
-					driver.quit()
+					# 更新資料庫：一次比對新增、更新與刪除（只有完整掃描才刪除沒看到的社團）
+					sync_result = sync_communities(request.user, new_communities, prune=complete)
+					added_count = sync_result['added']
+					deleted_count = sync_result['removed']
 					
 					return JsonResponse({
 						'success': True,
 						'message': f'社團列表已更新！新增 {added_count} 個，刪除 {deleted_count} 個',
 						'added_count': added_count,
+						'updated_count': sync_result['updated'],
 						'deleted_count': deleted_count,
-						'total_count': len(new_communities)
+						'total_count': len(new_communities),
+						'complete': complete
 					})
 					
 				except Exception as e:
 					if driver:
-						driver.quit()
+						get_driver_pool().release(driver, discard=True)
 					raise e
 				
 			else:
@@ -1090,49 +905,6 @@ class PostTemplateView(View):
 	貼文模板管理視圖
 	"""
 	
-	def _is_same_image(self, image1, image2):
-		"""
-		檢查兩個圖片是否相同
-		支援比較實際圖片文件和複製的圖片URL
-		"""
-		try:
-			# 如果兩個圖片都有實際文件，比較文件路徑
-			if (image1.image and hasattr(image1.image, 'path') and 
-				image2.image and hasattr(image2.image, 'path')):
-				import os
-				path1 = os.path.basename(image1.image.path)
-				path2 = os.path.basename(image2.image.path)
-				return path1 == path2
-			
-			# 如果一個有實際文件，一個有URL，比較文件名
-			elif (image1.image and hasattr(image1.image, 'path') and 
-				  image2.alt_text and image2.alt_text.startswith('/media/')):
-				import os
-				path1 = os.path.basename(image1.image.path)
-				path2 = os.path.basename(image2.alt_text)
-				return path1 == path2
-			
-			# 如果一個有URL，一個有實際文件，比較文件名
-			elif (image1.alt_text and image1.alt_text.startswith('/media/') and 
-				  image2.image and hasattr(image2.image, 'path')):
-				import os
-				path1 = os.path.basename(image1.alt_text)
-				path2 = os.path.basename(image2.image.path)
-				return path1 == path2
-			
-			# 如果兩個都是URL，比較文件名
-			elif (image1.alt_text and image1.alt_text.startswith('/media/') and 
-				  image2.alt_text and image2.alt_text.startswith('/media/')):
-				import os
-				path1 = os.path.basename(image1.alt_text)
-				path2 = os.path.basename(image2.alt_text)
-				return path1 == path2
-			
-			return False
-		except Exception as e:
-
-			return False
-	
 	def get(self, request):
 		"""獲取用戶的貼文模板列表或單個模板"""
 		if not request.user.is_authenticated:
@@ -1143,43 +915,7 @@ class PostTemplateView(View):
 			template_id = request.GET.get('template_id')
 			if template_id:
 				try:
-					template = PostTemplate.objects.get(
-						id=template_id,
-						user=request.user,
-						is_active=True
-					)
-					
-					# 獲取模板的圖片
-					images = template.images.all().order_by('order')
-					images_data = []
-					for image in images:
-						# 檢查圖片是否有實際文件
-						if image.image and hasattr(image.image, 'url'):
-							image_url = image.image.url
-						elif image.alt_text and (image.alt_text.startswith('http') or image.alt_text.startswith('/media/')):
-							# 如果是複製的圖片，使用alt_text中的URL
-							image_url = image.alt_text
-						else:
-							# 如果既沒有圖片文件也沒有URL，跳過
-							continue
-						
-						images_data.append({
-							'id': image.id,
-							'url': image_url,
-							'order': image.order,
-							'alt_text': image.alt_text
-						})
-					
-					template_data = {
-						'id': template.id,
-						'title': template.title,
-						'content': template.content,
-						'hashtags': template.hashtags,
-						'images': images_data,
-						'image_count': len(images_data),
-						'created_at': template.created_at.isoformat(),
-						'updated_at': template.updated_at.isoformat()
-					}
+					template_data = get_template_detail(request.user, template_id)
 					
 					return JsonResponse({
 						'success': True,
@@ -1189,55 +925,21 @@ class PostTemplateView(View):
 				except PostTemplate.DoesNotExist:
 					return JsonResponse({'error': '找不到指定的模板'}, status=404)
 			
-			# 獲取所有模板
-			templates = PostTemplate.objects.filter(
-				user=request.user,
-				is_active=True
-			).order_by('-updated_at')
-			
-			templates_data = []
-			for template in templates:
-				# 獲取模板的圖片
-				images = template.images.all().order_by('order')
-				# 調試訊息已移除
-				images_data = []
-				for image in images:
-					print(f"處理圖片: id={image.id}, image={image.image}, alt_text={image.alt_text}")  # 調試信息
-					# 檢查圖片是否有實際文件
-					if image.image and hasattr(image.image, 'url'):
-						image_url = image.image.url
-						print(f"使用原創圖片URL: {image_url}")  # 調試信息
-					elif image.alt_text and (image.alt_text.startswith('http') or image.alt_text.startswith('/media/')):
-						# 如果是複製的圖片，使用alt_text中的URL
-						image_url = image.alt_text
-						print(f"使用複製圖片URL: {image_url}")  # 調試信息
-					else:
-						# 如果既沒有圖片文件也沒有URL，跳過
-						print(f"跳過無效圖片: {image.id}")  # 調試信息
-						continue
-					
-					images_data.append({
-						'id': image.id,
-						'url': image_url,
-						'order': image.order,
-						'alt_text': image.alt_text
-					})
-				
-				templates_data.append({
-					'id': template.id,
-					'title': template.title,
-					'content': template.content,
-					'hashtags': template.hashtags,
-					'images': images_data,
-					'image_count': len(images_data),
-					'created_at': template.created_at.isoformat(),
-					'updated_at': template.updated_at.isoformat()
-				})
+			# 獲取模板（圖片一次預先載入），依 limit / cursor 參數分頁
+			try:
+				page = parse_page_request(request)
+				fields = parse_fields(request, TEMPLATE_FIELDS)
+			except PaginationError as e:
+				return JsonResponse({'error': str(e)}, status=400)
+			
+			result = get_template_page(request.user, page=page, fields=fields)
 			
 			return JsonResponse({
 				'success': True,
-				'templates': templates_data,
-				'count': len(templates_data)
+				'templates': result['items'],
+				'count': len(result['items']),
+				'next_cursor': result['next_cursor'],
+				'has_more': result['has_more']
 			})
 			
 		except Exception as e:
@@ -1311,11 +1013,7 @@ class PostTemplateView(View):
 			start_order = len(existing_images) if existing_images else 0
 			for i, image_file in enumerate(images):
 				order = int(image_orders[start_order + i]) if (start_order + i) < len(image_orders) else (start_order + i)
-				PostTemplateImage.objects.create(
-					template=template,
-					image=image_file,
-					order=order
-				)
+				create_template_image(template, order, uploaded_file=image_file)
 			
 			# 處理圖片URL複製（用於複製功能）
 			image_urls = request.POST.getlist('image_urls')
@@ -1325,13 +1023,8 @@ class PostTemplateView(View):
 					# 簡化順序處理，直接使用索引作為順序
 					order = i
 					print(f"創建複製圖片記錄: URL={image_url}, order={order}")  # 調試信息
-					# 創建圖片記錄，將URL保存到alt_text字段中
-					PostTemplateImage.objects.create(
-						template=template,
-						image='',  # 空圖片字段
-						order=order,
-						alt_text=image_url  # 將URL保存到alt_text字段
-					)
+					# 創建圖片記錄，將URL保存到alt_text字段中（本站圖片共用同一個圖片檔案）
+					create_template_image(template, order, url=image_url)
 			
 			# 計算總圖片數量（包括新上傳的和複製的）
 			total_image_count = len(images) + len(image_urls) if image_urls else len(images)
@@ -1361,49 +1054,9 @@ class PostTemplateView(View):
 			try:
 				template = PostTemplate.objects.get(id=template_id, user=request.user)
 				
-				# 智能刪除圖片：只有當沒有其他模板使用時才刪除圖片文件
-				images_to_delete = []  # 記錄要刪除的圖片路徑
-				
-				for image in template.images.all():
-					try:
-						import os
-						
-						# 檢查這張圖片是否被其他模板使用
-						other_templates_using_same_image = False
-						
-						# 遍歷所有活躍的模板，檢查是否有其他模板使用相同的圖片
-						for other_template in PostTemplate.objects.filter(is_active=True).exclude(id=template_id):
-							for other_image in other_template.images.all():
-								# 檢查是否為相同的圖片
-								if self._is_same_image(image, other_image):
-									other_templates_using_same_image = True
-									break
-							if other_templates_using_same_image:
-								break
-						
-						# 如果沒有其他模板使用這張圖片，且圖片有實際文件，則記錄為要刪除
-						if not other_templates_using_same_image and image.image and hasattr(image.image, 'path'):
-							image_path = image.image.path
-							images_to_delete.append(image_path)
-						elif not other_templates_using_same_image:
-							pass
-						else:
-							pass
-						
-					except Exception as e:
-						pass
-				
-				# 刪除模板（會自動刪除相關的圖片記錄）
+				# 刪除模板（會自動刪除相關的圖片記錄，圖片檔案在沒有其他模板引用時才會刪除）
 				template.delete()
 				
-				# 現在安全地刪除不再被使用的圖片文件
-				for image_path in images_to_delete:
-					try:
-						if os.path.exists(image_path):
-							os.remove(image_path)
-					except Exception as e:
-						pass
-				
 				return JsonResponse({
 					'success': True,
 					'message': '模板已刪除'
@@ -1416,59 +1069,7 @@ class PostTemplateView(View):
 			return JsonResponse({'error': '無效的 JSON 格式'}, status=400)
 		except Exception as e:
 			return JsonResponse({'error': f'刪除模板失敗: {str(e)}'}, status=500)
-	
-	def cleanup_orphaned_images(self):
-		"""清理孤立的圖片文件"""
-		try:
-			import os
-			from django.conf import settings
-			
-			# 獲取所有模板使用的圖片文件路徑
-			used_image_paths = set()
-			
-			# 從資料庫中獲取所有使用的圖片路徑
-			for template in PostTemplate.objects.filter(is_active=True):
-				for image in template.images.all():
-					# 檢查實際圖片文件
-					if image.image and hasattr(image.image, 'path'):
-						used_image_paths.add(image.image.path)
-					
-					# 檢查複製的圖片URL（存儲在alt_text中）
-					if (image.alt_text and 
-						image.alt_text.startswith('/media/')):
-						# 將相對路徑轉換為絕對路徑
-						# 從 /media/templates/1/filename.jpg 轉換為絕對路徑
-						relative_path = image.alt_text.replace('/media/', '')
-						alt_text_path = os.path.join(settings.MEDIA_ROOT, relative_path)
-						# 不檢查文件是否存在，因為文件可能已經被刪除
-						# 我們只需要知道有模板在使用這個圖片
-						used_image_paths.add(alt_text_path)
-
-						# 同時也添加標準化的路徑格式，以確保路徑匹配
-						normalized_path = os.path.normpath(alt_text_path)
-						used_image_paths.add(normalized_path)
-
-			# 檢查 media/templates 目錄中的文件
-			templates_dir = os.path.join(settings.MEDIA_ROOT, 'templates')
-			if os.path.exists(templates_dir):
-				for user_dir in os.listdir(templates_dir):
-					user_dir_path = os.path.join(templates_dir, user_dir)
-					if os.path.isdir(user_dir_path):
-						for filename in os.listdir(user_dir_path):
-							file_path = os.path.join(user_dir_path, filename)
-							if os.path.isfile(file_path):
-								# 檢查文件是否被使用
-								if file_path not in used_image_paths:
-									try:
-										os.remove(file_path)
-
-									except Exception as e:
-										pass
-								else:
-									pass
-		
-		except Exception as e:
-			pass
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ScheduleView(View):
@@ -1480,49 +1081,21 @@ class ScheduleView(View):
             return JsonResponse({'error': '請先登入'}, status=401)
         
         try:
-            schedules = Schedule.objects.filter(user=request.user).order_by('-created_at')
-            schedule_list = []
+            # 模板與模板圖片數量以同一個查詢取得，依 limit / cursor 參數分頁
+            try:
+                page = parse_page_request(request)
+                fields = parse_fields(request, SCHEDULE_FIELDS)
+            except PaginationError as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
             
-            for schedule in schedules:
-                next_execution = schedule.get_next_execution_time()
-                schedule_data = {
-                    'id': schedule.id,
-                    'name': schedule.name,
-                    'description': schedule.description,
-                    'status': schedule.status,
-                    'is_active': schedule.is_active,
-                    'execution_days': schedule.execution_days,
-                    'posting_times': schedule.posting_times,
-                    'platform': schedule.platform,
-                    'target_communities': schedule.target_communities,
-                    'total_executions': schedule.total_executions,
-                    'successful_executions': schedule.successful_executions,
-                    'failed_executions': schedule.failed_executions,
-                    'last_execution_time': schedule.last_execution_time.isoformat() if schedule.last_execution_time else None,
-                    'next_execution': next_execution.isoformat() if next_execution else None,
-                    'created_at': schedule.created_at.isoformat(),
-                    'updated_at': schedule.updated_at.isoformat()
-                }
-                
-                # 添加模板信息
-                if schedule.template:
-                    schedule_data['template'] = {
-                        'id': schedule.template.id,
-                        'title': schedule.template.title,
-                        'content': schedule.template.content,
-                        'hashtags': schedule.template.hashtags,
-                        'image_count': schedule.template.get_image_count(),
-                        'is_active': schedule.template.is_active
-                    }
-                else:
-                    schedule_data['template'] = None
-                
-                schedule_list.append(schedule_data)
+            result = get_schedule_page(request.user, page=page, fields=fields)
             
             return JsonResponse({
                 'success': True,
-                'schedules': schedule_list,
-                'count': len(schedule_list)
+                'schedules': result['items'],
+                'count': len(result['items']),
+                'next_cursor': result['next_cursor'],
+                'has_more': result['has_more']
             })
             
         except Exception as e:
@@ -1580,43 +1153,14 @@ class ScheduleView(View):
                     'error': '請至少選擇一個執行日期'
                 })
             
-            # 創建排程記錄
-            from django.utils import timezone
-            
-            # 計算開始時間（從下一個執行時間開始）
-            next_execution_time = None
-            if execution_days and posting_times:
-                # 找到下一個執行時間
-                from datetime import datetime, timedelta
-                now = timezone.now()
-                current_time = now.time()
-                current_weekday = now.strftime('%A').lower()
-                
-                # 檢查今天是否在執行日期中
-                if current_weekday in execution_days:
-                    # 找到今天下一個要執行的時間
-                    for time_str in sorted(posting_times):
-                        time_obj = datetime.strptime(time_str, '%H:%M').time()
-                        if time_obj > current_time:
-                            # 今天還有時間要執行
-                            next_execution_time = datetime.combine(now.date(), time_obj)
-                            next_execution_time = timezone.make_aware(next_execution_time)
-                            break
-                
-                if not next_execution_time:
-                    # 找到下一個執行日期和時間
-                    for i in range(1, 8):  # 最多檢查7天
-                        next_date = now.date() + timedelta(days=i)
-                        next_weekday = next_date.strftime('%A').lower()
-                        
-                        if next_weekday in execution_days:
-                            # 找到下一個執行日期，使用第一個時間
-                            first_time = sorted(posting_times)[0]
-                            time_obj = datetime.strptime(first_time, '%H:%M').time()
-                            next_execution_time = datetime.combine(next_date, time_obj)
-                            next_execution_time = timezone.make_aware(next_execution_time)
-                            break
+            typing_mode = data.get('typing_mode') or get_default_typing_mode()
+            if typing_mode not in dict(Schedule.TYPING_MODE_CHOICES):
+                return JsonResponse({
+                    'success': False,
+                    'error': '無效的輸入方式'
+                })
             
+            # 創建排程記錄（保存時會自動計算 next_execution_at）
             schedule = Schedule.objects.create(
                 user=user,
                 name=f"排程發文 - {data['platform']} - {timezone.now().strftime('%Y-%m-%d %H:%M')}",
@@ -1629,16 +1173,13 @@ class ScheduleView(View):
                 message_content=data['message'],
                 template_images=data.get('template_images', []),
                 target_communities=data['communities'],
+                typing_mode=typing_mode,
                 template_id=data.get('template_id')  # 添加模板ID
             )
             
             # 創建執行記錄
-            if next_execution_time:
-                ScheduleExecution.objects.create(
-                    schedule=schedule,
-                    scheduled_time=next_execution_time,
-                    status='pending'
-                )
+            next_execution_time = schedule.next_execution_at
+            sync_pending_executions(schedule)
             
             return JsonResponse({
                 'success': True,
@@ -1682,7 +1223,7 @@ class ScheduleDetailView(View):
         try:
             schedule = Schedule.objects.get(id=schedule_id, user=request.user)
             
-            next_execution = schedule.get_next_execution_time()
+            next_execution = schedule.next_execution_at
             schedule_data = {
                 'id': schedule.id,
                 'name': schedule.name,
@@ -1693,6 +1234,7 @@ class ScheduleDetailView(View):
                 'posting_times': schedule.posting_times,
                 'platform': schedule.platform,
                 'target_communities': schedule.target_communities,
+                'typing_mode': schedule.typing_mode,
                 'custom_content': schedule.custom_content,
                 'additional_images': schedule.additional_images,
                 'total_executions': schedule.total_executions,
@@ -1739,8 +1281,14 @@ class ScheduleDetailView(View):
                 schedule.execution_days = data['execution_days']
             if 'posting_times' in data:
                 schedule.posting_times = data['posting_times']
+            if 'typing_mode' in data:
+                if data['typing_mode'] not in dict(Schedule.TYPING_MODE_CHOICES):
+                    return JsonResponse({'error': '無效的輸入方式'}, status=400)
+                schedule.typing_mode = data['typing_mode']
             
             schedule.save()
+            # 狀態或時間變更後，取消原定時間的待執行記錄並排入新的時間
+            sync_pending_executions(schedule)
             
             return JsonResponse({
                 'success': True,
@@ -1812,6 +1360,7 @@ class ScheduleToggleView(View):
                 message = '排程已取消'
             
             schedule.save()
+            sync_pending_executions(schedule)
             
             return JsonResponse({
                 'success': True,
@@ -1843,43 +1392,7 @@ class PostTemplateDetailView(View):
 			return JsonResponse({'error': '請先登入'}, status=401)
 		
 		try:
-			template = PostTemplate.objects.get(
-				id=template_id,
-				user=request.user,
-				is_active=True
-			)
-			
-			# 獲取模板的圖片
-			images = template.images.all().order_by('order')
-			images_data = []
-			for image in images:
-				# 檢查圖片是否有實際文件
-				if image.image and hasattr(image.image, 'url'):
-					image_url = image.image.url
-				elif image.alt_text and (image.alt_text.startswith('http') or image.alt_text.startswith('/media/')):
-					# 如果是複製的圖片，使用alt_text中的URL
-					image_url = image.alt_text
-				else:
-					# 如果既沒有圖片文件也沒有URL，跳過
-					continue
-				
-				images_data.append({
-					'id': image.id,
-					'url': image_url,
-					'order': image.order,
-					'alt_text': image.alt_text
-				})
-			
-			template_data = {
-				'id': template.id,
-				'title': template.title,
-				'content': template.content,
-				'hashtags': template.hashtags,
-				'images': images_data,
-				'image_count': len(images_data),
-				'created_at': template.created_at.isoformat(),
-				'updated_at': template.updated_at.isoformat()
-			}
+			template_data = get_template_detail(request.user, template_id)
 			
 			return JsonResponse({
 				'success': True,
@@ -1898,49 +1411,6 @@ class PostTemplateDeleteView(View):
 	貼文模板刪除視圖
 	"""
 	
-	def _is_same_image(self, image1, image2):
-		"""
-		檢查兩個圖片是否相同
-		支援比較實際圖片文件和複製的圖片URL
-		"""
-		try:
-			# 如果兩個圖片都有實際文件，比較文件路徑
-			if (image1.image and hasattr(image1.image, 'path') and 
-				image2.image and hasattr(image2.image, 'path')):
-				import os
-				path1 = os.path.basename(image1.image.path)
-				path2 = os.path.basename(image2.image.path)
-				return path1 == path2
-			
-			# 如果一個有實際文件，一個有URL，比較文件名
-			elif (image1.image and hasattr(image1.image, 'path') and 
-				  image2.alt_text and image2.alt_text.startswith('/media/')):
-				import os
-				path1 = os.path.basename(image1.image.path)
-				path2 = os.path.basename(image2.alt_text)
-				return path1 == path2
-			
-			# 如果一個有URL，一個有實際文件，比較文件名
-			elif (image1.alt_text and image1.alt_text.startswith('/media/') and 
-				  image2.image and hasattr(image2.image, 'path')):
-				import os
-				path1 = os.path.basename(image1.alt_text)
-				path2 = os.path.basename(image2.image.path)
-				return path1 == path2
-			
-			# 如果兩個都是URL，比較文件名
-			elif (image1.alt_text and image1.alt_text.startswith('/media/') and 
-				  image2.alt_text and image2.alt_text.startswith('/media/')):
-				import os
-				path1 = os.path.basename(image1.alt_text)
-				path2 = os.path.basename(image2.alt_text)
-				return path1 == path2
-			
-			return False
-		except Exception as e:
-
-			return False
-	
 	def post(self, request, template_id):
 		"""刪除指定的模板"""
 		if not request.user.is_authenticated:
@@ -1953,65 +1423,8 @@ class PostTemplateDeleteView(View):
 				is_active=True
 			)
 			
-			print(f"開始刪除模板: {template_id} - {template.title}")  # 調試信息
-			print(f"模板的圖片數量: {template.images.count()}")  # 調試信息
-			
-			# 檢查模板的圖片
-			for i, image in enumerate(template.images.all()):
-				print(f"圖片 {i}: image={image.image}, alt_text={image.alt_text}")  # 調試信息
-				if image.image:
-					print(f"  圖片文件路徑: {image.image.path if hasattr(image.image, 'path') else 'N/A'}")  # 調試信息
-			
-			# 智能刪除圖片：只有當沒有其他模板使用時才刪除圖片文件
-			images_to_delete = []  # 記錄要刪除的圖片路徑
-			
-			for image in template.images.all():
-					try:
-						import os
-						
-						# 檢查這張圖片是否被其他模板使用
-						other_templates_using_same_image = False
-						
-						# 遍歷所有活躍的模板，檢查是否有其他模板使用相同的圖片
-						for other_template in PostTemplate.objects.filter(is_active=True).exclude(id=template_id):
-							print(f"檢查模板 {other_template.id}: {other_template.title}")  # 調試信息
-							for other_image in other_template.images.all():
-								# 檢查是否為相同的圖片
-								if self._is_same_image(image, other_image):
-									other_templates_using_same_image = True
-
-									break
-							if other_templates_using_same_image:
-								break
-						
-						# 如果沒有其他模板使用這張圖片，且圖片有實際文件，則記錄為要刪除
-						if not other_templates_using_same_image and image.image and hasattr(image.image, 'path'):
-							image_path = image.image.path
-							images_to_delete.append(image_path)
-
-						elif not other_templates_using_same_image:
-							pass
-						else:
-							pass
-					except Exception as e:
-						pass
-
-			print(f"準備刪除的圖片文件數量: {len(images_to_delete)}")  # 調試信息
-			
-			# 刪除模板（會自動刪除相關的圖片記錄）
+			# 刪除模板（會自動刪除相關的圖片記錄，圖片檔案在沒有其他模板引用時才會刪除）
 			template.delete()
-			print(f"模板 {template_id} 已刪除")  # 調試信息
-			
-			# 現在安全地刪除不再被使用的圖片文件
-			for image_path in images_to_delete:
-				try:
-					if os.path.exists(image_path):
-						os.remove(image_path)
-
-					else:
-						pass
-				except Exception as e:
-					pass
 
 			return JsonResponse({
 				'success': True,
@@ -2058,18 +1471,16 @@ class PostTemplateUpdateView(View):
 			
 			# 處理圖片更新（如果需要）
 			if 'images' in data and isinstance(data['images'], list):
-				# 清空現有圖片
-				template.images.all().delete()
-				
-				# 添加新圖片
-				for index, image_data in enumerate(data['images']):
-					if 'url' in image_data:
-						PostTemplateImage.objects.create(
-							template=template,
-							order=index,
-							alt_text=image_data.get('url', ''),
-							image=None  # 如果是URL，不存儲實際文件
-						)
+				# 在同一個交易中重建圖片，沿用的圖片檔案不會因引用次數暫時歸零而被刪除
+				with transaction.atomic():
+					# 清空現有圖片
+					template.images.all().delete()
+					
+					# 添加新圖片
+					for index, image_data in enumerate(data['images']):
+						if 'url' in image_data:
+							# 如果是URL，不存儲實際文件，引用既有的圖片檔案
+							create_template_image(template, index, url=image_data.get('url', ''))
 			
 			return JsonResponse({
 				'success': True,
@@ -2324,6 +1735,21 @@ def group_sale(request):
 		raise Http404(f"社團拍賣商品頁面不存在: {str(e)}")
 
 
+class DataExportView(View):
+    """匯出社團、貼文數據或排程執行記錄（NDJSON / CSV 串流）"""
+    
+    def get(self, request, dataset):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': '請先登入'}, status=401)
+        
+        try:
+            return export_response(request.user, dataset, request.GET.get('format', 'ndjson'))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({'error': f'匯出資料失敗: {str(e)}'}, status=500)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class UserTemplatesView(View):
     """獲取用戶的模板選項，用於排程選擇"""
@@ -2334,47 +1760,21 @@ class UserTemplatesView(View):
             return JsonResponse({'error': '請先登入'}, status=401)
         
         try:
-            # 獲取用戶的所有活躍模板
-            templates = PostTemplate.objects.filter(
-                user=request.user,
-                is_active=True
-            ).order_by('-updated_at')
+            # 獲取用戶的活躍模板（圖片一次預先載入），依 limit / cursor 參數分頁
+            try:
+                page = parse_page_request(request)
+                fields = parse_fields(request, TEMPLATE_FIELDS)
+            except PaginationError as e:
+                return JsonResponse({'error': str(e)}, status=400)
             
-            templates_data = []
-            for template in templates:
-                # 獲取模板的圖片
-                images = template.images.all().order_by('order')
-                images_data = []
-                for image in images:
-                    if image.image and hasattr(image.image, 'url'):
-                        image_url = image.image.url
-                    elif image.alt_text and (image.alt_text.startswith('http') or image.alt_text.startswith('/media/')):
-                        image_url = image.alt_text
-                    else:
-                        continue
-                    
-                    images_data.append({
-                        'id': image.id,
-                        'url': image_url,
-                        'order': image.order,
-                        'alt_text': image.alt_text
-                    })
-                
-                templates_data.append({
-                    'id': template.id,
-                    'title': template.title,
-                    'content': template.content,
-                    'hashtags': template.hashtags,
-                    'images': images_data,
-                    'image_count': len(images_data),
-                    'created_at': template.created_at.isoformat(),
-                    'updated_at': template.updated_at.isoformat()
-                })
+            result = get_template_page(request.user, page=page, fields=fields)
             
             return JsonResponse({
                 'success': True,
-                'templates': templates_data,
-                'count': len(templates_data)
+                'templates': result['items'],
+                'count': len(result['items']),
+                'next_cursor': result['next_cursor'],
+                'has_more': result['has_more']
             })
             
         except Exception as e:
@@ -0,0 +1,287 @@
+"""
+等待機制
+把瀏覽器自動化中的等待分成兩類：
+- 節奏延遲（pacing）：模擬人類操作的隨機延遲，用於降低被偵測的風險，長度由 CRAWLER_PACING_POLICY 決定
+- 就緒等待（readiness）：等待頁面載入、DOM 停止變動或網路閒置，條件成立就立即結束
+每次等待的耗時都會記錄下來，方便分析發文時間花在哪裡。
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# 節奏延遲倍率：human 為原本的人類化延遲，fast 大幅縮短，off 完全不延遲（僅供測試）
+PACING_POLICIES = {
+    'human': 1.0,
+    'fast': 0.3,
+    'off': 0.0,
+}
+
+# WebDriver 預設的腳本逾時（秒），無法讀取目前設定時還原成此值
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+# 在 root（預設 document.body）上觀察 DOM 變動，連續 quiet_ms 沒有變動或超過 timeout_ms 時回傳
+DOM_QUIET_SCRIPT = """
+const [quietMs, timeoutMs, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+const root = arguments.length > 3 && arguments[2] ? arguments[2] : document.body;
+const started = Date.now();
+let timer = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(finish, quietMs);
+});
+function finish() {
+    observer.disconnect();
+    clearTimeout(deadline);
+    done(Date.now() - started < timeoutMs);
+}
+const deadline = setTimeout(() => { observer.disconnect(); clearTimeout(timer); done(false); }, timeoutMs);
+observer.observe(root, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(finish, quietMs);
+"""
+
+# 追蹤頁面上進行中的 fetch / XHR 請求數量，並清空 Resource Timing 緩衝區
+# （緩衝區預設 250 筆，長時間停留的頁面填滿後就不再增加，無法用筆數判斷是否有新請求）
+REQUEST_TRACKER_SCRIPT = """
+if (!window.__crawlerRequests) {
+    const tracker = window.__crawlerRequests = {pending: 0};
+    const originalFetch = window.fetch;
+    window.fetch = function(...args) {
+        tracker.pending++;
+        return originalFetch.apply(this, args).finally(() => { tracker.pending--; });
+    };
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function(...args) {
+        tracker.pending++;
+        this.addEventListener('loadend', () => { tracker.pending--; }, {once: true});
+        return originalSend.apply(this, args);
+    };
+}
+performance.clearResourceTimings();
+performance.setResourceTimingBufferSize(1000);
+"""
+
+# 網路閒置：沒有進行中的 fetch / XHR（需先執行 REQUEST_TRACKER_SCRIPT），
+# 且連續 idle_ms 沒有新的資源請求完成；超過 timeout_ms 時回傳 false
+NETWORK_IDLE_SCRIPT = """
+const [idleMs, timeoutMs, done] = arguments;
+const pending = () => (window.__crawlerRequests ? window.__crawlerRequests.pending : 0);
+const started = Date.now();
+let lastCount = performance.getEntriesByType('resource').length;
+let lastChange = started;
+const timer = setInterval(() => {
+    const count = performance.getEntriesByType('resource').length;
+    const now = Date.now();
+    if (count !== lastCount || pending() > 0) {
+        lastCount = count;
+        lastChange = now;
+    }
+    if (now - lastChange >= idleMs) {
+        clearInterval(timer);
+        done(true);
+    } else if (now - started >= timeoutMs) {
+        clearInterval(timer);
+        done(false);
+    }
+}, 100);
+"""
+
+
+class WaitRecorder:
+    """依標籤累計等待次數與耗時"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind, label, seconds, ready=True):
+        key = (kind, label)
+        with self._lock:
+            stats = self._stats.setdefault(key, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            if not ready:
+                stats['timeouts'] += 1
+
+    def summary(self):
+        """回傳 [{'kind', 'label', 'count', 'total', 'avg', 'max', 'timeouts'}, ...]，依總耗時排序"""
+        with self._lock:
+            rows = [
+                {
+                    'kind': kind,
+                    'label': label,
+                    'count': stats['count'],
+                    'total': round(stats['total'], 3),
+                    'avg': round(stats['total'] / stats['count'], 3),
+                    'max': round(stats['max'], 3),
+                    'timeouts': stats['timeouts'],
+                }
+                for (kind, label), stats in self._stats.items()
+            ]
+        return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def log_summary(self, title='等待耗時統計'):
+        for row in self.summary():
+            logger.info(
+                f'{title} [{row["kind"]}] {row["label"]}: {row["count"]} 次，'
+                f'共 {row["total"]} 秒，平均 {row["avg"]} 秒，最長 {row["max"]} 秒，逾時 {row["timeouts"]} 次'
+            )
+
+
+_recorder = WaitRecorder()
+
+
+def get_wait_recorder():
+    return _recorder
+
+
+def get_pacing_scale():
+    policy = getattr(settings, 'CRAWLER_PACING_POLICY', 'human')
+    return PACING_POLICIES.get(policy, PACING_POLICIES['human'])
+
+
+def get_ready_timeout():
+    return getattr(settings, 'CRAWLER_WAIT_READY_TIMEOUT', 15)
+
+
+def get_quiet_ms():
+    return getattr(settings, 'CRAWLER_WAIT_QUIET_MS', 500)
+
+
+def get_submit_timeout():
+    return getattr(settings, 'CRAWLER_WAIT_SUBMIT_TIMEOUT', 60)
+
+
+def get_submit_min_seconds():
+    return getattr(settings, 'CRAWLER_WAIT_SUBMIT_MIN_SECONDS', 2.0)
+
+
+@contextmanager
+def measure(kind, label):
+    """量測區塊耗時；區塊內設定 state['ready'] = False 表示條件未成立（逾時）"""
+    state = {'ready': True}
+    started = time.monotonic()
+    try:
+        yield state
+    finally:
+        _recorder.record(kind, label, time.monotonic() - started, state['ready'])
+
+
+def pace(min_seconds, max_seconds, label='pace'):
+    """節奏延遲：依設定的策略縮放人類化隨機延遲"""
+    delay = random.uniform(min_seconds, max_seconds) * get_pacing_scale()
+    if delay <= 0:
+        return
+    with measure('pacing', label):
+        time.sleep(delay)
+
+
+def wait_until(driver, condition, timeout=None, label='condition', poll_frequency=0.2):
+    """就緒等待：條件成立即回傳其結果，逾時回傳 None"""
+    with measure('readiness', label) as state:
+        try:
+            return WebDriverWait(driver, timeout or get_ready_timeout(), poll_frequency=poll_frequency).until(condition)
+        except TimeoutException:
+            state['ready'] = False
+            return None
+
+
+def wait_for_document_ready(driver, timeout=None, label='document_ready'):
+    """等待 document.readyState 變成 complete"""
+    return wait_until(
+        driver,
+        lambda d: d.execute_script('return document.readyState') == 'complete',
+        timeout=timeout,
+        label=label,
+    ) is not None
+
+
+def _run_async(driver, script, timeout, *args):
+    # 非同步腳本的逾時需大於腳本內的逾時；瀏覽器由池共用，執行後還原原本的設定
+    try:
+        previous = driver.timeouts.script
+    except WebDriverException:
+        previous = DEFAULT_SCRIPT_TIMEOUT
+    driver.set_script_timeout(timeout + 5)
+    try:
+        return driver.execute_async_script(script, *args)
+    finally:
+        try:
+            driver.set_script_timeout(previous)
+        except WebDriverException as e:
+            logger.debug(f'還原腳本逾時失敗: {str(e)}')
+
+
+def wait_for_dom_quiet(driver, quiet_ms=None, timeout=None, root=None, label='dom_quiet'):
+    """等待 DOM 連續 quiet_ms 毫秒沒有變動（例如圖片縮圖產生、對話框關閉動畫結束）"""
+    quiet_ms = quiet_ms or get_quiet_ms()
+    timeout = timeout or get_ready_timeout()
+    with measure('readiness', label) as state:
+        try:
+            state['ready'] = bool(_run_async(driver, DOM_QUIET_SCRIPT, timeout, quiet_ms, int(timeout * 1000), root))
+        except WebDriverException as e:
+            logger.debug(f'等待 DOM 穩定失敗: {str(e)}')
+            state['ready'] = False
+    return state['ready']
+
+
+def track_requests(driver):
+    """開始追蹤頁面上的 fetch / XHR 請求（在觸發請求的操作之前呼叫，例如點擊發文按鈕前）"""
+    try:
+        driver.execute_script(REQUEST_TRACKER_SCRIPT)
+    except WebDriverException as e:
+        logger.debug(f'安裝請求追蹤失敗: {str(e)}')
+
+
+def wait_for_network_idle(driver, idle_ms=None, timeout=None, label='network_idle'):
+    """等待沒有進行中的 fetch / XHR 且連續 idle_ms 毫秒沒有新的資源請求完成"""
+    idle_ms = idle_ms or get_quiet_ms()
+    timeout = timeout or get_ready_timeout()
+    with measure('readiness', label) as state:
+        try:
+            state['ready'] = bool(_run_async(driver, NETWORK_IDLE_SCRIPT, timeout, idle_ms, int(timeout * 1000)))
+        except WebDriverException as e:
+            logger.debug(f'等待網路閒置失敗: {str(e)}')
+            state['ready'] = False
+    return state['ready']
+
+
+def _is_closed(element):
+    try:
+        return not element.is_displayed()
+    except StaleElementReferenceException:
+        return True
+
+
+def wait_for_submission(driver, composer, timeout=None, min_seconds=None, label='after_submit'):
+    """
+    等待貼文送出完成：發文對話框（composer）關閉，且追蹤中的請求都已結束
+    點擊送出前需先呼叫 track_requests；至少等待 min_seconds，避免請求尚未開始就判定完成
+    回傳是否在時限內完成
+    """
+    timeout = timeout or get_submit_timeout()
+    min_seconds = get_submit_min_seconds() if min_seconds is None else min_seconds
+    started = time.monotonic()
+
+    closed = wait_until(driver, lambda d: _is_closed(composer), timeout=timeout, label=f'{label}_closed') is not None
+    remaining = max(1, timeout - (time.monotonic() - started))
+    idle = wait_for_network_idle(driver, timeout=remaining, label=f'{label}_idle')
+
+    floor = min_seconds - (time.monotonic() - started)
+    if floor > 0:
+        with measure('readiness', f'{label}_floor'):
+            time.sleep(floor)
+    return closed and idle
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -84,9 +85,22 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # 排程執行器程序同時寫入時，等待資料庫鎖的秒數
+        'OPTIONS': {'timeout': 20},
     }
 }
 
+# 設定 CRAWLER_DB_ENGINE=postgresql 時改用 PostgreSQL（多個執行器程序並行時建議使用）
+if os.environ.get('CRAWLER_DB_ENGINE') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'crawlerweb'),
+        'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -142,3 +156,62 @@ AUTH_USER_MODEL = 'Accounts.User'
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
+
+# 瀏覽器驅動程式池設定（立即發文、社團更新與排程執行共用）
+CRAWLER_DRIVER_POOL_SIZE = 4  # 同時存在的瀏覽器數量上限
+CRAWLER_DRIVER_POOL_MAX_IDLE_PER_USER = 1  # 每位使用者保留的閒置瀏覽器數量
+CRAWLER_DRIVER_POOL_MAX_AGE = 30 * 60  # 瀏覽器最長存活時間（秒），超過即回收重建
+CRAWLER_DRIVER_POOL_IDLE_TIMEOUT = 10 * 60  # 閒置超過此時間（秒）即關閉
+CRAWLER_DRIVER_POOL_ACQUIRE_TIMEOUT = 120  # 池滿時等待可用瀏覽器的時間（秒）
+
+# 平行發文設定
+CRAWLER_POSTING_MAX_PER_ACCOUNT = 2  # 同一帳號同時開啟的發文瀏覽器上限
+CRAWLER_POSTING_MAX_GLOBAL = 4  # 全部帳號合計同時開啟的發文瀏覽器上限（不應超過瀏覽器池大小）
+
+# 排程執行器程序設定
+CRAWLER_SCHEDULER_WORKERS = 0  # run_scheduler --continuous 啟動的執行器程序數量，0 表示在派送迴圈內直接執行
+CRAWLER_WORKER_POLL_INTERVAL = 5  # 執行器程序沒有工作時查詢佇列的間隔（秒）
+CRAWLER_WORKER_LEASE_SECONDS = 5 * 60  # 執行中的工作超過此時間沒有心跳即由派送器回收
+CRAWLER_WORKER_MAX_ATTEMPTS = 2  # 同一個執行記錄最多被認領的次數
+
+# 社團探索設定
+CRAWLER_COMMUNITY_KNOWN_RUN = 20  # 增量更新時連續遇到多少個已知社團就停止捲動
+CRAWLER_COMMUNITY_SCROLL_TIMEOUT = 4  # 捲動後等待新社團載入的最長秒數，逾時視為已到底
+
+# 等待機制設定
+CRAWLER_PACING_POLICY = 'human'  # 人類化節奏延遲策略：human（原始延遲）、fast（約三成）、off（不延遲，僅供測試）
+CRAWLER_WAIT_READY_TIMEOUT = 15  # 等待頁面就緒（載入完成、DOM 穩定、網路閒置）的最長秒數
+CRAWLER_WAIT_QUIET_MS = 500  # DOM 或網路連續多少毫秒沒有變動視為就緒
+CRAWLER_WAIT_SUBMIT_TIMEOUT = 60  # 貼文送出後等待發文對話框關閉、請求結束的最長秒數（含圖片上傳）
+CRAWLER_WAIT_SUBMIT_MIN_SECONDS = 2.0  # 貼文送出後至少等待的秒數
+
+# 文字輸入設定
+CRAWLER_TYPING_MODE = 'per_character'  # 立即發文的預設輸入方式：per_character、chunked、insert_text（排程以 Schedule.typing_mode 為準）
+
+# 模板圖片正規化設定（上傳後在背景產生發文版本）
+CRAWLER_IMAGE_MAX_DIMENSION = 2048  # 發文版本的最長邊（像素）
+CRAWLER_IMAGE_JPEG_QUALITY = 85  # 發文版本的 JPEG 品質
+CRAWLER_IMAGE_RENDER_WORKERS = 2  # 背景產生發文版本的執行緒數量
+
+# 圖片清理設定（python manage.py cleanup_media）
+CRAWLER_MEDIA_GC_DIRS = ['templates', 'blobs']  # 要清理的目錄（相對 MEDIA_ROOT）
+CRAWLER_MEDIA_GC_GRACE_HOURS = 24  # 檔案未被引用超過此時數才刪除，避免刪到上傳中或剛釋放的檔案
+CRAWLER_MEDIA_GC_BATCH_SIZE = 200  # 每批刪除的檔案數量
+
+# 列表 API 分頁設定（依 next_cursor 逐頁取得）
+CRAWLER_API_PAGE_SIZE = 50  # 未帶 limit 時的每頁筆數
+CRAWLER_API_MAX_PAGE_SIZE = 200  # limit 的上限
+
+# 資料匯出設定
+CRAWLER_EXPORT_CHUNK_SIZE = 2000  # 匯出時每次從資料庫讀取的筆數
+
+# 數據分析重新計算設定
+CRAWLER_ANALYSIS_REFRESH_COALESCE_SECONDS = 30  # 手動刷新在此秒數內已重新計算過時直接使用該結果
+CRAWLER_ANALYSIS_REFRESH_WAIT = 15  # 沒有舊結果可用時等待其他請求計算完成的最長秒數，逾時自行計算
+CRAWLER_ANALYSIS_REFRESH_LEASE = 120  # 重新計算的租約秒數，程序中斷時超過此時間由其他請求接手
+
+# 數據分析結果記憶體快取（程序內 LRU，資料版本不變時不再讀取 DataAnalysisCache）
+CRAWLER_ANALYSIS_MEMORY_CACHE_ENTRIES = 512  # 最多保留的結果筆數，0 表示停用
+CRAWLER_ANALYSIS_MEMORY_CACHE_BYTES = 32 * 1024 * 1024  # 結果 JSON 合計的位元組數上限
+CRAWLER_ANALYSIS_SHARED_CACHE = None  # 多個程序共用的 Django 快取別名（CACHES 中的名稱），None 表示只用程序內快取
+CRAWLER_ANALYSIS_SHARED_CACHE_TIMEOUT = 60 * 60  # 共用快取的保存秒數
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CrawlerWeb.settings')
 
 application = get_wsgi_application()
+
+# 啟動時預先解析 ChromeDriver，發文時不必再連網下載
+from Crawler.chromedriver_resolver import prime_chromedriver  # noqa: E402
+prime_chromedriver()
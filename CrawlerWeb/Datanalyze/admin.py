@@ -1,11 +1,11 @@
 from django.contrib import admin
-from .models import DataAnalysisCache
+from .models import AnalysisDataVersion, DailyPostMetrics, DataAnalysisCache
 
 
 @admin.register(DataAnalysisCache)
 class DataAnalysisCacheAdmin(admin.ModelAdmin):
     """數據分析緩存管理界面"""
-    list_display = ('user', 'analysis_type', 'last_updated', 'created_at')
+    list_display = ('user', 'analysis_type', 'data_version', 'last_updated', 'created_at')
     list_filter = ('analysis_type', 'last_updated', 'created_at')
     search_fields = ('user__username', 'user__email')
     ordering = ('-last_updated',)
@@ -13,10 +13,35 @@ class DataAnalysisCacheAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('基本資訊', {'fields': ('user', 'analysis_type')}),
-        ('分析數據', {'fields': ('data', 'chart_config')}),
+        ('分析數據', {'fields': ('data', 'chart_config', 'source_coverage', 'data_version')}),
         ('時間資訊', {'fields': ('created_at', 'last_updated')}),
     )
     
     def get_data_summary(self, obj):
         return obj.get_data_summary()
     get_data_summary.short_description = '數據摘要'
+
+
+@admin.register(DailyPostMetrics)
+class DailyPostMetricsAdmin(admin.ModelAdmin):
+    """每日貼文數據彙總（由貼文信號維護，僅供查看）"""
+    list_display = ('user', 'platform', 'day', 'post_count', 'reach_sum', 'like_sum', 'updated_at')
+    list_filter = ('platform', 'day')
+    search_fields = ('user__username',)
+    ordering = ('-day', 'platform')
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AnalysisDataVersion)
+class AnalysisDataVersionAdmin(admin.ModelAdmin):
+    """用戶分析資料版本（貼文寫入時遞增）"""
+    list_display = ('user', 'version', 'updated_at')
+    search_fields = ('user__username',)
+    ordering = ('-updated_at',)
+    readonly_fields = ('user', 'version', 'updated_at')
@@ -0,0 +1,257 @@
+"""
+數據分析聚合
+儀表板的六種分析都來自同一份每日彙總（DailyPostMetrics，由 rollup 隨貼文變更維護），
+一次讀取用戶的 (platform, 日期) 彙總列，筆數與天數、平台數成正比而不是與貼文數成正比，
+再分別彙整成「各平台」與「每日」兩種維度，組出六種圖表資料；六筆 DataAnalysisCache 也一次更新。
+每次聚合同時記錄涵蓋的貼文範圍（筆數、最大 id、彙總最後更新時間）與資料版本（versions），
+資料版本與目前版本相同的快取即為最新結果。
+"""
+
+from .models import DailyPostMetrics, DataAnalysisCache
+from .rollup import ROLLUP_METRICS
+from .versions import get_data_version
+
+METRICS = tuple(ROLLUP_METRICS.values())
+
+ANALYSIS_TYPES = [choice[0] for choice in DataAnalysisCache.ANALYSIS_TYPE_CHOICES]
+
+TREND_DAYS = 30  # 趨勢圖顯示最近幾天
+
+
+def _empty_bucket():
+    bucket = {'post_count': 0}
+    bucket.update({metric: 0 for metric in METRICS})
+    return bucket
+
+
+def _add_to_bucket(bucket, row):
+    bucket['post_count'] += row['post_count']
+    for metric in METRICS:
+        bucket[metric] += row[metric] or 0
+
+
+class PostSummary:
+    """聚合結果：各平台與每日的貼文數與指標加總，以及涵蓋的貼文範圍"""
+
+    def __init__(self):
+        self.platforms = {}
+        self.days = {}
+        self.post_count = 0
+        self.max_post_id = None
+        self.last_updated = None
+
+    def add(self, row):
+        _add_to_bucket(self.platforms.setdefault(row['platform'], _empty_bucket()), row)
+        _add_to_bucket(self.days.setdefault(row['day'], _empty_bucket()), row)
+        self.post_count += row['post_count']
+        if row['max_id'] is not None and (self.max_post_id is None or row['max_id'] > self.max_post_id):
+            self.max_post_id = row['max_id']
+        if self.last_updated is None or row['last_updated'] > self.last_updated:
+            self.last_updated = row['last_updated']
+
+    def coverage(self):
+        return {
+            'post_count': self.post_count,
+            'max_post_id': self.max_post_id,
+            'last_updated': self.last_updated.isoformat() if self.last_updated else None,
+        }
+
+    def platform_rows(self, metric, average=False):
+        """[(平台, 加總或平均)]"""
+        return [
+            (platform, bucket[metric] / bucket['post_count'] if average else bucket[metric])
+            for platform, bucket in self.platforms.items()
+        ]
+
+    def trend_rows(self, metric, average=False):
+        """最近 TREND_DAYS 天的 [(日期字串, 加總或平均)]，依日期排序"""
+        days = sorted(self.days.items())[-TREND_DAYS:]
+        return [
+            (day.isoformat(), bucket[metric] / bucket['post_count'] if average else bucket[metric])
+            for day, bucket in days
+        ]
+
+
+def aggregate_posts(user):
+    """一次查詢讀取用戶依 (平台, 日期) 彙總的指標加總"""
+    rows = DailyPostMetrics.objects.filter(user=user, post_count__gt=0).values_list(
+        'platform', 'day', 'post_count', 'max_post_id', 'updated_at',
+        *(f'{prefix}_sum' for prefix in ROLLUP_METRICS)
+    )
+
+    summary = PostSummary()
+    for platform, day, post_count, max_id, last_updated, *sums in rows:
+        row = {'platform': platform, 'day': day, 'post_count': post_count, 'max_id': max_id, 'last_updated': last_updated}
+        row.update(zip(ROLLUP_METRICS.values(), sums))
+        summary.add(row)
+    return summary
+
+
+# 圖表資料
+def _dataset(label, data, background, border, **extra):
+    dataset = {
+        'label': label,
+        'data': data,
+        'backgroundColor': background,
+        'borderColor': border,
+        'borderWidth': 2
+    }
+    dataset.update(extra)
+    return dataset
+
+
+def _trend_config(title, y_title):
+    return {
+        'responsive': True,
+        'plugins': {
+            'title': {
+                'display': True,
+                'text': title
+            }
+        },
+        'scales': {
+            'y': {
+                'beginAtZero': True,
+                'title': {
+                    'display': True,
+                    'text': y_title
+                }
+            }
+        }
+    }
+
+
+def build_reach_chart(summary):
+    """各平台平均觸及人數"""
+    rows = sorted(summary.platform_rows('reach_count', average=True), key=lambda row: row[1], reverse=True)
+    chart_data = {
+        'labels': [platform for platform, _ in rows],
+        'datasets': [_dataset('平均觸及人數', [float(value) for _, value in rows], 'rgba(255, 99, 132, 0.2)', 'rgba(255, 99, 132, 1)')]
+    }
+    options = _trend_config('各平台觸及率分析', '觸及人數')
+    options['plugins']['legend'] = {'display': True}
+    return chart_data, {'type': 'bar', 'options': options}
+
+
+def build_like_chart(summary):
+    """每日總按讚數"""
+    rows = summary.trend_rows('like_count')
+    chart_data = {
+        'labels': [day for day, _ in rows],
+        'datasets': [_dataset('總按讚數', [float(value) for _, value in rows], 'rgba(54, 162, 235, 0.2)', 'rgba(54, 162, 235, 1)', fill=False)]
+    }
+    return chart_data, {'type': 'line', 'options': _trend_config('按讚次數趨勢分析', '按讚數')}
+
+
+def build_share_chart(summary):
+    """各平台總分享數"""
+    rows = sorted(summary.platform_rows('share_count'), key=lambda row: row[1], reverse=True)
+    chart_data = {
+        'labels': [platform for platform, _ in rows],
+        'datasets': [_dataset('總分享數', [float(value) for _, value in rows], 'rgba(75, 192, 192, 0.2)', 'rgba(75, 192, 192, 1)')]
+    }
+    options = {'responsive': True, 'plugins': {'title': {'display': True, 'text': '各平台分享次數分析'}}}
+    return chart_data, {'type': 'doughnut', 'options': options}
+
+
+def build_view_time_chart(summary):
+    """每日平均停留時間"""
+    rows = summary.trend_rows('view_time_seconds', average=True)
+    chart_data = {
+        'labels': [day for day, _ in rows],
+        'datasets': [_dataset('平均停留時間(秒)', [float(value) for _, value in rows], 'rgba(255, 205, 86, 0.2)', 'rgba(255, 205, 86, 1)', fill=True)]
+    }
+    return chart_data, {'type': 'area', 'options': _trend_config('停留時間趨勢分析', '停留時間(秒)')}
+
+
+def build_save_chart(summary):
+    """各平台總收藏數"""
+    rows = sorted(summary.platform_rows('save_count'), key=lambda row: row[1], reverse=True)
+    chart_data = {
+        'labels': [platform for platform, _ in rows],
+        'datasets': [_dataset('總收藏數', [float(value) for _, value in rows], 'rgba(153, 102, 255, 0.2)', 'rgba(153, 102, 255, 1)')]
+    }
+    options = {'responsive': True, 'plugins': {'title': {'display': True, 'text': '各平台收藏次數分析'}}}
+    return chart_data, {'type': 'polarArea', 'options': options}
+
+
+def build_comment_chart(summary):
+    """每日總留言數"""
+    rows = summary.trend_rows('comment_count')
+    chart_data = {
+        'labels': [day for day, _ in rows],
+        'datasets': [_dataset('總留言數', [float(value) for _, value in rows], 'rgba(255, 159, 64, 0.2)', 'rgba(255, 159, 64, 1)', tension=0.4)]
+    }
+    return chart_data, {'type': 'line', 'options': _trend_config('留言數量趨勢分析', '留言數')}
+
+
+CHART_BUILDERS = {
+    'reach_analysis': build_reach_chart,
+    'like_analysis': build_like_chart,
+    'share_analysis': build_share_chart,
+    'view_time_analysis': build_view_time_chart,
+    'save_analysis': build_save_chart,
+    'comment_analysis': build_comment_chart,
+}
+
+
+def get_analysis_type_name(analysis_type):
+    """獲取分析類型的中文名稱"""
+    return dict(DataAnalysisCache.ANALYSIS_TYPE_CHOICES).get(analysis_type, analysis_type)
+
+
+def get_empty_analysis_data(analysis_type):
+    """獲取空的分析數據結構"""
+    empty_data = {
+        'labels': [],
+        'datasets': [{
+            'label': '數據',
+            'data': [],
+            'backgroundColor': 'rgba(54, 162, 235, 0.2)',
+            'borderColor': 'rgba(54, 162, 235, 1)',
+            'borderWidth': 1
+        }]
+    }
+
+    empty_config = {
+        'type': 'line',
+        'options': {
+            'responsive': True,
+            'plugins': {
+                'title': {
+                    'display': True,
+                    'text': f'{get_analysis_type_name(analysis_type)} - 暫無數據'
+                }
+            }
+        }
+    }
+
+    return empty_data, empty_config
+
+
+def build_all_analyses(user):
+    """
+    一次聚合產生六種分析
+    回傳 ({analysis_type: (data, chart_config)}, coverage)
+    """
+    summary = aggregate_posts(user)
+    if summary.post_count == 0:
+        results = {analysis_type: get_empty_analysis_data(analysis_type) for analysis_type in ANALYSIS_TYPES}
+    else:
+        results = {analysis_type: builder(summary) for analysis_type, builder in CHART_BUILDERS.items()}
+    return results, summary.coverage()
+
+
+def refresh_analysis_caches(user):
+    """重新聚合並更新用戶六種分析的快取，回傳 {analysis_type: DataAnalysisCache}"""
+    # 先讀版本再聚合：聚合期間若有新的寫入，快取記錄的是較舊的版本，下次讀取會再重新計算
+    data_version = get_data_version(user.id)
+    results, coverage = build_all_analyses(user)
+    caches = {}
+    for analysis_type, (data, chart_config) in results.items():
+        caches[analysis_type], _ = DataAnalysisCache.objects.update_or_create(
+            user=user,
+            analysis_type=analysis_type,
+            defaults={'data': data, 'chart_config': chart_config, 'source_coverage': coverage, 'data_version': data_version},
+        )
+    return caches
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DatanalyzeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Datanalyze"
+
+    def ready(self):
+        # 載入訊號處理，貼文數據變更時同步更新每日彙總
+        from . import signals  # noqa: F401
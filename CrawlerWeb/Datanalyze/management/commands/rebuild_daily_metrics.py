@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from Datanalyze.rollup import rebuild_daily_metrics
+
+
+class Command(BaseCommand):
+    help = '從貼文重新計算每日彙總（以 QuerySet.update() 等方式直接修改貼文後使用）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            default=None,
+            help='只重建指定用戶名的彙總，預設重建全部用戶',
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'找不到用戶: {options["user"]}')
+
+        count = rebuild_daily_metrics(user)
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 筆每日彙總'))
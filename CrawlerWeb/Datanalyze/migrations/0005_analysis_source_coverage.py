@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Datanalyze', '0004_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataanalysiscache',
+            name='source_coverage',
+            field=models.JSONField(blank=True, default=dict, verbose_name='資料範圍'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.0.3 on 2026-10-18 22:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncDate
+
+ROLLUP_METRICS = {
+    'reach': 'reach_count',
+    'like': 'like_count',
+    'share': 'share_count',
+    'save': 'save_count',
+    'comment': 'comment_count',
+    'view_time': 'view_time_seconds',
+}
+
+
+def populate_daily_metrics(apps, schema_editor):
+    """以現有貼文建立每日彙總"""
+    SocialMediaPost = apps.get_model('Crawler', 'SocialMediaPost')
+    DailyPostMetrics = apps.get_model('Datanalyze', 'DailyPostMetrics')
+
+    aggregates = {'post_count': Count('id'), 'max_post_id': Max('id')}
+    for prefix, field in ROLLUP_METRICS.items():
+        aggregates[f'{prefix}_sum'] = Sum(field)
+        aggregates[f'{prefix}_sum_sq'] = Sum(F(field) * F(field))
+    rows = SocialMediaPost.objects.annotate(
+        day=TruncDate('data_collected_at')
+    ).values('user_id', 'platform', 'day').annotate(**aggregates).order_by()
+
+    objects = []
+    for row in rows:
+        for prefix in ROLLUP_METRICS:
+            row[f'{prefix}_sum'] = row[f'{prefix}_sum'] or 0
+            row[f'{prefix}_sum_sq'] = row[f'{prefix}_sum_sq'] or 0
+        objects.append(DailyPostMetrics(**row))
+    DailyPostMetrics.objects.bulk_create(objects, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Datanalyze', '0005_analysis_source_coverage'),
+        ('Crawler', '0015_listing_page_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPostMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20, verbose_name='平台')),
+                ('day', models.DateField(verbose_name='日期')),
+                ('post_count', models.IntegerField(default=0, verbose_name='貼文數')),
+                ('reach_sum', models.BigIntegerField(default=0, verbose_name='觸及人數加總')),
+                ('reach_sum_sq', models.BigIntegerField(default=0, verbose_name='觸及人數平方和')),
+                ('like_sum', models.BigIntegerField(default=0, verbose_name='按讚次數加總')),
+                ('like_sum_sq', models.BigIntegerField(default=0, verbose_name='按讚次數平方和')),
+                ('share_sum', models.BigIntegerField(default=0, verbose_name='分享次數加總')),
+                ('share_sum_sq', models.BigIntegerField(default=0, verbose_name='分享次數平方和')),
+                ('save_sum', models.BigIntegerField(default=0, verbose_name='收藏次數加總')),
+                ('save_sum_sq', models.BigIntegerField(default=0, verbose_name='收藏次數平方和')),
+                ('comment_sum', models.BigIntegerField(default=0, verbose_name='留言數量加總')),
+                ('comment_sum_sq', models.BigIntegerField(default=0, verbose_name='留言數量平方和')),
+                ('view_time_sum', models.BigIntegerField(default=0, verbose_name='停留時間加總')),
+                ('view_time_sum_sq', models.BigIntegerField(default=0, verbose_name='停留時間平方和')),
+                ('max_post_id', models.BigIntegerField(blank=True, null=True, verbose_name='最大貼文ID')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_post_metrics', to=settings.AUTH_USER_MODEL, verbose_name='用戶')),
+            ],
+            options={
+                'verbose_name': '每日貼文數據',
+                'verbose_name_plural': '每日貼文數據',
+                'ordering': ['user', 'day', 'platform'],
+                'indexes': [models.Index(fields=['user', 'day'], name='datanalyze_daily_user_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'platform', 'day'), name='datanalyze_daily_metrics_unique')],
+            },
+        ),
+        migrations.RunPython(populate_daily_metrics, migrations.RunPython.noop),
+    ]
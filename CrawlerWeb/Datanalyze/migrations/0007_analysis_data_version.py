@@ -0,0 +1,46 @@
+# Generated by Django 5.0.3 on 2026-10-18 22:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_data_versions(apps, schema_editor):
+    """已有貼文的用戶從版本 1 開始（既有快取的版本為空，第一次讀取時會重新計算）"""
+    SocialMediaPost = apps.get_model('Crawler', 'SocialMediaPost')
+    AnalysisDataVersion = apps.get_model('Datanalyze', 'AnalysisDataVersion')
+    user_ids = SocialMediaPost.objects.order_by().values_list('user_id', flat=True).distinct()
+    AnalysisDataVersion.objects.bulk_create(
+        [AnalysisDataVersion(user_id=user_id, version=1) for user_id in user_ids],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Datanalyze', '0006_daily_post_metrics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataanalysiscache',
+            name='data_version',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='資料版本'),
+        ),
+        migrations.CreateModel(
+            name='AnalysisDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0, verbose_name='版本')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_data_version', to=settings.AUTH_USER_MODEL, verbose_name='用戶')),
+            ],
+            options={
+                'verbose_name': '分析資料版本',
+                'verbose_name_plural': '分析資料版本',
+            },
+        ),
+        migrations.RunPython(populate_data_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Datanalyze', '0007_analysis_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisdataversion',
+            name='refresh_started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='重新計算開始時間'),
+        ),
+    ]
@@ -20,6 +20,8 @@ class DataAnalysisCache(models.Model):
     analysis_type = models.CharField(max_length=20, choices=ANALYSIS_TYPE_CHOICES, verbose_name='分析類型')
     data = models.JSONField(verbose_name='分析數據', default=dict, blank=True)
     chart_config = models.JSONField(verbose_name='圖表配置', default=dict, blank=True)
+    source_coverage = models.JSONField(verbose_name='資料範圍', default=dict, blank=True)  # 產生此結果時涵蓋的貼文：筆數、最大 id、最後更新時間
+    data_version = models.BigIntegerField(null=True, blank=True, verbose_name='資料版本')  # 產生此結果時的 AnalysisDataVersion.version
     last_updated = models.DateTimeField(auto_now=True, verbose_name='最後更新時間')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='建立時間')
     
@@ -63,3 +65,71 @@ class DataAnalysisCache(models.Model):
         self.chart_config = new_chart_config
         self.save()
         return self
+
+
+class DailyPostMetrics(models.Model):
+    """貼文數據每日彙總（依用戶、平台、日期），由 SocialMediaPost 的信號增量維護"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='用戶', related_name='daily_post_metrics')
+    platform = models.CharField(max_length=20, verbose_name='平台')
+    day = models.DateField(verbose_name='日期')  # 數據收集時間的當地日期
+    post_count = models.IntegerField(default=0, verbose_name='貼文數')
+    
+    # 各指標的加總與平方和（平方和用於計算標準差）
+    reach_sum = models.BigIntegerField(default=0, verbose_name='觸及人數加總')
+    reach_sum_sq = models.BigIntegerField(default=0, verbose_name='觸及人數平方和')
+    like_sum = models.BigIntegerField(default=0, verbose_name='按讚次數加總')
+    like_sum_sq = models.BigIntegerField(default=0, verbose_name='按讚次數平方和')
+    share_sum = models.BigIntegerField(default=0, verbose_name='分享次數加總')
+    share_sum_sq = models.BigIntegerField(default=0, verbose_name='分享次數平方和')
+    save_sum = models.BigIntegerField(default=0, verbose_name='收藏次數加總')
+    save_sum_sq = models.BigIntegerField(default=0, verbose_name='收藏次數平方和')
+    comment_sum = models.BigIntegerField(default=0, verbose_name='留言數量加總')
+    comment_sum_sq = models.BigIntegerField(default=0, verbose_name='留言數量平方和')
+    view_time_sum = models.BigIntegerField(default=0, verbose_name='停留時間加總')
+    view_time_sum_sq = models.BigIntegerField(default=0, verbose_name='停留時間平方和')
+    
+    max_post_id = models.BigIntegerField(null=True, blank=True, verbose_name='最大貼文ID')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
+    
+    class Meta:
+        verbose_name = '每日貼文數據'
+        verbose_name_plural = '每日貼文數據'
+        ordering = ['user', 'day', 'platform']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'platform', 'day'], name='datanalyze_daily_metrics_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='datanalyze_daily_user_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.platform} - {self.day}"
+    
+    def mean(self, metric):
+        """指標的平均值，metric 例如 'reach'"""
+        if not self.post_count:
+            return 0
+        return getattr(self, f'{metric}_sum') / self.post_count
+    
+    def stddev(self, metric):
+        """指標的母體標準差"""
+        if not self.post_count:
+            return 0
+        mean = self.mean(metric)
+        variance = getattr(self, f'{metric}_sum_sq') / self.post_count - mean * mean
+        return max(variance, 0) ** 0.5
+
+
+class AnalysisDataVersion(models.Model):
+    """用戶貼文數據的版本號，貼文新增、修改、刪除時遞增；分析快取記錄產生時的版本，版本不同才重新計算"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, verbose_name='用戶', related_name='analysis_data_version')
+    version = models.BigIntegerField(default=0, verbose_name='版本')
+    refresh_started_at = models.DateTimeField(null=True, blank=True, verbose_name='重新計算開始時間')  # 正在重新計算分析的租約，空值表示沒有程序在計算
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
+    
+    class Meta:
+        verbose_name = '分析資料版本'
+        verbose_name_plural = '分析資料版本'
+    
+    def __str__(self):
+        return f"{self.user.username} - v{self.version}"
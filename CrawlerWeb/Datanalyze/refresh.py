@@ -0,0 +1,145 @@
+"""
+分析快取的重新計算協調
+同一用戶的六種分析由一次聚合產生，因此以用戶為單位只讓一個呼叫者重新計算（single-flight）：
+- 同一程序內以 _flights 記錄正在計算的用戶，其他執行緒等待同一次計算
+- 跨程序以 AnalysisDataVersion.refresh_started_at 的條件式 UPDATE 取得租約，程序中斷時租約逾時由其他請求接手
+其他呼叫者有舊快取時直接回傳舊值（stale-while-revalidate），沒有時等待計算完成；
+手動刷新在 CRAWLER_ANALYSIS_REFRESH_COALESCE_SECONDS 內重複點擊時合併為同一次計算。
+讀取時先查 result_cache 的記憶體快取（以資料版本為鍵），沒有才讀取 DataAnalysisCache。
+"""
+
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .aggregation import refresh_analysis_caches
+from .models import AnalysisDataVersion, DataAnalysisCache
+from .result_cache import AnalysisResult, get_result_cache
+from .versions import get_data_version
+
+WAIT_POLL_INTERVAL = 0.25  # 等待其他程序計算時查詢快取的間隔（秒）
+
+_flights = {}  # user_id -> threading.Event，計算完成時 set
+_flights_lock = threading.Lock()
+
+
+def get_coalesce_seconds():
+    return getattr(settings, 'CRAWLER_ANALYSIS_REFRESH_COALESCE_SECONDS', 30)
+
+
+def get_wait_timeout():
+    return getattr(settings, 'CRAWLER_ANALYSIS_REFRESH_WAIT', 15)
+
+
+def get_lease_seconds():
+    return getattr(settings, 'CRAWLER_ANALYSIS_REFRESH_LEASE', 120)
+
+
+def _load_cache(user, analysis_type):
+    cache = DataAnalysisCache.objects.filter(user=user, analysis_type=analysis_type).first()
+    return AnalysisResult.from_cache(cache) if cache is not None else None
+
+
+def _refresh(user, analysis_type):
+    """重新計算六種分析，並放入記憶體快取"""
+    result_cache = get_result_cache()
+    results = {}
+    for cache_type, cache in refresh_analysis_caches(user).items():
+        results[cache_type] = AnalysisResult.from_cache(cache)
+        result_cache.put(user.id, cache_type, results[cache_type])
+    return results[analysis_type]
+
+
+def _needs_refresh(cache, version, force):
+    if cache is None or cache.data_version != version:
+        return True
+    # 手動刷新：剛重新計算過的結果直接使用
+    return force and timezone.now() - cache.last_updated >= timedelta(seconds=get_coalesce_seconds())
+
+
+def _join_flight(user_id):
+    """回傳 (event, leader)，leader 為 True 表示由目前的執行緒負責計算"""
+    with _flights_lock:
+        event = _flights.get(user_id)
+        if event is not None:
+            return event, False
+        event = _flights[user_id] = threading.Event()
+        return event, True
+
+
+def _finish_flight(user_id, event):
+    with _flights_lock:
+        _flights.pop(user_id, None)
+    event.set()
+
+
+def _claim_lease(user_id):
+    """以條件式 UPDATE 取得重新計算的租約，其他程序持有未逾時的租約時回傳 False"""
+    now = timezone.now()
+    AnalysisDataVersion.objects.get_or_create(user_id=user_id)
+    expired = now - timedelta(seconds=get_lease_seconds())
+    return AnalysisDataVersion.objects.filter(user_id=user_id).filter(
+        Q(refresh_started_at__isnull=True) | Q(refresh_started_at__lt=expired)
+    ).update(refresh_started_at=now) == 1
+
+
+def _release_lease(user_id):
+    AnalysisDataVersion.objects.filter(user_id=user_id).update(refresh_started_at=None)
+
+
+def _wait_for_cache(user, analysis_type, version, event=None):
+    """等待其他呼叫者產生至少為 version 的快取，逾時回傳 None"""
+    deadline = time.monotonic() + get_wait_timeout()
+    if event is not None:
+        event.wait(get_wait_timeout())
+    while True:
+        cache = _load_cache(user, analysis_type)
+        if cache is not None and cache.data_version is not None and cache.data_version >= version:
+            return cache
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(WAIT_POLL_INTERVAL)
+
+
+def get_analysis_cache(user, analysis_type, force=False):
+    """
+    取得用戶的分析結果（AnalysisResult），回傳 (cache, stale)
+    快取版本與資料版本相同時直接回傳；需要重新計算時只有一個呼叫者計算，
+    其他呼叫者有舊快取就回傳舊值（stale 為 True），沒有則等待計算完成。
+    force 為 True 時（手動刷新）即使版本相同也重新計算，除非剛計算過
+    """
+    version = get_data_version(user.id)
+    result_cache = get_result_cache()
+    cache = result_cache.get(user.id, analysis_type, version)
+    if cache is not None and not _needs_refresh(cache, version, force):
+        return cache, False
+
+    if cache is None:
+        cache = _load_cache(user, analysis_type)
+        if not _needs_refresh(cache, version, force):
+            result_cache.put(user.id, analysis_type, cache)
+            return cache, False
+
+    event, leader = _join_flight(user.id)
+    if leader:
+        try:
+            if _claim_lease(user.id):
+                try:
+                    return _refresh(user, analysis_type), False
+                finally:
+                    _release_lease(user.id)
+        finally:
+            _finish_flight(user.id, event)
+
+    # 其他執行緒或程序正在計算
+    if cache is not None:
+        return cache, True
+    refreshed = _wait_for_cache(user, analysis_type, version, None if leader else event)
+    if refreshed is None:
+        # 計算的一方逾時未完成，自行計算
+        refreshed = _refresh(user, analysis_type)
+    return refreshed, False
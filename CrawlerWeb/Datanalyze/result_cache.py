@@ -0,0 +1,156 @@
+"""
+分析結果的記憶體快取
+儀表板輪詢時，資料版本沒有變動就直接回傳記憶體中的結果，不必再讀取並解析 DataAnalysisCache 的 JSON。
+- 第一層：程序內的 LRU，以 (user_id, analysis_type, data_version) 為鍵，依筆數與位元組數上限淘汰最久未用的結果
+- 第二層（選用）：CRAWLER_ANALYSIS_SHARED_CACHE 指定的 Django 快取（例如多個程序共用的 Redis / Memcached）
+DataAnalysisCache 資料列仍是持久的一層；資料版本改變後舊鍵不會再被讀到，同一分析的舊版本在寫入新版本時移除。
+"""
+
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class AnalysisResult(namedtuple('AnalysisResult', 'data chart_config last_updated data_version')):
+    """一種分析的結果（欄位與 DataAnalysisCache 相同，可直接序列化放入共用快取）"""
+    __slots__ = ()
+
+    @classmethod
+    def from_cache(cls, cache):
+        return cls(cache.data, cache.chart_config, cache.last_updated, cache.data_version)
+
+    def size(self):
+        """估計佔用的位元組數（JSON 編碼後的長度）"""
+        return len(json.dumps([self.data, self.chart_config], ensure_ascii=False).encode())
+
+
+class AnalysisResultCache:
+    """有筆數與位元組數上限的 LRU，可選擇以 Django 快取作為第二層"""
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024, shared_alias=None, shared_timeout=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared_alias = shared_alias
+        self.shared_timeout = shared_timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (user_id, analysis_type, data_version) -> (AnalysisResult, size)
+        self._versions = {}  # (user_id, analysis_type) -> 目前記憶體中的 data_version
+        self._bytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id, analysis_type, data_version):
+        key = (user_id, analysis_type, data_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        result = self._shared_get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+        self._put_local(key, result)
+        return result
+
+    def put(self, user_id, analysis_type, result):
+        key = (user_id, analysis_type, result.data_version)
+        self._put_local(key, result)
+        self._shared_set(key, result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """快取的使用狀況"""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.shared_hits) / lookups if lookups else 0,
+            }
+
+    # ------------------------------------------------------------------
+    # 內部方法
+    # ------------------------------------------------------------------
+    def _put_local(self, key, result):
+        size = result.size()
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        user_id, analysis_type, data_version = key
+        with self._lock:
+            # 同一分析只保留最新版本
+            previous_version = self._versions.get((user_id, analysis_type))
+            if previous_version is not None and previous_version != data_version:
+                self._pop((user_id, analysis_type, previous_version))
+            self._pop(key)
+
+            self._entries[key] = (result, size)
+            self._versions[(user_id, analysis_type)] = data_version
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+                self.evictions += 1
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        if self._versions.get(key[:2]) == key[2]:
+            del self._versions[key[:2]]
+
+    def _shared_key(self, key):
+        user_id, analysis_type, data_version = key
+        return f'datanalyze:analysis:{user_id}:{analysis_type}:{data_version}'
+
+    def _shared_get(self, key):
+        if not self.shared_alias:
+            return None
+        value = caches[self.shared_alias].get(self._shared_key(key))
+        return AnalysisResult(*value) if value is not None else None
+
+    def _shared_set(self, key, result):
+        if not self.shared_alias:
+            return
+        # 以 tuple 存放，讀取端不需要匯入 AnalysisResult 也能反序列化
+        caches[self.shared_alias].set(self._shared_key(key), tuple(result), self.shared_timeout)
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """取得全域共用的分析結果快取（依 settings 設定建立）"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = AnalysisResultCache(
+                    max_entries=getattr(settings, 'CRAWLER_ANALYSIS_MEMORY_CACHE_ENTRIES', 512),
+                    max_bytes=getattr(settings, 'CRAWLER_ANALYSIS_MEMORY_CACHE_BYTES', 32 * 1024 * 1024),
+                    shared_alias=getattr(settings, 'CRAWLER_ANALYSIS_SHARED_CACHE', None),
+                    shared_timeout=getattr(settings, 'CRAWLER_ANALYSIS_SHARED_CACHE_TIMEOUT', 3600),
+                )
+    return _result_cache
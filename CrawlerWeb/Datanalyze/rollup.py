@@ -0,0 +1,148 @@
+"""
+每日貼文數據彙總（DailyPostMetrics）
+SocialMediaPost 新增、修改、刪除時由 signals 把差異加減到對應的 (用戶, 平台, 日期) 列，
+趨勢與平台圖表只需讀取彙總列（筆數與天數成正比），不必再掃描所有貼文。
+以 QuerySet.update() / bulk_create() 直接修改貼文不會觸發信號，之後需執行 rebuild_daily_metrics 重建。
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from Crawler.models import SocialMediaPost
+from .models import DailyPostMetrics
+from .versions import bump_data_version
+
+# 彙總欄位前綴 -> SocialMediaPost 欄位
+ROLLUP_METRICS = {
+    'reach': 'reach_count',
+    'like': 'like_count',
+    'share': 'share_count',
+    'save': 'save_count',
+    'comment': 'comment_count',
+    'view_time': 'view_time_seconds',
+}
+
+SNAPSHOT_FIELDS = ('id', 'user_id', 'platform', 'data_collected_at') + tuple(ROLLUP_METRICS.values())
+
+
+def snapshot(post):
+    """貼文在彙總中的內容：(user_id, platform, day) 與各指標數值"""
+    if isinstance(post, dict):
+        values = post
+    else:
+        values = {field: getattr(post, field) for field in SNAPSHOT_FIELDS}
+    return {
+        'id': values['id'],
+        'key': (values['user_id'], values['platform'], timezone.localdate(values['data_collected_at'])),
+        'metrics': {prefix: values[field] or 0 for prefix, field in ROLLUP_METRICS.items()},
+    }
+
+
+def load_snapshot(post_id):
+    """從資料庫讀取貼文目前的彙總內容（修改前呼叫）"""
+    values = SocialMediaPost.objects.filter(pk=post_id).values(*SNAPSHOT_FIELDS).first()
+    return snapshot(values) if values else None
+
+
+def _apply(key, post_count, sums, squares, post_id=None):
+    """把差異加到 (user_id, platform, day) 列，列不存在時建立"""
+    user_id, platform, day = key
+    updates = {'post_count': F('post_count') + post_count, 'updated_at': timezone.now()}
+    for prefix in ROLLUP_METRICS:
+        updates[f'{prefix}_sum'] = F(f'{prefix}_sum') + sums[prefix]
+        updates[f'{prefix}_sum_sq'] = F(f'{prefix}_sum_sq') + squares[prefix]
+
+    rows = DailyPostMetrics.objects.filter(user_id=user_id, platform=platform, day=day)
+    if rows.update(**updates):
+        if post_id is not None:
+            rows.filter(max_post_id__lt=post_id).update(max_post_id=post_id)
+        # 當天該平台已沒有貼文
+        if post_count < 0:
+            rows.filter(post_count__lte=0).delete()
+        return
+    if post_count <= 0:
+        return
+
+    values = {'post_count': post_count, 'max_post_id': post_id}
+    for prefix in ROLLUP_METRICS:
+        values[f'{prefix}_sum'] = sums[prefix]
+        values[f'{prefix}_sum_sq'] = squares[prefix]
+    try:
+        with transaction.atomic():
+            DailyPostMetrics.objects.create(user_id=user_id, platform=platform, day=day, **values)
+    except IntegrityError:
+        # 同時有其他程序建立了同一列
+        _apply(key, post_count, sums, squares, post_id)
+
+
+def _add(item, sign):
+    metrics = item['metrics']
+    _apply(
+        item['key'],
+        sign,
+        {prefix: sign * value for prefix, value in metrics.items()},
+        {prefix: sign * value * value for prefix, value in metrics.items()},
+        item['id'] if sign > 0 else None,
+    )
+
+
+@transaction.atomic
+def apply_change(previous, current):
+    """
+    依貼文修改前後的內容更新彙總；previous 為 None 表示新增，current 為 None 表示刪除
+    同一天、同一平台時只更新一列。回傳彙總有變動的用戶 id 集合
+    """
+    if previous and current and previous['key'] == current['key']:
+        old, new = previous['metrics'], current['metrics']
+        if old == new:
+            # 只修改了內容、網址等不影響分析的欄位
+            return set()
+        _apply(
+            current['key'],
+            0,
+            {prefix: new[prefix] - old[prefix] for prefix in ROLLUP_METRICS},
+            {prefix: new[prefix] ** 2 - old[prefix] ** 2 for prefix in ROLLUP_METRICS},
+            current['id'],
+        )
+        return {current['key'][0]}
+    changed = set()
+    if previous:
+        _add(previous, -1)
+        changed.add(previous['key'][0])
+    if current:
+        _add(current, 1)
+        changed.add(current['key'][0])
+    return changed
+
+
+def rebuild_daily_metrics(user=None):
+    """從貼文重新計算彙總（全部用戶或指定用戶）並遞增受影響用戶的資料版本，回傳建立的列數"""
+    posts = SocialMediaPost.objects.all()
+    rollups = DailyPostMetrics.objects.all()
+    if user is not None:
+        posts = posts.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    aggregates = {'post_count': Count('id'), 'max_post_id': Max('id')}
+    for prefix, field in ROLLUP_METRICS.items():
+        aggregates[f'{prefix}_sum'] = Sum(field)
+        aggregates[f'{prefix}_sum_sq'] = Sum(F(field) * F(field))
+    rows = posts.annotate(day=TruncDate('data_collected_at')).values('user_id', 'platform', 'day').annotate(**aggregates).order_by()
+
+    with transaction.atomic():
+        user_ids = set(rollups.order_by().values_list('user_id', flat=True).distinct())
+        rollups.delete()
+        objects = []
+        for row in rows:
+            for prefix in ROLLUP_METRICS:
+                row[f'{prefix}_sum'] = row[f'{prefix}_sum'] or 0
+                row[f'{prefix}_sum_sq'] = row[f'{prefix}_sum_sq'] or 0
+            objects.append(DailyPostMetrics(**row))
+        DailyPostMetrics.objects.bulk_create(objects, batch_size=500)
+
+        user_ids.update(row.user_id for row in objects)
+        for user_id in user_ids:
+            bump_data_version(user_id)
+    return len(objects)
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from Crawler.models import SocialMediaPost
+from .rollup import apply_change, load_snapshot, snapshot
+from .versions import bump_data_version
+
+
+@receiver(pre_save, sender=SocialMediaPost)
+def remember_post_metrics(sender, instance, raw=False, **kwargs):
+    """修改貼文前記住舊的數據，儲存後以差異更新每日彙總"""
+    instance._rollup_previous = None if raw or instance.pk is None else load_snapshot(instance.pk)
+
+
+@receiver(post_save, sender=SocialMediaPost)
+def update_daily_metrics_on_save(sender, instance, raw=False, **kwargs):
+    """新增或修改貼文時更新每日彙總，並遞增資料版本讓分析快取失效"""
+    if raw:
+        return
+    for user_id in apply_change(getattr(instance, '_rollup_previous', None), snapshot(instance)):
+        bump_data_version(user_id)
+    instance._rollup_previous = None
+
+
+@receiver(post_delete, sender=SocialMediaPost)
+def update_daily_metrics_on_delete(sender, instance, **kwargs):
+    """刪除貼文時從每日彙總扣除，並遞增資料版本"""
+    for user_id in apply_change(snapshot(instance), None):
+        # 刪除用戶時貼文會連鎖刪除，不為已刪除的用戶建立版本列
+        bump_data_version(user_id, create=False)
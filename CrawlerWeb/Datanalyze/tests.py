@@ -1,3 +1,126 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from Crawler.models import SocialMediaPost
+from .models import AnalysisDataVersion, DailyPostMetrics, DataAnalysisCache
+from .refresh import get_analysis_cache
+from .result_cache import AnalysisResult, AnalysisResultCache, get_result_cache
+from .versions import get_data_version
+
+
+class AnalysisCacheInvalidationTests(TestCase):
+    """貼文寫入會遞增資料版本，分析快取只在版本不同時重新計算"""
+
+    def setUp(self):
+        # 測試之間資料庫會回滾，用戶 id 與資料版本可能重複
+        get_result_cache().clear()
+        self.user = get_user_model().objects.create_user(username='analyst', password='secret')
+        self.client.force_login(self.user)
+        self.url = reverse('datanalyze:get_analysis_data', args=['like_analysis'])
+
+    def create_post(self, post_id, like_count):
+        return SocialMediaPost.objects.create(
+            user=self.user, platform='facebook', post_id=post_id, content='', post_url='https://example.com',
+            like_count=like_count, posted_at=timezone.now(),
+        )
+
+    def test_post_writes_bump_version_and_rollup(self):
+        post = self.create_post('1', 10)
+        self.assertEqual(get_data_version(self.user.id), 1)
+
+        post.like_count = 15
+        post.save()
+        post.content = '只修改內容'
+        post.save()
+        self.assertEqual(get_data_version(self.user.id), 2)
+        self.assertEqual(DailyPostMetrics.objects.get(user=self.user).like_sum, 15)
+
+        post.delete()
+        self.assertEqual(get_data_version(self.user.id), 3)
+        self.assertFalse(DailyPostMetrics.objects.filter(user=self.user).exists())
+
+    def test_cache_recomputed_only_after_write(self):
+        self.create_post('1', 10)
+        self.assertEqual(self.client.get(self.url).json()['data']['datasets'][0]['data'], [10.0])
+        cache = DataAnalysisCache.objects.get(user=self.user, analysis_type='like_analysis')
+        self.assertEqual(cache.data_version, 1)
+
+        # 版本相同時直接使用快取
+        self.client.get(self.url)
+        self.assertEqual(DataAnalysisCache.objects.get(pk=cache.pk).last_updated, cache.last_updated)
+
+        self.create_post('2', 5)
+        self.assertEqual(self.client.get(self.url).json()['data']['datasets'][0]['data'], [15.0])
+
+
+class AnalysisRefreshCoordinationTests(TestCase):
+    """重新計算的租約、stale-while-revalidate 與手動刷新合併"""
+
+    def setUp(self):
+        # 測試之間資料庫會回滾，用戶 id 與資料版本可能重複
+        get_result_cache().clear()
+        self.user = get_user_model().objects.create_user(username='analyst', password='secret')
+        SocialMediaPost.objects.create(
+            user=self.user, platform='facebook', post_id='1', content='', post_url='https://example.com',
+            like_count=10, posted_at=timezone.now(),
+        )
+
+    def test_refresh_in_other_process_returns_stale_cache(self):
+        cache, stale = get_analysis_cache(self.user, 'like_analysis')
+        self.assertFalse(stale)
+
+        SocialMediaPost.objects.filter(user=self.user).first().delete()
+        # 模擬其他程序正在重新計算
+        AnalysisDataVersion.objects.filter(user=self.user).update(refresh_started_at=timezone.now())
+        stale_cache, stale = get_analysis_cache(self.user, 'like_analysis')
+        self.assertTrue(stale)
+        self.assertEqual(stale_cache.data, cache.data)
+
+        # 租約逾時後由目前的請求接手
+        AnalysisDataVersion.objects.filter(user=self.user).update(refresh_started_at=timezone.now() - timedelta(hours=1))
+        fresh_cache, stale = get_analysis_cache(self.user, 'like_analysis')
+        self.assertFalse(stale)
+        self.assertEqual(fresh_cache.data_version, get_data_version(self.user.id))
+        self.assertIsNone(AnalysisDataVersion.objects.get(user=self.user).refresh_started_at)
+
+    def test_repeated_manual_refresh_coalesces(self):
+        cache, _ = get_analysis_cache(self.user, 'like_analysis', force=True)
+        # 只查詢資料版本，結果來自記憶體快取
+        with self.assertNumQueries(1):
+            again, stale = get_analysis_cache(self.user, 'like_analysis', force=True)
+        self.assertFalse(stale)
+        self.assertEqual(again.last_updated, cache.last_updated)
+
+
+class AnalysisResultCacheTests(TestCase):
+    """記憶體快取的淘汰與命中統計"""
+
+    def result(self, version, size=10):
+        return AnalysisResult({'labels': ['x' * size]}, {}, timezone.now(), version)
+
+    def test_evicts_least_recently_used_by_entries_and_bytes(self):
+        cache = AnalysisResultCache(max_entries=2, max_bytes=10_000)
+        cache.put(1, 'like_analysis', self.result(1))
+        cache.put(2, 'like_analysis', self.result(1))
+        cache.get(1, 'like_analysis', 1)
+        cache.put(3, 'like_analysis', self.result(1))
+        self.assertIsNone(cache.get(2, 'like_analysis', 1))
+        self.assertIsNotNone(cache.get(1, 'like_analysis', 1))
+
+        cache.put(4, 'like_analysis', self.result(1, size=9_960))
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertLessEqual(stats['bytes'], 10_000)
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (2, 1, 3))
 
-# Create your tests here.
+    def test_new_version_replaces_old_entry(self):
+        cache = AnalysisResultCache()
+        cache.put(1, 'like_analysis', self.result(1))
+        cache.put(1, 'like_analysis', self.result(2))
+        self.assertIsNone(cache.get(1, 'like_analysis', 1))
+        self.assertEqual(cache.get(1, 'like_analysis', 2).data_version, 2)
+        self.assertEqual(cache.stats()['entries'], 1)
@@ -0,0 +1,33 @@
+"""
+分析資料版本
+每位用戶一個遞增的版本號，SocialMediaPost 寫入（經由信號）或重建彙總時遞增。
+DataAnalysisCache 記錄產生時的版本，讀取時版本相同即可直接使用，不同才重新計算，不再依固定時間過期。
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnalysisDataVersion
+
+
+def get_data_version(user_id):
+    """用戶目前的資料版本，尚未有任何寫入時為 0"""
+    version = AnalysisDataVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_data_version(user_id, create=True):
+    """
+    遞增用戶的資料版本
+    create=False 時只更新既有的版本列（刪除用戶時的連鎖刪除不應再建立新列）
+    """
+    versions = AnalysisDataVersion.objects.filter(user_id=user_id)
+    if versions.update(version=F('version') + 1, updated_at=timezone.now()) or not create:
+        return
+    try:
+        with transaction.atomic():
+            AnalysisDataVersion.objects.create(user_id=user_id, version=1)
+    except IntegrityError:
+        # 同時有其他程序建立了版本列
+        versions.update(version=F('version') + 1, updated_at=timezone.now())
@@ -8,7 +8,7 @@ import os
 import sys
 import django
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 # 設置 Django 環境
 BASE_DIR = Path(__file__).resolve().parent
@@ -51,6 +51,7 @@ def monitor_scheduler():
         print(f"成功次數: {schedule.successful_executions}")
         print(f"失敗次數: {schedule.failed_executions}")
         print(f"最後執行時間: {schedule.last_execution_time}")
+        print(f"下次執行時間: {schedule.next_execution_at}")
         
         # 檢查是否應該執行
         should_execute = check_schedule_execution(schedule, now)
@@ -86,67 +87,30 @@ def monitor_scheduler():
         print(f"下次執行時間: {next_schedule['next_time']}")
         print(f"距離現在: {next_schedule['time_until']}")
     else:
-        print("今天沒有更多要執行的排程")
+        print("沒有待執行的排程")
 
 def check_schedule_execution(schedule, now):
-    """檢查排程是否應該執行"""
-    # 檢查日期
-    current_weekday = now.strftime('%A').lower()
-    if current_weekday not in schedule.execution_days:
-        return False
-    
-    # 檢查時間
-    current_time = now.time()
-    for time_str in schedule.posting_times:
-        try:
-            schedule_time = datetime.strptime(time_str, '%H:%M').time()
-            time_diff = abs((current_time.hour * 60 + current_time.minute) - 
-                           (schedule_time.hour * 60 + schedule_time.minute))
-            if time_diff <= 5:  # 5分鐘容錯
-                return True
-        except ValueError:
-            continue
-    
-    return False
+    """檢查排程是否應該執行（下次執行時間已到）"""
+    return schedule.next_execution_at is not None and schedule.next_execution_at <= now
 
 def find_next_schedule(now):
-    """找到下一個要執行的排程"""
-    active_schedules = Schedule.objects.filter(
+    """找到下一個要執行的排程（以 next_execution_at 索引排序）"""
+    schedule = Schedule.objects.filter(
         is_active=True,
-        status='active'
-    )
-    
-    next_schedule = None
-    min_time_diff = float('inf')
+        status='active',
+        next_execution_at__gt=now
+    ).order_by('next_execution_at').first()
     
-    for schedule in active_schedules:
-        current_weekday = now.strftime('%A').lower()
-        if current_weekday not in schedule.execution_days:
-            continue
-        
-        for time_str in schedule.posting_times:
-            try:
-                schedule_time = datetime.strptime(time_str, '%H:%M').time()
-                schedule_datetime = datetime.combine(now.date(), schedule_time)
-                
-                # 如果時間已經過了，跳到下一天
-                if schedule_datetime <= now:
-                    schedule_datetime += timedelta(days=1)
-                
-                time_diff = (schedule_datetime - now).total_seconds()
-                
-                if time_diff < min_time_diff:
-                    min_time_diff = time_diff
-                    next_schedule = {
-                        'id': schedule.id,
-                        'name': schedule.name,
-                        'next_time': schedule_datetime,
-                        'time_until': str(timedelta(seconds=int(time_diff)))
-                    }
-            except ValueError:
-                continue
+    if schedule is None:
+        return None
     
-    return next_schedule
+    time_diff = (schedule.next_execution_at - now).total_seconds()
+    return {
+        'id': schedule.id,
+        'name': schedule.name,
+        'next_time': timezone.localtime(schedule.next_execution_at),
+        'time_until': str(timedelta(seconds=int(time_diff)))
+    }
 
 if __name__ == '__main__':
     monitor_scheduler()